@@ -0,0 +1,70 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.pipelines import pipeline_config_errors, render_terraform_code
+from app.models.pipeline import PipelineConfig
+
+# Pool de processus partagé par les déploiements par lots (créé à la première utilisation)
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Retourne le pool de processus utilisé pour valider et générer les pipelines par lots.
+
+    Returns:
+        Le pool de processus (`settings.BATCH_MAX_WORKERS` processus, un par cœur par défaut).
+    """
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=settings.BATCH_MAX_WORKERS or os.cpu_count())
+    return _process_pool
+
+
+def shutdown_process_pool() -> None:
+    """Arrête le pool de processus s'il a été créé."""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(cancel_futures=True)
+        _process_pool = None
+
+
+def process_pipeline(config: PipelineConfig, output_format: str) -> Dict[str, Any]:
+    """
+    Valide une configuration de pipeline et génère son code Terraform.
+
+    Cette fonction est exécutée dans un processus du pool : elle ne touche ni au
+    cache ni au stockage des statuts, qui restent dans le processus de l'API.
+
+    Args:
+        config: Configuration du pipeline.
+        output_format: Format de sortie du code Terraform ("hcl" ou "json").
+
+    Returns:
+        Dictionnaire avec `valid` et, selon le cas, `terraform_code` ou `error`.
+    """
+    errors = pipeline_config_errors(config)
+    if errors:
+        return {"valid": False, "error": f"Configuration du pipeline invalide: {'; '.join(errors)}"}
+    try:
+        return {"valid": True, "terraform_code": render_terraform_code(config, output_format)}
+    except Exception as e:
+        return {"valid": True, "error": f"Erreur lors de la génération du code Terraform: {str(e)}"}
+
+
+async def process_pipeline_in_pool(config: PipelineConfig, output_format: str) -> Dict[str, Any]:
+    """
+    Exécute `process_pipeline` dans le pool de processus sans bloquer la boucle asyncio.
+
+    Args:
+        config: Configuration du pipeline.
+        output_format: Format de sortie du code Terraform.
+
+    Returns:
+        Résultat de `process_pipeline`.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_process_pool(), process_pipeline, config, output_format)
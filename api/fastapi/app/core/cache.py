@@ -0,0 +1,136 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+import threading
+import time
+
+# Sentinelle pour distinguer "absent" d'une valeur None mise en cache
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Cache LRU borné en taille, avec expiration optionnelle des entrées (TTL).
+
+    Toutes les opérations sont en O(1) et protégées par un verrou, ce qui permet
+    de partager une même instance entre la boucle asyncio et des threads.
+    Les compteurs `hits`, `misses` et `evictions` (dépassement de taille ou
+    expiration) sont exposés via `stats()`.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: Optional[float] = None,
+        on_evict: Optional[Callable[[Hashable, Any], None]] = None,
+    ):
+        """
+        Args:
+            maxsize: Nombre maximum d'entrées conservées.
+            ttl: Durée de vie d'une entrée en secondes (None pour ne jamais expirer).
+            on_evict: Fonction appelée avec `(clé, valeur)` pour chaque entrée évincée
+                (dépassement de taille ou expiration), hors du verrou.
+        """
+        if maxsize <= 0:
+            raise ValueError("maxsize doit être strictement positif.")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Retourne la valeur associée à la clé et la marque comme récemment utilisée.
+
+        Args:
+            key: Clé recherchée.
+            default: Valeur retournée si la clé est absente ou expirée.
+
+        Returns:
+            La valeur en cache ou `default`.
+        """
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at is None or expires_at > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._data[key]
+            self.evictions += 1
+            self.misses += 1
+        if self.on_evict is not None:
+            self.on_evict(key, value)
+        return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Insère ou remplace une entrée, en évinçant la moins récemment utilisée si besoin.
+
+        Args:
+            key: Clé de l'entrée.
+            value: Valeur à mettre en cache.
+        """
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        evicted = []
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+            self._data[key] = (value, expires_at)
+            while len(self._data) > self.maxsize:
+                evicted.append(self._data.popitem(last=False))
+                self.evictions += 1
+        if self.on_evict is not None:
+            for evicted_key, (evicted_value, _) in evicted:
+                self.on_evict(evicted_key, evicted_value)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Retire une entrée du cache.
+
+        Args:
+            key: Clé de l'entrée.
+            default: Valeur retournée si la clé est absente.
+
+        Returns:
+            La valeur retirée ou `default`.
+        """
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[0]
+
+    def clear(self) -> None:
+        """Vide le cache."""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retourne les statistiques d'utilisation du cache.
+
+        Returns:
+            Taille, capacité, hits, misses, évictions et taux de hit.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+        return entry is not _MISSING and (entry[1] is None or entry[1] > time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,194 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(content: str) -> str:
+    """
+    Calcule l'empreinte du contenu d'un fichier généré.
+
+    Args:
+        content: Contenu du fichier.
+
+    Returns:
+        Empreinte SHA-256 du contenu.
+    """
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class CodebaseManifest:
+    """
+    Manifeste du code généré d'un projet : pour chaque fichier, l'empreinte des
+    entrées de sa génération (`inputs`) et celle du contenu produit (`output`).
+
+    Un fichier dont l'empreinte des entrées n'a pas changé n'a pas à être
+    régénéré ; un fichier régénéré dont le contenu n'a pas changé n'a pas à
+    être poussé.
+    """
+
+    def __init__(self, entries: Optional[Dict[str, Dict[str, str]]] = None):
+        """
+        Args:
+            entries: Entrées d'un manifeste existant (`{chemin: {"inputs": ..., "output": ...}}`).
+        """
+        self.entries: Dict[str, Dict[str, str]] = dict(entries or {})
+
+    def is_current(self, path: str, inputs_hash: str) -> bool:
+        """
+        Indique si un fichier a déjà été généré à partir des mêmes entrées.
+
+        Args:
+            path: Chemin du fichier.
+            inputs_hash: Empreinte des entrées de sa génération.
+
+        Returns:
+            True si le fichier n'a pas à être régénéré.
+        """
+        entry = self.entries.get(path)
+        return entry is not None and entry["inputs"] == inputs_hash
+
+    def record(self, path: str, inputs_hash: str, content: str) -> bool:
+        """
+        Enregistre un fichier généré.
+
+        Args:
+            path: Chemin du fichier.
+            inputs_hash: Empreinte des entrées de sa génération.
+            content: Contenu généré.
+
+        Returns:
+            True si le contenu diffère de celui du manifeste (le fichier est à pousser).
+        """
+        output = content_hash(content)
+        previous = self.entries.get(path)
+        self.entries[path] = {"inputs": inputs_hash, "output": output}
+        return previous is None or previous["output"] != output
+
+    def prune(self, paths: Iterable[str]) -> List[str]:
+        """
+        Retire du manifeste les fichiers qui ne font plus partie du projet.
+
+        Args:
+            paths: Chemins des fichiers du projet.
+
+        Returns:
+            Chemins retirés (fichiers à supprimer du dépôt).
+        """
+        keep = set(paths)
+        removed = [path for path in self.entries if path not in keep]
+        for path in removed:
+            del self.entries[path]
+        return removed
+
+    def to_dict(self) -> Dict[str, Dict[str, str]]:
+        """Entrées du manifeste, sérialisables en JSON."""
+        return dict(self.entries)
+
+
+class ManifestStore:
+    """
+    Stockage des manifestes de code généré, par projet (dépôt cible).
+
+    Les manifestes sont conservés dans SQLite, ou uniquement en mémoire si
+    aucun chemin n'est fourni. Les accès étant synchrones, ils sont faits via
+    `asyncio.to_thread` depuis la boucle asyncio.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: Chemin du fichier SQLite (None pour un stockage en mémoire).
+        """
+        self.path = path
+        self._memory: Dict[str, str] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        if path is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS codebase_manifests (
+                    project TEXT PRIMARY KEY,
+                    manifest TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+
+    def get(self, project: str) -> CodebaseManifest:
+        """
+        Retourne le manifeste d'un projet.
+
+        Args:
+            project: Identifiant du projet (ex. `org/depot`).
+
+        Returns:
+            Le manifeste (vide si le projet n'a jamais été généré).
+        """
+        if self._conn is None:
+            encoded = self._memory.get(project)
+        else:
+            try:
+                with self._lock:
+                    row = self._conn.execute(
+                        "SELECT manifest FROM codebase_manifests WHERE project = ?", (project,)
+                    ).fetchone()
+            except sqlite3.Error as e:
+                logger.error(f"Erreur lors de la lecture du manifeste de {project}: {str(e)}")
+                row = None
+            encoded = row[0] if row else None
+        return CodebaseManifest(json.loads(encoded) if encoded else None)
+
+    def save(self, project: str, manifest: CodebaseManifest) -> None:
+        """
+        Enregistre le manifeste d'un projet.
+
+        Args:
+            project: Identifiant du projet.
+            manifest: Manifeste à enregistrer.
+        """
+        encoded = json.dumps(manifest.to_dict(), sort_keys=True, separators=(",", ":"))
+        if self._conn is None:
+            self._memory[project] = encoded
+            return
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO codebase_manifests (project, manifest, updated_at) VALUES (?, ?, ?)",
+                    (project, encoded, time.time()),
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Erreur lors de l'écriture du manifeste de {project}: {str(e)}")
+
+    def close(self) -> None:
+        """Ferme le stockage."""
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+            self._conn = None
+
+
+def create_manifest_store(url: str) -> ManifestStore:
+    """
+    Crée le stockage des manifestes correspondant à une URL.
+
+    Args:
+        url: URL du stockage (`sqlite:///chemin.db` ou `memory://`).
+
+    Returns:
+        Le stockage des manifestes.
+    """
+    if url.startswith("memory://"):
+        return ManifestStore(None)
+    if url.startswith("sqlite:///"):
+        return ManifestStore(url[len("sqlite:///"):])
+    raise ValueError(f"Backend de stockage des manifestes non supporté: {url}")
@@ -25,6 +25,19 @@ class Settings(BaseSettings):
     # Configuration de la base de données (exemple avec SQLite pour le développement)
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./test.db")
     
+    # Stockage des statuts de pipeline (durée de conservation et cache de lecture)
+    STATUS_STORE_TTL_SECONDS: float = float(os.getenv("STATUS_STORE_TTL_SECONDS", str(7 * 24 * 3600)))
+    STATUS_CACHE_SIZE: int = int(os.getenv("STATUS_CACHE_SIZE", "10000"))
+    STATUS_CACHE_TTL_SECONDS: float = float(os.getenv("STATUS_CACHE_TTL_SECONDS", "5.0"))
+    
+    # Suivi des statuts en push (durée maximale d'un long-poll, intervalle des heartbeats SSE/WebSocket)
+    STATUS_LONG_POLL_MAX_SECONDS: float = float(os.getenv("STATUS_LONG_POLL_MAX_SECONDS", "60"))
+    STATUS_STREAM_HEARTBEAT_SECONDS: float = float(os.getenv("STATUS_STREAM_HEARTBEAT_SECONDS", "15"))
+    
+    # Listing des pipelines (taille de page par défaut et maximale)
+    PIPELINES_PAGE_SIZE: int = int(os.getenv("PIPELINES_PAGE_SIZE", "100"))
+    PIPELINES_PAGE_MAX_SIZE: int = int(os.getenv("PIPELINES_PAGE_MAX_SIZE", "10000"))
+    
     # Configuration de n8n
     N8N_API_URL: str = os.getenv("N8N_API_URL", "http://n8n:5678")
     N8N_API_KEY: str = os.getenv("N8N_API_KEY", "")
@@ -32,10 +45,90 @@ class Settings(BaseSettings):
     # Configuration de Windmill
     WINDMILL_API_URL: str = os.getenv("WINDMILL_API_URL", "http://windmill:8000")
     WINDMILL_API_KEY: str = os.getenv("WINDMILL_API_KEY", "")
+    WINDMILL_WORKSPACE: str = os.getenv("WINDMILL_WORKSPACE", "mlops")
+    WINDMILL_FLOW_PATH: str = os.getenv("WINDMILL_FLOW_PATH", "f/mlops/ml_pipeline_deployment")
+    
+    # Client HTTP Windmill (timeout, pool de connexions partagé, HTTP/2)
+    WINDMILL_TIMEOUT_SECONDS: float = float(os.getenv("WINDMILL_TIMEOUT_SECONDS", "10"))
+    WINDMILL_MAX_CONNECTIONS: int = int(os.getenv("WINDMILL_MAX_CONNECTIONS", "100"))
+    WINDMILL_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("WINDMILL_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    WINDMILL_HTTP2: bool = os.getenv("WINDMILL_HTTP2", "True").lower() in ("true", "1", "t")
+    
+    # Résilience des appels Windmill (nouvelles tentatives et circuit breaker)
+    WINDMILL_MAX_RETRIES: int = int(os.getenv("WINDMILL_MAX_RETRIES", "3"))
+    WINDMILL_RETRY_BACKOFF_SECONDS: float = float(os.getenv("WINDMILL_RETRY_BACKOFF_SECONDS", "0.2"))
+    WINDMILL_RETRY_BACKOFF_MAX_SECONDS: float = float(os.getenv("WINDMILL_RETRY_BACKOFF_MAX_SECONDS", "5"))
+    WINDMILL_CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("WINDMILL_CIRCUIT_FAILURE_THRESHOLD", "5"))
+    WINDMILL_CIRCUIT_RESET_SECONDS: float = float(os.getenv("WINDMILL_CIRCUIT_RESET_SECONDS", "30"))
+    
+    # Suivi des jobs Windmill (intervalle de relevé et durée maximale de suivi)
+    WINDMILL_POLL_INTERVAL_SECONDS: float = float(os.getenv("WINDMILL_POLL_INTERVAL_SECONDS", "5"))
+    WINDMILL_JOB_TIMEOUT_SECONDS: float = float(os.getenv("WINDMILL_JOB_TIMEOUT_SECONDS", "3600"))
     
     # Configuration de Terraform
     TERRAFORM_WORKING_DIR: str = os.getenv("TERRAFORM_WORKING_DIR", "/tmp/terraform")
     
+    # Cache du code Terraform généré (nombre d'entrées et durée de vie)
+    TERRAFORM_CACHE_SIZE: int = int(os.getenv("TERRAFORM_CACHE_SIZE", "1024"))
+    TERRAFORM_CACHE_TTL_SECONDS: float = float(os.getenv("TERRAFORM_CACHE_TTL_SECONDS", "3600"))
+    
+    # Déploiements par lots (nombre de processus, 0 pour un par cœur, et taille maximale d'un lot)
+    BATCH_MAX_WORKERS: int = int(os.getenv("BATCH_MAX_WORKERS", "0"))
+    BATCH_MAX_SIZE: int = int(os.getenv("BATCH_MAX_SIZE", "500"))
+    
+    # File de déploiement asynchrone (capacité et nombre de workers)
+    DEPLOY_QUEUE_MAXSIZE: int = int(os.getenv("DEPLOY_QUEUE_MAXSIZE", "1000"))
+    DEPLOY_WORKERS: int = int(os.getenv("DEPLOY_WORKERS", "4"))
+    
+    # Clés d'idempotence des déploiements (nombre de clés mémorisées et durée de conservation)
+    IDEMPOTENCY_CACHE_SIZE: int = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000"))
+    IDEMPOTENCY_KEY_TTL_SECONDS: float = float(os.getenv("IDEMPOTENCY_KEY_TTL_SECONDS", str(24 * 3600)))
+    
+    # Délestage des routes coûteuses (/pipelines/deploy, /autopilot/*) sous forte charge,
+    # selon les mêmes seuils que cpu_throttler (CPU en %, load average)
+    LOAD_SHEDDING_ENABLED: bool = os.getenv("LOAD_SHEDDING_ENABLED", "True").lower() in ("true", "1", "t")
+    LOAD_SHEDDING_CPU_THRESHOLD: float = float(os.getenv("LOAD_SHEDDING_CPU_THRESHOLD", os.getenv("CPU_THRESHOLD", "90.0")))
+    LOAD_SHEDDING_LOAD_AVG_THRESHOLD: float = float(os.getenv("LOAD_SHEDDING_LOAD_AVG_THRESHOLD", os.getenv("LOAD_AVG_THRESHOLD", "6.0")))
+    LOAD_SHEDDING_REFRESH_SECONDS: float = float(os.getenv("LOAD_SHEDDING_REFRESH_SECONDS", "1.0"))
+    
+    # Mise en attente des requêtes délestées (durée maximale, nombre maximum) avant refus (503)
+    LOAD_SHEDDING_QUEUE_TIMEOUT_SECONDS: float = float(os.getenv("LOAD_SHEDDING_QUEUE_TIMEOUT_SECONDS", "2.0"))
+    LOAD_SHEDDING_MAX_QUEUED: int = int(os.getenv("LOAD_SHEDDING_MAX_QUEUED", "100"))
+    LOAD_SHEDDING_RETRY_AFTER_SECONDS: int = int(os.getenv("LOAD_SHEDDING_RETRY_AFTER_SECONDS", "5"))
+    
+    # Cache des réponses LLM de l'Autopilot Engine (`sqlite:///chemin.db` ou `memory://`)
+    LLM_CACHE_URL: str = os.getenv("LLM_CACHE_URL", "sqlite:///./llm_cache.db")
+    LLM_CACHE_MEMORY_SIZE: int = int(os.getenv("LLM_CACHE_MEMORY_SIZE", "1024"))
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "100000"))
+    LLM_CACHE_TTL_SECONDS: float = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    
+    # Intervalle des sondes de santé des backends LLM (sélection du modèle selon la latence)
+    LLM_PROBE_INTERVAL_SECONDS: float = float(os.getenv("LLM_PROBE_INTERVAL_SECONDS", "30"))
+    
+    # Regroupement des appels LLM concurrents à un même modèle (fenêtre de 0 pour désactiver)
+    LLM_BATCH_WINDOW_SECONDS: float = float(os.getenv("LLM_BATCH_WINDOW_SECONDS", "0.005"))
+    LLM_BATCH_MAX_SIZE: int = int(os.getenv("LLM_BATCH_MAX_SIZE", "16"))
+    
+    # Budget des tâches LLM par période, dans l'unité de `SmartLLMRouter.TIER_COST` (0 pour ne pas limiter)
+    LLM_BUDGET: float = float(os.getenv("LLM_BUDGET", "0"))
+    LLM_BUDGET_PERIOD_SECONDS: float = float(os.getenv("LLM_BUDGET_PERIOD_SECONDS", "3600"))
+    
+    # Requêtes de couverture : appel doublé vers un autre backend au-delà du percentile de latence
+    # (part maximale d'appels doublés, 0 pour désactiver)
+    LLM_HEDGE_MAX_RATIO: float = float(os.getenv("LLM_HEDGE_MAX_RATIO", "0.1"))
+    LLM_HEDGE_PERCENTILE: float = float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95"))
+    LLM_HEDGE_MIN_SAMPLES: int = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+    
+    # Manifestes du code généré par projet, pour la régénération incrémentale (`sqlite:///chemin.db` ou `memory://`)
+    CODEBASE_MANIFEST_URL: str = os.getenv("CODEBASE_MANIFEST_URL", "sqlite:///./codebase_manifests.db")
+    
+    # Checkpoints des exécutions de l'Autopilot, pour leur reprise (répertoire local, vide pour désactiver)
+    AUTOPILOT_CHECKPOINT_DIR: str = os.getenv("AUTOPILOT_CHECKPOINT_DIR", "./autopilot_runs")
+    # Durée de conservation des checkpoints d'une exécution (en secondes)
+    AUTOPILOT_CHECKPOINT_TTL_SECONDS: float = float(os.getenv("AUTOPILOT_CHECKPOINT_TTL_SECONDS", "604800"))
+    # Intervalle entre deux purges des checkpoints expirés (en secondes)
+    AUTOPILOT_CHECKPOINT_PURGE_INTERVAL_SECONDS: float = float(os.getenv("AUTOPILOT_CHECKPOINT_PURGE_INTERVAL_SECONDS", "600"))
+    
     class Config:
         case_sensitive = True
 
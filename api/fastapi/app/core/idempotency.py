@@ -0,0 +1,113 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core.cache import LRUCache
+
+
+class IdempotencyConflict(Exception):
+    """Levée lorsqu'une clé d'idempotence est réutilisée pour une requête différente."""
+
+
+class SingleFlight:
+    """
+    Regroupement des appels concurrents portant sur une même clé.
+
+    Tant qu'un appel est en cours pour une clé, les appels suivants avec la même
+    clé n'exécutent rien et attendent son résultat (ou son exception). L'appel
+    partagé se poursuit même si l'un des appelants est annulé.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Exécute `func`, ou attend l'appel déjà en cours pour `key`.
+
+        Args:
+            key: Clé de regroupement.
+            func: Fonction retournant la coroutine à exécuter.
+
+        Returns:
+            Le résultat de l'appel partagé.
+        """
+        task = self._calls.get(key)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            self.coalesced += 1
+        else:
+            self.calls += 1
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+    def in_flight(self) -> int:
+        """Nombre d'appels en cours."""
+        return len(self._calls)
+
+
+class IdempotencyStore:
+    """
+    Mémorisation des réponses associées aux clés d'idempotence (en-tête `Idempotency-Key`).
+
+    Une requête rejouée avec la même clé reçoit la réponse de la première,
+    sans nouvel effet de bord ; des requêtes concurrentes avec la même clé
+    partagent un seul traitement. Seuls les traitements réussis sont mémorisés,
+    afin qu'une requête en échec puisse être réessayée.
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl: Optional[float] = 24 * 3600):
+        """
+        Args:
+            maxsize: Nombre maximum de clés mémorisées.
+            ttl: Durée de conservation d'une clé en secondes.
+        """
+        # Clé -> (empreinte de la requête, réponse)
+        self._responses = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._flights = SingleFlight()
+
+    async def run(self, key: str, fingerprint: str, func: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Exécute une requête au plus une fois par clé d'idempotence.
+
+        Args:
+            key: Clé d'idempotence fournie par le client.
+            fingerprint: Empreinte du contenu de la requête.
+            func: Fonction retournant la coroutine de traitement de la requête.
+
+        Returns:
+            La réponse, et True si elle provient d'une requête précédente.
+
+        Raises:
+            IdempotencyConflict: Si la clé a déjà été utilisée pour une autre requête.
+        """
+        cached = self._responses.get(key)
+        if cached is not None:
+            if cached[0] != fingerprint:
+                raise IdempotencyConflict(key)
+            return cached[1], True
+
+        async def process():
+            response = await func()
+            self._responses.set(key, (fingerprint, response))
+            return fingerprint, response
+
+        flight_fingerprint, response = await self._flights.do(key, process)
+        if flight_fingerprint != fingerprint:
+            raise IdempotencyConflict(key)
+        return response, False
+
+    def stats(self) -> dict:
+        """
+        Retourne les statistiques des clés d'idempotence.
+
+        Returns:
+            Statistiques du cache des réponses et nombre de requêtes regroupées.
+        """
+        return dict(self._responses.stats(), coalesced=self._flights.coalesced)
@@ -0,0 +1,193 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Nombre de temps d'attente récents conservés pour le calcul des percentiles
+WAIT_TIME_SAMPLES = 1024
+
+
+class JobQueueFull(Exception):
+    """Levée lorsqu'un job est soumis alors que la file d'attente est pleine."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"File d'attente pleine, réessayer dans {retry_after} secondes.")
+        self.retry_after = retry_after
+
+
+class JobQueue:
+    """
+    File d'attente bornée de jobs asynchrones, traitée par un pool de workers asyncio.
+
+    Les jobs sont soumis sans attendre (`submit`) ; lorsque la file est pleine,
+    `JobQueueFull` est levée avec une estimation du délai avant de réessayer.
+    La profondeur de la file, l'occupation des workers et les temps d'attente
+    sont exposés via `metrics()`.
+
+    À l'arrêt (`stop`), les jobs en cours sont annulés et les jobs en attente
+    retirés de la file ; chacun de ces jobs abandonnés est signalé à
+    `on_abandon`, afin que l'appelant puisse en publier l'échec.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[str, Any], Awaitable[None]],
+        maxsize: int = 1000,
+        workers: int = 4,
+        name: str = "jobs",
+        on_abandon: Optional[Callable[[str, Any], None]] = None,
+    ):
+        """
+        Args:
+            handler: Coroutine appelée pour chaque job avec `(job_id, payload)`.
+            maxsize: Nombre maximum de jobs en attente.
+            workers: Nombre de workers asyncio.
+            name: Nom de la file (utilisé dans les logs).
+            on_abandon: Fonction appelée avec `(job_id, payload)` pour chaque job
+                abandonné à l'arrêt de la file.
+        """
+        self.handler = handler
+        self.on_abandon = on_abandon
+        self.maxsize = maxsize
+        self.workers = workers
+        self.name = name
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._busy = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._abandoned = 0
+        self._wait_times: deque = deque(maxlen=WAIT_TIME_SAMPLES)
+        self._service_times: deque = deque(maxlen=WAIT_TIME_SAMPLES)
+
+    @property
+    def running(self) -> bool:
+        """Indique si les workers tournent sur la boucle asyncio courante."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        return self._loop is loop and not loop.is_closed() and any(not t.done() for t in self._tasks)
+
+    async def start(self) -> None:
+        """Démarre les workers sur la boucle asyncio courante."""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"{self.name}-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Arrête les workers ; les jobs en cours et en attente sont abandonnés (voir `on_abandon`)."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._queue is None:
+            return
+        while True:
+            try:
+                job_id, payload, _ = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            self._queue.task_done()
+            self._abandon(job_id, payload)
+
+    def _abandon(self, job_id: str, payload: Any) -> None:
+        self._abandoned += 1
+        if self.on_abandon is None:
+            logger.warning(f"Job {job_id} abandonné à l'arrêt de la file {self.name}")
+            return
+        try:
+            self.on_abandon(job_id, payload)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'abandon du job {job_id} ({self.name}): {str(e)}")
+
+    async def submit(self, job_id: str, payload: Any) -> None:
+        """
+        Ajoute un job à la file sans attendre son traitement.
+
+        Args:
+            job_id: ID du job.
+            payload: Données transmises au handler.
+
+        Raises:
+            JobQueueFull: Si la file d'attente est pleine.
+        """
+        await self.start()
+        try:
+            self._queue.put_nowait((job_id, payload, time.monotonic()))
+        except asyncio.QueueFull:
+            self._rejected += 1
+            raise JobQueueFull(self.retry_after())
+        self._submitted += 1
+
+    def retry_after(self) -> int:
+        """
+        Estime le délai (en secondes) avant qu'une place se libère dans la file.
+
+        Returns:
+            Délai estimé, d'au moins une seconde.
+        """
+        depth = self._queue.qsize() if self._queue is not None else 0
+        service_time = sum(self._service_times) / len(self._service_times) if self._service_times else 1.0
+        return max(1, int(depth * service_time / max(self.workers, 1)) + 1)
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Retourne les métriques de la file d'attente.
+
+        Returns:
+            Profondeur, capacité, occupation des workers, compteurs (dont les
+            jobs abandonnés à l'arrêt) et temps
+            d'attente (moyenne, p50, p95, max) en secondes.
+        """
+        waits = sorted(self._wait_times)
+
+        def percentile(p: float) -> float:
+            return waits[min(len(waits) - 1, int(p * len(waits)))] if waits else 0.0
+
+        return {
+            "depth": self._queue.qsize() if self._queue is not None else 0,
+            "maxsize": self.maxsize,
+            "workers": self.workers,
+            "busy_workers": self._busy,
+            "submitted": self._submitted,
+            "completed": self._completed,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "abandoned": self._abandoned,
+            "wait_time_avg": sum(waits) / len(waits) if waits else 0.0,
+            "wait_time_p50": percentile(0.50),
+            "wait_time_p95": percentile(0.95),
+            "wait_time_max": waits[-1] if waits else 0.0,
+        }
+
+    async def _worker(self) -> None:
+        while True:
+            job_id, payload, enqueued_at = await self._queue.get()
+            started_at = time.monotonic()
+            self._wait_times.append(started_at - enqueued_at)
+            self._busy += 1
+            try:
+                await self.handler(job_id, payload)
+                self._completed += 1
+            except asyncio.CancelledError:
+                self._abandon(job_id, payload)
+                raise
+            except Exception as e:
+                self._failed += 1
+                logger.error(f"Erreur lors du traitement du job {job_id} ({self.name}): {str(e)}")
+            finally:
+                self._busy -= 1
+                self._service_times.append(time.monotonic() - started_at)
+                self._queue.task_done()
@@ -0,0 +1,112 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Set, Tuple
+
+# Fonction d'appel groupé : reçoit les entrées d'un lot et retourne un résultat par entrée
+BatchCall = Callable[[List[Any]], Awaitable[List[Any]]]
+
+
+class _Batch:
+    __slots__ = ("call", "items", "futures", "timer")
+
+    def __init__(self, call: BatchCall):
+        self.call = call
+        self.items: List[Any] = []
+        self.futures: List[asyncio.Future] = []
+        self.timer: Any = None
+
+
+class MicroBatcher:
+    """
+    Regroupement des appels concurrents à un même modèle en un seul appel.
+
+    Le premier appel soumis pour une clé (ex. fournisseur et modèle) ouvre un
+    lot ; les appels suivants pour la même clé le rejoignent jusqu'à
+    l'expiration de la fenêtre `window` ou jusqu'à `max_batch_size` entrées. Le
+    lot est alors envoyé en un seul appel groupé et chaque appelant reçoit son
+    propre résultat. Un élément du résultat qui est une exception est levé chez
+    l'appelant correspondant ; l'échec de l'appel groupé est levé chez tous les
+    appelants du lot.
+    """
+
+    def __init__(self, window: float = 0.005, max_batch_size: int = 16):
+        """
+        Args:
+            window: Durée maximale d'attente d'un lot avant son envoi (en secondes).
+            max_batch_size: Nombre maximal d'entrées par lot.
+        """
+        self.window = window
+        self.max_batch_size = max(1, max_batch_size)
+        self.batches = 0
+        self.batched_items = 0
+        self._pending: Dict[Tuple[asyncio.AbstractEventLoop, Hashable], _Batch] = {}
+        self._running: Set[asyncio.Task] = set()
+
+    async def submit(self, key: Hashable, item: Any, call: BatchCall) -> Any:
+        """
+        Ajoute une entrée au lot ouvert pour une clé et attend son résultat.
+
+        Args:
+            key: Clé de regroupement (seules les entrées de même clé partagent un lot).
+            item: Entrée de l'appel (ex. un prompt).
+            call: Fonction d'appel groupé ; celle du premier appelant du lot est utilisée.
+
+        Returns:
+            Le résultat correspondant à l'entrée.
+        """
+        loop = asyncio.get_running_loop()
+        slot = (loop, key)
+        batch = self._pending.get(slot)
+        if batch is None:
+            batch = self._pending[slot] = _Batch(call)
+            batch.timer = loop.call_later(self.window, self._flush, slot)
+        future = loop.create_future()
+        batch.items.append(item)
+        batch.futures.append(future)
+        if len(batch.items) >= self.max_batch_size:
+            self._flush(slot)
+        return await future
+
+    def _flush(self, slot: Tuple[asyncio.AbstractEventLoop, Hashable]) -> None:
+        batch = self._pending.pop(slot, None)
+        if batch is None:
+            return
+        batch.timer.cancel()
+        self.batches += 1
+        self.batched_items += len(batch.items)
+        task = slot[0].create_task(self._run(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: _Batch) -> None:
+        try:
+            results = await batch.call(batch.items)
+            if len(results) != len(batch.items):
+                raise RuntimeError(
+                    f"L'appel groupé a retourné {len(results)} résultats pour {len(batch.items)} entrées"
+                )
+        except Exception as e:
+            for future in batch.futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future, result in zip(batch.futures, results):
+            if future.done():
+                # Appelant annulé entre-temps
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retourne les statistiques de regroupement.
+
+        Returns:
+            Nombre de lots envoyés, d'entrées regroupées et taille moyenne des lots.
+        """
+        return {
+            "batches": self.batches,
+            "batched_items": self.batched_items,
+            "mean_batch_size": self.batched_items / self.batches if self.batches else 0.0,
+        }
@@ -0,0 +1,314 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.core.cache import LRUCache
+from app.core.idempotency import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Nombre d'écritures entre deux purges (entrées expirées et dépassement de taille) du stockage disque
+PURGE_EVERY = 100
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(text: str) -> str:
+    """
+    Normalise un texte soumis à un LLM pour le calcul de la clé de cache.
+
+    Les variations sans effet sur la réponse attendue (forme Unicode, espaces
+    et retours à la ligne multiples, espaces en début et fin) donnent le même texte.
+
+    Args:
+        text: Texte à normaliser (ex. un blueprint).
+
+    Returns:
+        Texte normalisé.
+    """
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def llm_cache_key(operation: str, model: str, prompt_version: str, payload: Any) -> str:
+    """
+    Calcule la clé de cache d'un appel LLM.
+
+    Args:
+        operation: Nom de l'opération (ex. `analyze_blueprint`).
+        model: Identifiant du modèle appelé.
+        prompt_version: Version du prompt ; l'incrémenter invalide les réponses en cache.
+        payload: Entrée de l'appel (texte normalisé ou structure sérialisable en JSON).
+
+    Returns:
+        Empreinte SHA-256 de l'appel.
+    """
+    canonical = json.dumps([operation, model, prompt_version, payload], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Cache persistant des réponses LLM : LRU en mémoire devant un stockage SQLite.
+
+    Une réponse est cherchée d'abord en mémoire, puis sur disque (elle est alors
+    remontée en mémoire), et n'est calculée qu'en cas d'absence ; des appels
+    concurrents pour une même clé partagent un seul calcul. Les réponses sont
+    conservées sérialisées en JSON, de sorte qu'un appelant qui modifie la réponse
+    reçue n'altère pas le cache. Les entrées expirent après `ttl` secondes et le
+    stockage disque est borné à `max_entries` entrées (les moins récemment lues
+    sont supprimées).
+
+    Depuis la boucle asyncio (`get_or_compute`, `get_async`, `set_async`), seul
+    le LRU en mémoire est consulté sur la boucle : les lectures, écritures et
+    purges SQLite sont faites dans un thread (`asyncio.to_thread`).
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        memory_size: int = 1024,
+        max_entries: int = 100_000,
+        ttl: Optional[float] = 7 * 24 * 3600,
+    ):
+        """
+        Args:
+            path: Chemin du fichier SQLite (None pour un cache uniquement en mémoire).
+            memory_size: Nombre maximum de réponses gardées en mémoire.
+            max_entries: Nombre maximum de réponses conservées sur disque.
+            ttl: Durée de vie d'une réponse en secondes (None pour ne jamais expirer).
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._memory = LRUCache(maxsize=memory_size, ttl=ttl)
+        self._flights = SingleFlight()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if path is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS llm_responses (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_llm_responses_accessed ON llm_responses (accessed_at);
+                """
+            )
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Retourne la réponse en cache pour une clé.
+
+        Args:
+            key: Clé de l'appel (voir `llm_cache_key`).
+
+        Returns:
+            La réponse, ou None si elle est absente ou expirée.
+        """
+        encoded = self._memory.get(key)
+        if encoded is not None:
+            self.memory_hits += 1
+            return json.loads(encoded)
+        return self._loaded(key, self._load(key))
+
+    async def get_async(self, key: str) -> Optional[Any]:
+        """
+        Retourne la réponse en cache pour une clé, sans bloquer la boucle asyncio.
+
+        Args:
+            key: Clé de l'appel (voir `llm_cache_key`).
+
+        Returns:
+            La réponse, ou None si elle est absente ou expirée.
+        """
+        encoded = self._memory.get(key)
+        if encoded is not None:
+            self.memory_hits += 1
+            return json.loads(encoded)
+        if self._conn is None:
+            return self._loaded(key, None)
+        return self._loaded(key, await asyncio.to_thread(self._load, key))
+
+    def _loaded(self, key: str, encoded: Optional[str]) -> Optional[Any]:
+        # Résultat de la lecture sur disque : comptage et remontée en mémoire
+        if encoded is None:
+            self.misses += 1
+            return None
+        self.disk_hits += 1
+        self._memory.set(key, encoded)
+        return json.loads(encoded)
+
+    def set(self, key: str, response: Any) -> None:
+        """
+        Enregistre une réponse en mémoire et sur disque.
+
+        Args:
+            key: Clé de l'appel.
+            response: Réponse sérialisable en JSON.
+        """
+        encoded = json.dumps(response, ensure_ascii=False, separators=(",", ":"))
+        self._memory.set(key, encoded)
+        self._store(key, encoded)
+
+    async def set_async(self, key: str, response: Any) -> None:
+        """
+        Enregistre une réponse en mémoire et sur disque, sans bloquer la boucle asyncio.
+
+        Args:
+            key: Clé de l'appel.
+            response: Réponse sérialisable en JSON.
+        """
+        encoded = json.dumps(response, ensure_ascii=False, separators=(",", ":"))
+        self._memory.set(key, encoded)
+        if self._conn is not None:
+            await asyncio.to_thread(self._store, key, encoded)
+
+    def _store(self, key: str, encoded: str) -> None:
+        if self._conn is None:
+            return
+        now = time.time()
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_responses (key, response, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, encoded, now, now),
+                )
+                self._writes += 1
+                if self._writes % PURGE_EVERY == 0:
+                    self._purge(now)
+        except sqlite3.Error as e:
+            logger.error(f"Erreur lors de l'écriture d'une réponse LLM en cache: {str(e)}")
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Retourne la réponse en cache, ou la calcule et la met en cache.
+
+        Args:
+            key: Clé de l'appel.
+            compute: Fonction retournant la coroutine de l'appel au LLM.
+
+        Returns:
+            La réponse (en cache ou calculée).
+        """
+        response = await self.get_async(key)
+        if response is not None:
+            return response
+
+        async def compute_and_store() -> str:
+            result = await compute()
+            await self.set_async(key, result)
+            return json.dumps(result, ensure_ascii=False)
+
+        return json.loads(await self._flights.do(key, compute_and_store))
+
+    def _load(self, key: str) -> Optional[str]:
+        if self._conn is None:
+            return None
+        now = time.time()
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT response, created_at FROM llm_responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                if self.ttl is not None and row[1] + self.ttl <= now:
+                    self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                    return None
+                self._conn.execute("UPDATE llm_responses SET accessed_at = ? WHERE key = ?", (now, key))
+        except sqlite3.Error as e:
+            logger.error(f"Erreur lors de la lecture d'une réponse LLM en cache: {str(e)}")
+            return None
+        return row[0]
+
+    def _purge(self, now: float) -> None:
+        if self.ttl is not None:
+            self._conn.execute("DELETE FROM llm_responses WHERE created_at <= ?", (now - self.ttl,))
+        excess = self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0] - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM llm_responses WHERE key IN "
+                "(SELECT key FROM llm_responses ORDER BY accessed_at LIMIT ?)",
+                (excess,),
+            )
+
+    def disk_size(self) -> int:
+        """Nombre de réponses conservées sur disque."""
+        if self._conn is None:
+            return 0
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+
+    @property
+    def hit_rate(self) -> float:
+        """Part des lectures servies par le cache (mémoire ou disque)."""
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retourne les statistiques d'utilisation du cache.
+
+        Returns:
+            Hits en mémoire et sur disque, misses, taux de hit, tailles et évictions.
+        """
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "memory_size": len(self._memory),
+            "memory_evictions": self._memory.evictions,
+            "disk_size": self.disk_size(),
+        }
+
+    def close(self) -> None:
+        """Ferme le stockage disque."""
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+            self._conn = None
+
+
+def create_llm_cache(
+    cache_url: str,
+    memory_size: int = 1024,
+    max_entries: int = 100_000,
+    ttl: Optional[float] = 7 * 24 * 3600,
+) -> LLMResponseCache:
+    """
+    Crée le cache des réponses LLM correspondant à une URL.
+
+    Args:
+        cache_url: URL du stockage (`sqlite:///chemin.db` ou `memory://`).
+        memory_size: Nombre maximum de réponses gardées en mémoire.
+        max_entries: Nombre maximum de réponses conservées sur disque.
+        ttl: Durée de vie d'une réponse en secondes.
+
+    Returns:
+        Le cache des réponses LLM.
+    """
+    if cache_url.startswith("memory://"):
+        return LLMResponseCache(None, memory_size=memory_size, max_entries=max_entries, ttl=ttl)
+    if cache_url.startswith("sqlite:///"):
+        return LLMResponseCache(cache_url[len("sqlite:///"):], memory_size=memory_size, max_entries=max_entries, ttl=ttl)
+    raise ValueError(f"Backend de cache LLM non supporté: {cache_url}")
@@ -0,0 +1,305 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+# Locataire et priorité des appels LLM de la requête en cours, renseignés par les
+# endpoints (en-têtes `X-Tenant-ID` et `X-Priority`) et lus par le routeur LLM
+task_context: ContextVar[Tuple[str, int]] = ContextVar("llm_task_context", default=("default", 0))
+
+
+class BudgetExceeded(RuntimeError):
+    """Levée lorsque le budget de la période ne permet plus d'exécuter une tâche, même sur un niveau plus léger."""
+
+
+class Grant:
+    """
+    Autorisation d'exécuter une tâche sur un niveau de modèle (`tier`), éventuellement plus léger que demandé.
+
+    `held` indique si l'autorisation occupe une place du niveau.
+    """
+
+    __slots__ = ("tier", "requested_tier", "tenant", "cost", "waited", "held")
+
+    def __init__(self, tier: str, requested_tier: str, tenant: str, cost: float, waited: float, held: bool = True):
+        self.tier = tier
+        self.requested_tier = requested_tier
+        self.tenant = tenant
+        self.cost = cost
+        self.waited = waited
+        self.held = held
+
+    @property
+    def downgraded(self) -> bool:
+        """Indique si la tâche s'exécute sur un niveau plus léger que celui demandé."""
+        return self.tier != self.requested_tier
+
+
+class _Waiter:
+    __slots__ = ("future", "tenant", "priority", "seq", "tokens", "requested_tier", "enqueued_at", "cost")
+
+    def __init__(self, future, tenant, priority, seq, tokens, requested_tier, enqueued_at, cost):
+        self.future = future
+        self.tenant = tenant
+        self.priority = priority
+        self.seq = seq
+        self.tokens = tokens
+        self.requested_tier = requested_tier
+        self.enqueued_at = enqueued_at
+        self.cost = cost
+
+
+class TierScheduler:
+    """
+    Ordonnancement des tâches LLM par niveau de modèle.
+
+    Chaque niveau exécute au plus `limits[niveau]` tâches simultanées ; les
+    suivantes attendent dans la file du niveau. Lorsqu'une place se libère, la
+    tâche de plus haute priorité est servie ; à priorité égale, celle du
+    locataire le moins servi sur ce niveau (équité entre locataires), puis la
+    plus ancienne. Une tâche qui l'accepte (`allow_downgrade`) est exécutée
+    sans attendre sur un niveau plus léger (`downgrade`) lorsque le sien est
+    saturé.
+
+    Le coût estimé d'une tâche (tokens × coût du niveau pour 1000 tokens) est
+    imputé au budget de la période en cours ; une tâche qui dépasserait le
+    budget est déclassée vers un niveau moins cher si elle l'accepte, sinon
+    refusée (`BudgetExceeded`). Le coût d'une tâche mise en attente est réservé
+    dès sa mise en file (et rendu si elle est annulée), de sorte que les tâches
+    en attente ne puissent pas, ensemble, dépasser le budget.
+
+    Une tâche peut aussi être admise sans occuper de place (`hold=False`) :
+    seuls le niveau et le budget sont alors décidés, les places étant prises
+    par ailleurs (ex. une par appel groupé au fournisseur).
+    """
+
+    def __init__(
+        self,
+        limits: Dict[str, int],
+        downgrade: Optional[Dict[str, str]] = None,
+        tier_costs: Optional[Dict[str, float]] = None,
+        budget: Optional[float] = None,
+        budget_period: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            limits: Nombre maximum de tâches simultanées par niveau.
+            downgrade: Niveau plus léger vers lequel déclasser chaque niveau.
+            tier_costs: Coût de 1000 tokens par niveau.
+            budget: Coût maximum par période (None pour ne pas limiter).
+            budget_period: Durée d'une période de budget (en secondes).
+            clock: Horloge (en secondes).
+        """
+        self.limits = dict(limits)
+        self.downgrade = dict(downgrade or {})
+        self.tier_costs = dict(tier_costs or {})
+        self.budget = budget
+        self.budget_period = budget_period
+        self.clock = clock
+        self.active: Dict[str, int] = {tier: 0 for tier in self.limits}
+        self.admitted: Dict[str, int] = {tier: 0 for tier in self.limits}
+        self.wait_seconds: Dict[str, float] = {tier: 0.0 for tier in self.limits}
+        self.downgrades = 0
+        self.budget_rejected = 0
+        self.budget_spent = 0.0
+        self.budget_spent_total = 0.0
+        # Coût réservé par les tâches en attente
+        self.budget_reserved = 0.0
+        self._period_started = clock()
+        self._waiters: Dict[str, List[_Waiter]] = {}
+        self._served: Dict[Tuple[str, str], int] = {}
+        self._seq = 0
+
+    def limit(self, tier: str) -> int:
+        """Nombre maximum de tâches simultanées d'un niveau (1 s'il n'est pas configuré)."""
+        return self.limits.get(tier, 1)
+
+    def cost(self, tier: str, tokens: int) -> float:
+        """Coût estimé d'une tâche de `tokens` tokens sur un niveau."""
+        return tokens / 1000 * self.tier_costs.get(tier, 0.0)
+
+    def queued(self, tier: str) -> int:
+        """Nombre de tâches en attente sur un niveau."""
+        return len(self._waiters.get(tier, ()))
+
+    def saturated(self, tier: str) -> bool:
+        """Indique si une nouvelle tâche du niveau devrait attendre une place."""
+        return bool(self._waiters.get(tier)) or self.active.get(tier, 0) >= self.limit(tier)
+
+    def _roll_budget(self) -> None:
+        now = self.clock()
+        if now - self._period_started >= self.budget_period:
+            self._period_started = now
+            self.budget_spent = 0.0
+
+    def _affordable(self, tier: str, tokens: int) -> bool:
+        return self.budget is None or self.budget_spent + self.budget_reserved + self.cost(tier, tokens) <= self.budget
+
+    def _grant(
+        self, tier: str, requested_tier: str, tenant: str, tokens: int, waited: float, held: bool = True
+    ) -> Grant:
+        cost = self.cost(tier, tokens)
+        if held:
+            self.active[tier] = self.active.get(tier, 0) + 1
+        self.admitted[tier] = self.admitted.get(tier, 0) + 1
+        self.wait_seconds[tier] = self.wait_seconds.get(tier, 0.0) + waited
+        self.budget_spent += cost
+        self.budget_spent_total += cost
+        self._served[(tier, tenant)] = self._served.get((tier, tenant), 0) + 1
+        if tier != requested_tier:
+            self.downgrades += 1
+        return Grant(tier, requested_tier, tenant, cost, waited, held)
+
+    async def acquire(
+        self,
+        tier: str,
+        tenant: str = "default",
+        priority: int = 0,
+        allow_downgrade: bool = False,
+        tokens: int = 0,
+        hold: bool = True,
+    ) -> Grant:
+        """
+        Attend une place pour une tâche (à libérer avec `release`).
+
+        Args:
+            tier: Niveau de modèle demandé.
+            tenant: Locataire à l'origine de la tâche.
+            priority: Priorité de la tâche (plus haut = servie d'abord).
+            allow_downgrade: Autorise l'exécution sur un niveau plus léger.
+            tokens: Nombre de tokens estimé de la tâche (pour le budget).
+            hold: Occupe une place du niveau ; sinon la tâche est admise sans attendre
+                (niveau et budget seulement).
+
+        Returns:
+            L'autorisation, avec le niveau retenu.
+
+        Raises:
+            BudgetExceeded: Si aucun niveau acceptable ne tient dans le budget.
+        """
+        self._roll_budget()
+        candidates = [tier]
+        while allow_downgrade and candidates[-1] in self.downgrade and self.downgrade[candidates[-1]] not in candidates:
+            candidates.append(self.downgrade[candidates[-1]])
+        candidates = [candidate for candidate in candidates if self._affordable(candidate, tokens)]
+        if not candidates:
+            self.budget_rejected += 1
+            raise BudgetExceeded(
+                f"Budget LLM épuisé pour la période ({self.budget_spent:.4f} dépensé, "
+                f"{self.budget_reserved:.4f} réservé / {self.budget:.4f})"
+            )
+
+        for candidate in candidates:
+            if not self._waiters.get(candidate) and self.active.get(candidate, 0) < self.limit(candidate):
+                return self._grant(candidate, tier, tenant, tokens, 0.0, hold)
+        if not hold:
+            return self._grant(candidates[0], tier, tenant, tokens, 0.0, held=False)
+
+        # Niveaux saturés : attente dans la file du niveau le plus adapté, avec
+        # réservation de son coût
+        target = candidates[0]
+        loop = asyncio.get_running_loop()
+        self._seq += 1
+        cost = self.cost(target, tokens)
+        waiter = _Waiter(loop.create_future(), tenant, priority, self._seq, tokens, tier, loop.time(), cost)
+        self._waiters.setdefault(target, []).append(waiter)
+        self.budget_reserved += cost
+        try:
+            return await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Place attribuée juste avant l'annulation : elle est rendue
+                self.release(waiter.future.result())
+            elif waiter in self._waiters.get(target, ()):
+                self._waiters[target].remove(waiter)
+                self.budget_reserved -= waiter.cost
+            raise
+
+    def release(self, grant: Grant) -> None:
+        """
+        Libère la place d'une tâche terminée et sert les tâches en attente.
+
+        Args:
+            grant: Autorisation retournée par `acquire`.
+        """
+        if not grant.held:
+            return
+        self.active[grant.tier] -= 1
+        self._wake(grant.tier)
+
+    def _wake(self, tier: str) -> None:
+        waiters = self._waiters.get(tier)
+        while waiters and self.active.get(tier, 0) < self.limit(tier):
+            waiter = max(
+                waiters,
+                key=lambda w: (w.priority, -self._served.get((tier, w.tenant), 0), -w.seq),
+            )
+            waiters.remove(waiter)
+            # La réservation devient une dépense (ou est rendue si la tâche n'attend plus)
+            self.budget_reserved -= waiter.cost
+            if waiter.future.done() or waiter.future.get_loop().is_closed():
+                continue
+            waited = waiter.future.get_loop().time() - waiter.enqueued_at
+            waiter.future.set_result(self._grant(tier, waiter.requested_tier, waiter.tenant, waiter.tokens, waited))
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        tier: str,
+        tenant: str = "default",
+        priority: int = 0,
+        allow_downgrade: bool = False,
+        tokens: int = 0,
+        hold: bool = True,
+    ) -> AsyncIterator[Grant]:
+        """
+        Contexte d'exécution d'une tâche : attend une place (voir `acquire`) et la libère en sortie.
+
+        Yields:
+            L'autorisation, avec le niveau retenu.
+        """
+        grant = await self.acquire(tier, tenant, priority, allow_downgrade, tokens, hold)
+        try:
+            yield grant
+        finally:
+            self.release(grant)
+
+    def utilization(self) -> Dict[str, float]:
+        """Part des places occupées, par niveau."""
+        return {tier: self.active.get(tier, 0) / self.limit(tier) for tier in self.limits}
+
+    def mean_wait(self) -> Dict[str, float]:
+        """Attente moyenne avant exécution (en secondes), par niveau."""
+        return {
+            tier: self.wait_seconds.get(tier, 0.0) / self.admitted[tier] if self.admitted.get(tier) else 0.0
+            for tier in self.limits
+        }
+
+    def snapshot(self) -> Dict[str, object]:
+        """
+        Retourne l'état de l'ordonnanceur.
+
+        Returns:
+            Par niveau : limite, tâches en cours et en attente, tâches admises et
+            attente moyenne ; déclassements et consommation du budget.
+        """
+        mean_wait = self.mean_wait()
+        return {
+            "tiers": {
+                tier: {
+                    "limit": self.limit(tier),
+                    "active": self.active.get(tier, 0),
+                    "queued": self.queued(tier),
+                    "admitted": self.admitted.get(tier, 0),
+                    "mean_wait_seconds": mean_wait[tier],
+                }
+                for tier in self.limits
+            },
+            "downgrades": self.downgrades,
+            "budget": self.budget,
+            "budget_spent": self.budget_spent,
+            "budget_reserved": self.budget_reserved,
+            "budget_rejected": self.budget_rejected,
+        }
@@ -0,0 +1,218 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+
+def _load_avg_1min() -> float:
+    return os.getloadavg()[0]
+
+
+class LoadMonitor:
+    """
+    Instantané de l'utilisation CPU et du load average, rafraîchi en tâche de fond.
+
+    Reprend les seuils de `cpu_throttler` (`CPU_THRESHOLD`, `LOAD_AVG_THRESHOLD`)
+    sans bloquer la boucle asyncio : `psutil.cpu_percent(interval=None)` mesure
+    l'utilisation depuis le relevé précédent au lieu de dormir pendant
+    l'intervalle, et les requêtes ne lisent que le dernier instantané. Le load
+    average sur 1 minute est utilisé (plutôt que sur 5 minutes) pour que le
+    délestage cesse rapidement une fois la charge retombée.
+
+    Les compteurs d'admission (`queued`, `admitted_after_wait`, `rejected`) sont
+    tenus à jour par `LoadSheddingMiddleware` et exposés via `snapshot()`.
+    """
+
+    def __init__(
+        self,
+        cpu_threshold: float = 90.0,
+        load_avg_threshold: float = 6.0,
+        interval: float = 1.0,
+        cpu_sampler: Callable[[], float] = lambda: psutil.cpu_percent(interval=None),
+        load_sampler: Callable[[], float] = _load_avg_1min,
+    ):
+        """
+        Args:
+            cpu_threshold: Seuil d'utilisation CPU (en pourcentage).
+            load_avg_threshold: Seuil de load average.
+            interval: Intervalle de rafraîchissement de l'instantané (en secondes).
+            cpu_sampler: Fonction non bloquante retournant l'utilisation CPU.
+            load_sampler: Fonction retournant le load average.
+        """
+        self.cpu_threshold = cpu_threshold
+        self.load_avg_threshold = load_avg_threshold
+        self.interval = interval
+        self.cpu_sampler = cpu_sampler
+        self.load_sampler = load_sampler
+        self.cpu_percent = 0.0
+        self.load_avg = 0.0
+        self.updated_at: Optional[float] = None
+        self.queued = 0
+        self.admitted_after_wait = 0
+        self.rejected = 0
+        self._available: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def overloaded(self) -> bool:
+        """Indique si le dernier instantané dépasse l'un des seuils."""
+        return self.cpu_percent >= self.cpu_threshold or self.load_avg >= self.load_avg_threshold
+
+    def refresh(self) -> None:
+        """
+        Relève l'utilisation CPU et le load average, et réveille les requêtes en attente.
+        """
+        try:
+            self.cpu_percent = float(self.cpu_sampler())
+            self.load_avg = float(self.load_sampler())
+        except (OSError, psutil.Error) as e:
+            logger.warning("Relevé de charge impossible: %s", e)
+            return
+        self.updated_at = time.monotonic()
+        if self._available is not None:
+            if self.overloaded:
+                self._available.clear()
+            else:
+                self._available.set()
+
+    async def start(self) -> None:
+        """Démarre le rafraîchissement périodique de l'instantané."""
+        if self._task is not None:
+            return
+        self._available = asyncio.Event()
+        # Le premier appel de cpu_percent(interval=None) initialise la mesure
+        self.refresh()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Arrête le rafraîchissement périodique."""
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        self._available = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            self.refresh()
+
+    async def wait_until_available(self, timeout: float) -> bool:
+        """
+        Attend que la charge repasse sous les seuils.
+
+        Args:
+            timeout: Durée maximale d'attente (en secondes).
+
+        Returns:
+            True si la charge est sous les seuils, False si le délai est écoulé.
+        """
+        if not self.overloaded:
+            return True
+        if self._available is None or timeout <= 0:
+            return False
+        try:
+            await asyncio.wait_for(self._available.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return not self.overloaded
+
+    def snapshot(self) -> Dict[str, float]:
+        """
+        Retourne le dernier instantané.
+
+        Returns:
+            Utilisation CPU, load average, seuils, état de surcharge et compteurs d'admission.
+        """
+        return {
+            "cpu_percent": self.cpu_percent,
+            "load_avg": self.load_avg,
+            "cpu_threshold": self.cpu_threshold,
+            "load_avg_threshold": self.load_avg_threshold,
+            "overloaded": self.overloaded,
+            "queued": self.queued,
+            "admitted_after_wait": self.admitted_after_wait,
+            "rejected": self.rejected,
+        }
+
+
+class LoadSheddingMiddleware:
+    """
+    Middleware ASGI de contrôle d'admission des routes coûteuses.
+
+    Lorsque l'instantané de `LoadMonitor` dépasse les seuils, une requête vers
+    l'un des préfixes protégés attend au plus `queue_timeout` secondes que la
+    charge retombe (dans la limite de `max_queued` requêtes en attente), puis est
+    refusée avec une réponse `503` et l'en-tête `Retry-After`. Les autres routes
+    (santé, lectures de statut…) ne sont jamais retardées : la décision se résume
+    à la lecture de l'instantané en mémoire.
+    """
+
+    def __init__(
+        self,
+        app,
+        monitor: LoadMonitor,
+        protected_prefixes: Iterable[str] = ("/pipelines/deploy", "/autopilot/"),
+        queue_timeout: float = 2.0,
+        max_queued: int = 100,
+        retry_after: int = 5,
+        enabled: bool = True,
+    ):
+        self.app = app
+        self.monitor = monitor
+        self.protected_prefixes = tuple(protected_prefixes)
+        self.queue_timeout = queue_timeout
+        self.max_queued = max_queued
+        self.retry_after = retry_after
+        self.enabled = enabled
+
+    async def __call__(self, scope, receive, send):
+        if (
+            not self.enabled
+            or scope["type"] != "http"
+            or scope["method"] == "OPTIONS"
+            or not self.monitor.overloaded
+            or not scope["path"].startswith(self.protected_prefixes)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        monitor = self.monitor
+        if monitor.queued < self.max_queued:
+            monitor.queued += 1
+            try:
+                available = await monitor.wait_until_available(self.queue_timeout)
+            finally:
+                monitor.queued -= 1
+            if available:
+                monitor.admitted_after_wait += 1
+                await self.app(scope, receive, send)
+                return
+
+        monitor.rejected += 1
+        await self._reject(send)
+
+    async def _reject(self, send) -> None:
+        body = json.dumps({
+            "detail": "Le service est surchargé, veuillez réessayer plus tard.",
+        }, ensure_ascii=False).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,185 @@
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Bornes (en secondes) des buckets de l'histogramme de latence
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+# Libellé de route utilisé pour les requêtes qui ne correspondent à aucune route
+UNMATCHED_ROUTE = "<unmatched>"
+
+# Type de contenu du format d'exposition Prometheus
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_float(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class MetricsRegistry:
+    """
+    Agrégation en mémoire des métriques HTTP d'un worker.
+
+    Les métriques sont mises à jour depuis la boucle asyncio du worker, sans
+    verrou : chaque mise à jour se résume à quelques incréments de dictionnaire
+    et de liste. Chaque worker (processus) expose ses propres séries, agrégées
+    côté Prometheus.
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+        self.in_flight = 0
+        # (méthode, route, code HTTP) -> nombre de requêtes
+        self._requests: Dict[Tuple[str, str, str], int] = {}
+        # (méthode, route) -> nombre d'erreurs (5xx ou exception)
+        self._errors: Dict[Tuple[str, str], int] = {}
+        # (méthode, route) -> [compteurs par bucket (+Inf inclus), somme, nombre]
+        self._durations: Dict[Tuple[str, str], List] = {}
+        # Métriques calculées à l'exposition : nom -> (type, aide, fonction)
+        self._callbacks: Dict[str, Tuple[str, str, Callable[[], Any], Optional[str]]] = {}
+
+    def observe(self, method: str, route: str, status_code: int, duration: float) -> None:
+        """
+        Enregistre une requête terminée.
+
+        Args:
+            method: Méthode HTTP.
+            route: Modèle de chemin de la route (ex. `/pipelines/{pipeline_id}/status`).
+            status_code: Code HTTP de la réponse.
+            duration: Durée de traitement en secondes.
+        """
+        key = (method, route)
+        request_key = (method, route, str(status_code))
+        self._requests[request_key] = self._requests.get(request_key, 0) + 1
+        if status_code >= 500:
+            self._errors[key] = self._errors.get(key, 0) + 1
+
+        histogram = self._durations.get(key)
+        if histogram is None:
+            histogram = self._durations[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        histogram[0][bisect_left(self.buckets, duration)] += 1
+        histogram[1] += duration
+        histogram[2] += 1
+
+    def register_callback(
+        self,
+        name: str,
+        help_text: str,
+        func: Callable[[], Any],
+        metric_type: str = "gauge",
+        label: Optional[str] = None,
+    ) -> None:
+        """
+        Enregistre une métrique dont la valeur est lue au moment de l'exposition.
+
+        Args:
+            name: Nom de la métrique.
+            help_text: Description de la métrique.
+            func: Fonction retournant la valeur courante, ou un dictionnaire
+                `{valeur du label: valeur}` si `label` est renseigné.
+            metric_type: Type Prometheus ("gauge" ou "counter").
+            label: Nom du label distinguant les séries de la métrique.
+        """
+        self._callbacks[name] = (metric_type, help_text, func, label)
+
+    def render(self) -> str:
+        """
+        Sérialise les métriques au format d'exposition texte de Prometheus.
+
+        Returns:
+            Contenu de la réponse `/metrics`.
+        """
+        lines = [
+            "# HELP http_requests_total Total number of HTTP requests.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), count in sorted(self._requests.items()):
+            lines.append(
+                f'http_requests_total{{method="{method}",route="{_escape(route)}",status="{status}"}} {count}'
+            )
+
+        lines += [
+            "# HELP http_request_errors_total Total number of HTTP requests that failed with a 5xx status.",
+            "# TYPE http_request_errors_total counter",
+        ]
+        for (method, route), count in sorted(self._errors.items()):
+            lines.append(f'http_request_errors_total{{method="{method}",route="{_escape(route)}"}} {count}')
+
+        lines += [
+            "# HELP http_request_duration_seconds HTTP request latency in seconds.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        bounds = self.buckets + (float("inf"),)
+        for (method, route), (counts, total, count) in sorted(self._durations.items()):
+            labels = f'method="{method}",route="{_escape(route)}"'
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{_format_float(bound)}"}} {cumulative}')
+            lines.append(f"http_request_duration_seconds_sum{{{labels}}} {_format_float(total)}")
+            lines.append(f"http_request_duration_seconds_count{{{labels}}} {count}")
+
+        lines += [
+            "# HELP http_requests_in_flight Number of HTTP requests currently being processed.",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+        ]
+
+        for name, (metric_type, help_text, func, label) in sorted(self._callbacks.items()):
+            lines += [
+                f"# HELP {name} {help_text}",
+                f"# TYPE {name} {metric_type}",
+            ]
+            if label is None:
+                lines.append(f"{name} {_format_float(func())}")
+                continue
+            for key, value in sorted(func().items()):
+                lines.append(f'{name}{{{label}="{_escape(str(key))}"}} {_format_float(value)}')
+        return "\n".join(lines) + "\n"
+
+
+class PrometheusMiddleware:
+    """
+    Middleware ASGI enregistrant le nombre, la latence et les erreurs des requêtes HTTP.
+
+    Le libellé `route` est le modèle de chemin de la route FastAPI (et non le
+    chemin brut), afin de borner la cardinalité des séries.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry, exclude_paths: Iterable[str] = ("/metrics",)):
+        self.app = app
+        self.registry = registry
+        self.exclude_paths = frozenset(exclude_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        registry = self.registry
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        registry.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            status_code = 500
+            raise
+        finally:
+            registry.in_flight -= 1
+            route = scope.get("route")
+            route_path: Optional[str] = getattr(route, "path", None)
+            registry.observe(scope["method"], route_path or UNMATCHED_ROUTE, status_code, time.perf_counter() - start)
@@ -0,0 +1,382 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.core.windmill import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+# Coefficient de lissage des moyennes mobiles exponentielles (poids de la dernière mesure)
+DEFAULT_ALPHA = 0.2
+
+# Latence supposée (en secondes) d'un backend pas encore mesuré
+DEFAULT_LATENCY = 1.0
+
+# Nombre de latences récentes conservées par backend pour le calcul des percentiles
+LATENCY_WINDOW = 200
+
+
+class NoBackendAvailable(LookupError):
+    """Levée lorsqu'aucun backend sain ne sert les modèles demandés."""
+
+
+class BackendStats:
+    """
+    Statistiques d'un backend LLM, c'est-à-dire d'un modèle servi par un fournisseur.
+
+    La latence, le débit (tokens par seconde) et le taux d'erreur sont des
+    moyennes mobiles exponentielles des appels récents ; `in_flight` compte les
+    appels en cours. Les dernières latences (`LATENCY_WINDOW`) sont conservées
+    pour le calcul des percentiles. Un backend est écarté lorsque sa dernière
+    sonde de santé a échoué ou que son circuit breaker est ouvert (échecs
+    consécutifs).
+    """
+
+    def __init__(self, provider: str, model: str, quality: int, alpha: float = DEFAULT_ALPHA):
+        self.provider = provider
+        self.model = model
+        self.quality = quality
+        self.alpha = alpha
+        self.latency: Optional[float] = None
+        self.tokens_per_second: Optional[float] = None
+        self.error_rate = 0.0
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.healthy = True
+        self.samples: deque = deque(maxlen=LATENCY_WINDOW)
+        self.breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30.0)
+
+    @property
+    def available(self) -> bool:
+        """Indique si le backend peut recevoir des appels."""
+        return self.healthy and self.breaker.state != "open"
+
+    def expected_latency(self, default_latency: float = DEFAULT_LATENCY) -> float:
+        """
+        Estime le temps de réponse d'un nouvel appel.
+
+        La latence moyenne est multipliée par le nombre d'appels en cours (file
+        d'attente du backend) et divisée par le taux de succès (nouvelles
+        tentatives après une erreur).
+
+        Args:
+            default_latency: Latence supposée si le backend n'a pas encore été mesuré.
+
+        Returns:
+            Temps de réponse estimé en secondes.
+        """
+        latency = self.latency if self.latency is not None else default_latency
+        return latency * (1 + self.in_flight) / max(1.0 - self.error_rate, 0.05)
+
+    def record(self, latency: float, tokens: int = 0, error: bool = False) -> None:
+        """
+        Enregistre un appel terminé.
+
+        Args:
+            latency: Durée de l'appel en secondes.
+            tokens: Nombre de tokens générés.
+            error: True si l'appel a échoué.
+        """
+        alpha = self.alpha
+        self.requests += 1
+        self.error_rate += alpha * (float(error) - self.error_rate)
+        if error:
+            self.errors += 1
+            self.breaker.record_failure()
+            return
+        self.breaker.record_success()
+        self.observe(latency)
+        if tokens and latency > 0:
+            rate = tokens / latency
+            self.tokens_per_second = rate if self.tokens_per_second is None else (
+                self.tokens_per_second + alpha * (rate - self.tokens_per_second)
+            )
+
+    def observe(self, latency: float) -> None:
+        """
+        Enregistre une latence observée sans compter d'appel, par exemple la
+        durée d'un appel abandonné (minorant de sa latence réelle).
+
+        Args:
+            latency: Durée observée en secondes.
+        """
+        self.latency = latency if self.latency is None else self.latency + self.alpha * (latency - self.latency)
+        self.samples.append(latency)
+
+    def latency_percentile(self, p: float) -> Optional[float]:
+        """
+        Percentile des latences récentes (rang le plus proche).
+
+        Args:
+            p: Percentile entre 0 et 1.
+
+        Returns:
+            La latence en secondes, ou None sans mesure.
+        """
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Retourne les statistiques du backend.
+
+        Returns:
+            Fournisseur, modèle, qualité, latence, débit, taux d'erreur, appels en cours et état.
+        """
+        return {
+            "provider": self.provider,
+            "model": self.model,
+            "quality": self.quality,
+            "latency": self.latency,
+            "latency_p95": self.latency_percentile(0.95),
+            "tokens_per_second": self.tokens_per_second,
+            "error_rate": self.error_rate,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "errors": self.errors,
+            "healthy": self.healthy,
+            "circuit": self.breaker.state,
+        }
+
+
+class ModelSelector:
+    """
+    Sélection du backend LLM le plus rapide parmi les candidats sains.
+
+    Chaque appel passé par `call` met à jour les statistiques du backend ; des
+    sondes de santé périodiques (optionnelles) marquent les backends
+    indisponibles. `choose` retient, parmi les backends sains dont la qualité
+    atteint le plancher demandé, celui dont le temps de réponse estimé est le
+    plus faible ; à estimation égale (backends pas encore mesurés), l'ordre de
+    préférence des modèles puis des fournisseurs est respecté.
+    """
+
+    def __init__(
+        self,
+        alpha: float = DEFAULT_ALPHA,
+        default_latency: float = DEFAULT_LATENCY,
+        probe_interval: float = 30.0,
+        probe_timeout: float = 5.0,
+    ):
+        """
+        Args:
+            alpha: Coefficient de lissage des moyennes mobiles.
+            default_latency: Latence supposée d'un backend pas encore mesuré.
+            probe_interval: Intervalle entre deux sondes de santé (en secondes).
+            probe_timeout: Délai maximum d'une sonde de santé (en secondes).
+        """
+        self.alpha = alpha
+        self.default_latency = default_latency
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.backends: Dict[Tuple[str, str], BackendStats] = {}
+        self._probe: Optional[Callable[[str, str], Awaitable[bool]]] = None
+        self._probe_task: Optional[asyncio.Task] = None
+
+    def add(self, provider: str, model: str, quality: int) -> BackendStats:
+        """
+        Déclare un backend (un modèle servi par un fournisseur).
+
+        Args:
+            provider: Nom du fournisseur (ex. `ollama`).
+            model: Identifiant du modèle.
+            quality: Niveau de qualité du modèle (plus haut = meilleur).
+
+        Returns:
+            Les statistiques du backend.
+        """
+        key = (provider, model)
+        if key not in self.backends:
+            self.backends[key] = BackendStats(provider, model, quality, alpha=self.alpha)
+        return self.backends[key]
+
+    def choose(
+        self,
+        models: Iterable[str],
+        quality_floor: int = 0,
+        providers: Optional[Iterable[str]] = None,
+        exclude: Iterable[BackendStats] = (),
+    ) -> BackendStats:
+        """
+        Choisit le backend le plus rapide parmi les candidats.
+
+        Args:
+            models: Modèles acceptables, par ordre de préférence.
+            quality_floor: Qualité minimale du modèle.
+            providers: Fournisseurs autorisés (tous si None).
+            exclude: Backends à écarter (ex. celui déjà appelé).
+
+        Returns:
+            Le backend retenu.
+
+        Raises:
+            NoBackendAvailable: Si aucun backend sain ne correspond.
+        """
+        preference = {model: rank for rank, model in enumerate(dict.fromkeys(models))}
+        allowed = None if providers is None else set(providers)
+        excluded = {id(backend) for backend in exclude}
+        best, best_key = None, None
+        for order, backend in enumerate(self.backends.values()):
+            rank = preference.get(backend.model)
+            if (
+                rank is None
+                or backend.quality < quality_floor
+                or (allowed is not None and backend.provider not in allowed)
+                or not backend.available
+                or id(backend) in excluded
+            ):
+                continue
+            key = (backend.expected_latency(self.default_latency), rank, order)
+            if best_key is None or key < best_key:
+                best, best_key = backend, key
+        if best is None:
+            raise NoBackendAvailable(
+                f"Aucun backend disponible pour les modèles {', '.join(preference)} (qualité minimale {quality_floor})"
+            )
+        return best
+
+    async def call(self, backend: BackendStats, func: Callable[[], Awaitable[Tuple[Any, int]]]) -> Any:
+        """
+        Exécute un appel sur un backend en mesurant sa durée et son issue.
+
+        Args:
+            backend: Backend appelé.
+            func: Fonction retournant la coroutine de l'appel, qui produit `(réponse, tokens générés)`.
+
+        Returns:
+            La réponse de l'appel.
+        """
+        backend.in_flight += 1
+        started = time.perf_counter()
+        try:
+            response, tokens = await func()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            backend.record(time.perf_counter() - started, error=True)
+            raise
+        finally:
+            backend.in_flight -= 1
+        backend.record(time.perf_counter() - started, tokens)
+        return response
+
+    async def start(self, probe: Callable[[str, str], Awaitable[bool]]) -> None:
+        """
+        Démarre les sondes de santé périodiques sur la boucle asyncio courante.
+
+        Args:
+            probe: Fonction `(fournisseur, modèle)` retournant True si le backend répond.
+        """
+        self._probe = probe
+        task = self._probe_task
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            return
+        self._probe_task = asyncio.create_task(self._probe_loop())
+
+    async def stop(self) -> None:
+        """Arrête les sondes de santé."""
+        task, self._probe_task = self._probe_task, None
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def _probe_loop(self) -> None:
+        while True:
+            await self.probe_once()
+            await asyncio.sleep(self.probe_interval)
+
+    async def probe_once(self) -> None:
+        """Sonde tous les backends en parallèle et met à jour leur état de santé."""
+        if self._probe is None:
+            return
+
+        async def probe(backend: BackendStats) -> None:
+            try:
+                healthy = bool(await asyncio.wait_for(self._probe(backend.provider, backend.model), self.probe_timeout))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Sonde de santé en échec pour {backend.provider}/{backend.model}: {str(e)}")
+                healthy = False
+            if healthy and not backend.healthy:
+                # Un backend rétabli repart avec un circuit fermé
+                backend.breaker.record_success()
+            backend.healthy = healthy
+
+        await asyncio.gather(*(probe(backend) for backend in list(self.backends.values())))
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """
+        Retourne les statistiques de tous les backends.
+
+        Returns:
+            Statistiques par backend, dans l'ordre de déclaration.
+        """
+        return [backend.snapshot() for backend in self.backends.values()]
+
+
+class HedgePolicy:
+    """
+    Politique de requêtes de couverture (hedging).
+
+    Un appel dont le backend n'a pas répondu après le percentile `percentile`
+    de ses latences récentes est doublé d'un appel au candidat suivant ; la
+    première réponse est retenue. Les appels doublés sont limités à
+    `max_ratio` des appels (charge supplémentaire maximale), et un backend
+    n'est doublé qu'après `min_samples` mesures.
+    """
+
+    def __init__(self, percentile: float = 0.95, max_ratio: float = 0.1, min_samples: int = 20):
+        """
+        Args:
+            percentile: Percentile des latences au-delà duquel l'appel est doublé.
+            max_ratio: Part maximale des appels doublés.
+            min_samples: Nombre minimal de latences mesurées avant de doubler un appel.
+        """
+        self.percentile = percentile
+        self.max_ratio = max_ratio
+        self.min_samples = min_samples
+        self.calls = 0
+        self.hedges = 0
+        self.wins = 0
+
+    def delay(self, backend: BackendStats) -> Optional[float]:
+        """
+        Délai au-delà duquel un appel au backend est doublé.
+
+        Args:
+            backend: Backend appelé.
+
+        Returns:
+            Le délai en secondes, ou None si le backend n'est pas assez mesuré.
+        """
+        if len(backend.samples) < self.min_samples:
+            return None
+        return backend.latency_percentile(self.percentile)
+
+    def allow(self) -> bool:
+        """Indique si un appel supplémentaire reste dans la limite de charge."""
+        return self.hedges + 1 <= self.max_ratio * self.calls
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Retourne les statistiques de couverture.
+
+        Returns:
+            Appels, appels doublés, appels gagnés par le doublon et part des appels doublés.
+        """
+        return {
+            "calls": self.calls,
+            "hedges": self.hedges,
+            "wins": self.wins,
+            "hedge_ratio": self.hedges / self.calls if self.calls else 0.0,
+        }
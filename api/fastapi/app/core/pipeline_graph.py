@@ -0,0 +1,167 @@
+from collections import deque
+from typing import Annotated, Dict, List, Literal, Union
+
+from pydantic import ConfigDict, Field, TypeAdapter, ValidationError
+from typing_extensions import NotRequired, TypedDict
+
+# Types de nodes supportés par l'éditeur de pipelines
+NODE_TYPES = ("data_source", "preprocessing", "model", "deployment")
+
+# Nombre maximum d'erreurs rapportées pour une configuration
+MAX_ERRORS = 20
+
+
+class PipelineGraphError(ValueError):
+    """Levée lorsque les nodes d'un pipeline ne forment pas un graphe valide."""
+
+    def __init__(self, errors: List[str]):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+# Schémas par type de node. Ce sont des TypedDict (et non des modèles) : la
+# validation se fait entièrement dans pydantic-core, sans instancier d'objet par
+# node. Les champs connus sont typés, les champs supplémentaires restent acceptés.
+_EXTRA_ALLOWED = ConfigDict(extra="allow")
+
+
+class DataSourceConfig(TypedDict, total=False):
+    __pydantic_config__ = _EXTRA_ALLOWED
+    source: str
+    source_type: str
+    connection_details: str
+
+
+class PreprocessingConfig(TypedDict, total=False):
+    __pydantic_config__ = _EXTRA_ALLOWED
+    steps: List[str]
+    operations: Union[str, List[str]]
+
+
+class ModelConfig(TypedDict, total=False):
+    __pydantic_config__ = _EXTRA_ALLOWED
+    model_type: str
+    algorithm: str
+    model_details: str
+
+
+class DeploymentConfig(TypedDict, total=False):
+    __pydantic_config__ = _EXTRA_ALLOWED
+    endpoint: str
+    deployment_type: str
+
+
+NodeId = Annotated[str, Field(min_length=1)]
+
+
+class DataSourceNode(TypedDict):
+    __pydantic_config__ = _EXTRA_ALLOWED
+    id: NodeId
+    type: Literal["data_source"]
+    # IDs des nodes dont ce node consomme la sortie (arêtes entrantes du DAG)
+    inputs: NotRequired[List[str]]
+    config: NotRequired[DataSourceConfig]
+
+
+class PreprocessingNode(TypedDict):
+    __pydantic_config__ = _EXTRA_ALLOWED
+    id: NodeId
+    type: Literal["preprocessing"]
+    inputs: NotRequired[List[str]]
+    config: NotRequired[PreprocessingConfig]
+
+
+class ModelNode(TypedDict):
+    __pydantic_config__ = _EXTRA_ALLOWED
+    id: NodeId
+    type: Literal["model"]
+    inputs: NotRequired[List[str]]
+    config: NotRequired[ModelConfig]
+
+
+class DeploymentNode(TypedDict):
+    __pydantic_config__ = _EXTRA_ALLOWED
+    id: NodeId
+    type: Literal["deployment"]
+    inputs: NotRequired[List[str]]
+    config: NotRequired[DeploymentConfig]
+
+
+# Validateur de la liste des nodes, compilé une seule fois à l'import : le type
+# de chaque node sélectionne directement son schéma (union discriminée)
+_NODES_ADAPTER = TypeAdapter(
+    List[Annotated[Union[DataSourceNode, PreprocessingNode, ModelNode, DeploymentNode], Field(discriminator="type")]]
+)
+
+
+def _format_location(location: tuple) -> str:
+    path = "nodes"
+    for part in location:
+        if isinstance(part, int):
+            path += f"[{part}]"
+        elif part not in NODE_TYPES:
+            path += f".{part}"
+    return path
+
+
+def validate_pipeline_graph(nodes: List[dict]) -> List[str]:
+    """
+    Valide les nodes d'un pipeline et retourne leur ordre topologique.
+
+    Chaque node est validé contre le schéma de son type, puis les arêtes
+    (`inputs`) sont vérifiées : IDs uniques, nodes référencés existants et
+    absence de cycle (algorithme de Kahn, en O(V+E)).
+
+    Args:
+        nodes: Nodes du pipeline.
+
+    Returns:
+        IDs des nodes dans un ordre où chaque node suit ses entrées.
+
+    Raises:
+        PipelineGraphError: Si un node ou le graphe est invalide.
+    """
+    try:
+        parsed = _NODES_ADAPTER.validate_python(nodes)
+    except ValidationError as e:
+        raise PipelineGraphError([
+            f"{_format_location(error['loc'])}: {error['msg']}"
+            for error in e.errors()[:MAX_ERRORS]
+        ])
+
+    errors: List[str] = []
+    indegree: Dict[str, int] = {}
+    for node in parsed:
+        if node["id"] in indegree:
+            errors.append(f"ID de node en double: {node['id']}")
+        indegree[node["id"]] = 0
+
+    children: Dict[str, List[str]] = {node_id: [] for node_id in indegree}
+    for node in parsed:
+        node_id = node["id"]
+        for input_id in node.get("inputs", ()):
+            if input_id not in indegree:
+                errors.append(f"Le node {node_id} référence un node inconnu: {input_id}")
+                continue
+            children[input_id].append(node_id)
+            indegree[node_id] += 1
+        if len(errors) >= MAX_ERRORS:
+            break
+    if errors:
+        raise PipelineGraphError(errors[:MAX_ERRORS])
+
+    ready = deque(node_id for node_id, degree in indegree.items() if degree == 0)
+    order: List[str] = []
+    while ready:
+        node_id = ready.popleft()
+        order.append(node_id)
+        for child in children[node_id]:
+            indegree[child] -= 1
+            if indegree[child] == 0:
+                ready.append(child)
+
+    if len(order) < len(indegree):
+        in_cycle = [node_id for node_id, degree in indegree.items() if degree > 0]
+        shown = ", ".join(in_cycle[:10]) + (", ..." if len(in_cycle) > 10 else "")
+        raise PipelineGraphError([f"Le graphe des nodes contient un cycle (nodes concernés: {shown})"])
+    return order
@@ -0,0 +1,316 @@
+import hashlib
+import json
+from typing import List
+
+from app.core.cache import LRUCache
+from app.core.pipeline_graph import PipelineGraphError, validate_pipeline_graph
+from app.core.terraform_json import build_terraform_document, render_tf_json, resource_name
+from app.models.pipeline import PipelineConfig
+
+# Formats de sortie supportés pour le code Terraform (HCL ou `.tf.json`)
+TERRAFORM_FORMATS = ("hcl", "json")
+
+# Cibles de déploiement supportées
+VALID_TARGETS = ("k3s-local", "exoscale", "vastai", "runpod")
+
+# Résultats de validation, indexés par empreinte de configuration
+_validation_cache = LRUCache(maxsize=4096)
+
+def pipeline_config_errors(config: PipelineConfig) -> List[str]:
+    """
+    Retourne les erreurs de la configuration du pipeline.
+    
+    Les nodes sont validés comme un DAG (schéma par type de node, arêtes et
+    cycles). Le résultat est mémorisé par empreinte de configuration.
+    
+    Args:
+        config: Configuration du pipeline.
+        
+    Returns:
+        Liste des erreurs (vide si la configuration est valide).
+    """
+    key = config_hash(config)
+    errors = _validation_cache.get(key)
+    if errors is None:
+        errors = []
+        if not config.name:
+            errors.append("Le nom du pipeline est requis.")
+        if config.deployment_target not in VALID_TARGETS:
+            errors.append(f"Cible de déploiement non supportée: {config.deployment_target}")
+        try:
+            validate_pipeline_graph(config.nodes)
+        except PipelineGraphError as e:
+            errors.extend(e.errors)
+        errors = tuple(errors)
+        _validation_cache.set(key, errors)
+    return list(errors)
+
+def validate_pipeline_config(config: PipelineConfig) -> bool:
+    """
+    Valide la configuration du pipeline.
+    
+    Args:
+        config: Configuration du pipeline.
+        
+    Returns:
+        True si la configuration est valide, False sinon.
+    """
+    return not pipeline_config_errors(config)
+
+def config_hash(config: PipelineConfig) -> str:
+    """
+    Calcule l'empreinte canonique d'une configuration de pipeline.
+    
+    La configuration est sérialisée en JSON avec des clés triées, de sorte que
+    deux configurations identiques aient toujours la même empreinte.
+    
+    L'empreinte est mémorisée sur l'instance : une configuration reçue n'est
+    pas modifiée au cours de son traitement.
+    
+    Args:
+        config: Configuration du pipeline.
+        
+    Returns:
+        Empreinte SHA-256 de la configuration.
+    """
+    if config._config_hash is None:
+        canonical = json.dumps(config.model_dump(), sort_keys=True, separators=(",", ":"), default=str)
+        config._config_hash = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    return config._config_hash
+
+def render_terraform_code(config: PipelineConfig, output_format: str = "hcl") -> str:
+    """
+    Génère le code Terraform pour la plateforme cible, sans passer par le cache.
+    
+    Args:
+        config: Configuration du pipeline.
+        output_format: Format de sortie, "hcl" ou "json".
+        
+    Returns:
+        Code Terraform généré.
+    """
+    if output_format == "json":
+        return render_tf_json(build_terraform_document(config))
+    if output_format != "hcl":
+        raise ValueError(f"Format Terraform non supporté: {output_format}")
+    
+    target_platform = config.deployment_target
+    
+    if target_platform == "k3s-local":
+        return generate_k3s_terraform_code(config)
+    elif target_platform == "exoscale":
+        return generate_exoscale_terraform_code(config)
+    elif target_platform == "vastai":
+        return generate_vastai_terraform_code(config)
+    elif target_platform == "runpod":
+        return generate_runpod_terraform_code(config)
+    else:
+        raise ValueError(f"Plateforme cible non supportée: {target_platform}")
+
+def generate_k3s_terraform_code(config: PipelineConfig) -> str:
+    """
+    Génère le code Terraform pour le déploiement sur K3s local.
+    
+    Args:
+        config: Configuration du pipeline.
+        
+    Returns:
+        Code Terraform généré.
+    """
+    # C"est un exemple simplifié. Dans la réalité, cela serait plus complexe.
+    name = resource_name(config)
+    return f"""
+terraform {{
+  required_providers {{
+    kubernetes = {{
+      source  = "hashicorp/kubernetes"
+      version = "2.20.0"
+    }}
+  }}
+}}
+
+provider "kubernetes" {{
+  config_path = "~/.kube/config"
+}}
+
+resource "kubernetes_deployment" "ml_pipeline" {{
+  metadata {{
+    name = "{name}"
+    labels = {{
+      app = "{name}"
+    }}
+  }}
+
+  spec {{
+    replicas = 1
+
+    selector {{
+      match_labels = {{
+        app = "{name}"
+      }}
+    }}
+
+    template {{
+      metadata {{
+        labels = {{
+          app = "{name}"
+        }}
+      }}
+
+      spec {{
+        container {{
+          image = "nginx:latest"  # Exemple d"image
+          name  = "{name}"
+
+          port {{
+            container_port = 80
+          }}
+        }}
+      }}
+    }}
+  }}
+}}
+
+resource "kubernetes_service" "ml_pipeline" {{
+  metadata {{
+    name = "{name}"
+  }}
+
+  spec {{
+    selector = {{
+      app = "{name}"
+    }}
+
+    port {{
+      protocol    = "TCP"
+      port        = 80
+      target_port = 80
+    }}
+
+    type = "LoadBalancer"
+  }}
+}}
+"""
+
+def generate_exoscale_terraform_code(config: PipelineConfig) -> str:
+    """
+    Génère le code Terraform pour le déploiement sur Exoscale.
+    
+    Args:
+        config: Configuration du pipeline.
+        
+    Returns:
+        Code Terraform généré.
+    """
+    # C"est un exemple simplifié. Dans la réalité, cela serait plus complexe.
+    name = resource_name(config)
+    return f"""
+terraform {{
+  required_providers {{
+    exoscale = {{
+      source  = "exoscale/exoscale"
+      version = "0.50.0"
+    }}
+  }}
+}}
+
+provider "exoscale" {{
+  key    = var.exoscale_api_key
+  secret = var.exoscale_api_secret
+}}
+
+resource "exoscale_compute_instance" "ml_pipeline" {{
+  name = "{name}"
+  type = "standard.medium"
+  disk_size = 50
+  image = "ubuntu-22.04"
+  
+  security_group_ids = [
+    exoscale_security_group.ml_pipeline.id
+  ]
+}}
+
+resource "exoscale_security_group" "ml_pipeline" {{
+  name = "{name}-sg"
+}}
+
+resource "exoscale_security_group_rule" "ml_pipeline_http" {{
+  security_group_id = exoscale_security_group.ml_pipeline.id
+  type              = "ingress"
+  protocol          = "tcp"
+  start_port        = 80
+  end_port          = 80
+  cidr              = "0.0.0.0/0"
+}}
+"""
+
+def generate_vastai_terraform_code(config: PipelineConfig) -> str:
+    """
+    Génère le code Terraform pour le déploiement sur Vast.ai.
+    
+    Args:
+        config: Configuration du pipeline.
+        
+    Returns:
+        Code Terraform généré.
+    """
+    # C"est un exemple simplifié. Dans la réalité, cela serait plus complexe.
+    # Vast.ai n"a pas de provider Terraform officiel, donc cela serait implémenté via leur API.
+    return f"""
+# Vast.ai deployment
+# This is a placeholder as Vast.ai does not have an official Terraform provider.
+# Deployment would be done via their API.
+
+# Example of what the configuration might look like:
+# pipeline_name = {config.name}
+# target_platform = {config.deployment_target}
+# nodes = {json.dumps(config.nodes, indent=2)}
+"""
+
+def generate_runpod_terraform_code(config: PipelineConfig) -> str:
+    """
+    Génère le code Terraform pour le déploiement sur RunPod.
+    
+    Args:
+        config: Configuration du pipeline.
+        
+    Returns:
+        Code Terraform généré.
+    """
+    # C"est un exemple simplifié. Dans la réalité, cela serait plus complexe.
+    name = resource_name(config)
+    return f"""
+terraform {{
+  required_providers {{
+    runpod = {{
+      source  = "runpod/runpod"
+      version = "1.0.0"
+    }}
+  }}
+}}
+
+provider "runpod" {{
+  api_key = var.runpod_api_key
+}}
+
+resource "runpod_pod" "ml_pipeline" {{
+  name            = "{name}"
+  image_name      = "runpod/pytorch:2.0.1-py3.10-cuda11.8.0-devel-ubuntu22.04"
+  gpu_type_id     = "NVIDIA GeForce RTX 4090"
+  gpu_count       = 1
+  container_disk_in_gb = 40
+  volume_in_gb    = 0
+  volume_mount_path = "/runpod-volume"
+  cloud_type      = "ALL"
+  min_vcpu_count  = 2
+  min_memory_in_gb = 15
+  docker_args     = ""
+  ports           = ""
+  env             = {{}}
+  template_id     = ""
+  container_name  = "runpod-container"
+  start_ssh       = true
+  is_public       = false
+  shutdown_timeout = 5
+}}
+"""
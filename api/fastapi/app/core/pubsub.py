@@ -0,0 +1,124 @@
+import asyncio
+from collections import defaultdict
+from typing import Dict, Optional, Set, Tuple
+
+# Nombre maximum de messages en attente par abonné ; au-delà, les plus anciens
+# sont abandonnés (seul le dernier statut d'un pipeline est utile)
+SUBSCRIBER_QUEUE_SIZE = 16
+
+
+class Subscription:
+    """
+    Abonnement aux messages publiés sur un sujet.
+
+    S'utilise comme gestionnaire de contexte asynchrone, afin que l'abonnement
+    soit toujours retiré du broker à la fin du stream.
+    """
+
+    def __init__(self, broker: "StatusBroker", topic: str):
+        self.broker = broker
+        self.topic = topic
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """
+        Attend le prochain message.
+
+        Args:
+            timeout: Délai maximum d'attente en secondes (None pour attendre indéfiniment).
+
+        Returns:
+            Le message, ou None si le délai est écoulé.
+        """
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def _deliver(self, message: dict) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+    async def __aenter__(self) -> "Subscription":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.broker.unsubscribe(self)
+
+
+class StatusBroker:
+    """
+    Pub/sub en mémoire diffusant les transitions de statut aux abonnés d'un pipeline.
+
+    `publish` peut être appelé depuis n'importe quel thread : chaque message est
+    remis sur la boucle asyncio de l'abonné.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[Subscription]] = defaultdict(set)
+
+    def subscribe(self, topic: str) -> Subscription:
+        """
+        Abonne l'appelant aux messages d'un sujet.
+
+        Args:
+            topic: Sujet (ID du pipeline).
+
+        Returns:
+            L'abonnement créé.
+        """
+        subscription = Subscription(self, topic)
+        self._subscribers[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """
+        Retire un abonnement.
+
+        Args:
+            subscription: Abonnement à retirer.
+        """
+        subscribers = self._subscribers.get(subscription.topic)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.topic]
+
+    def publish(self, topic: str, message: dict) -> int:
+        """
+        Diffuse un message à tous les abonnés d'un sujet.
+
+        Args:
+            topic: Sujet (ID du pipeline).
+            message: Message à diffuser.
+
+        Returns:
+            Nombre d'abonnés notifiés.
+        """
+        subscribers = tuple(self._subscribers.get(topic, ()))
+        try:
+            current_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            current_loop = None
+        for subscription in subscribers:
+            if subscription.loop is current_loop:
+                subscription._deliver(message)
+            elif not subscription.loop.is_closed():
+                subscription.loop.call_soon_threadsafe(subscription._deliver, message)
+        return len(subscribers)
+
+    def subscriber_count(self, topic: Optional[str] = None) -> int:
+        """
+        Retourne le nombre d'abonnés, pour un sujet ou au total.
+
+        Args:
+            topic: Sujet (None pour tous les sujets).
+
+        Returns:
+            Nombre d'abonnés.
+        """
+        if topic is not None:
+            return len(self._subscribers.get(topic, ()))
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
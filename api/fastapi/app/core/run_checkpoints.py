@@ -0,0 +1,182 @@
+import asyncio
+import gzip
+import json
+import logging
+import os
+import re
+import shutil
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Identifiants d'exécution acceptés (utilisés comme noms de répertoires)
+_RUN_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# Suffixe des fichiers de checkpoint d'étape (JSON compressé)
+_SUFFIX = ".json.gz"
+
+
+class RunCheckpointStore:
+    """
+    Checkpoints durables des exécutions de l'Autopilot, sur disque local.
+
+    Chaque exécution a son répertoire (`<directory>/<run_id>/`) contenant la
+    requête d'origine et, pour chaque étape terminée, sa sortie en JSON
+    compressé (gzip). Les fichiers sont écrits dans un fichier temporaire puis
+    renommés, de sorte qu'un checkpoint est complet ou absent.
+
+    Les méthodes accèdent au disque de manière synchrone : depuis la boucle
+    asyncio, elles sont appelées via `asyncio.to_thread`. Les exécutions plus
+    anciennes que `ttl` sont supprimées par une tâche de fond (`start`), au
+    démarrage puis toutes les `purge_interval` secondes, dans un thread.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        ttl: Optional[float] = 7 * 24 * 3600,
+        purge_interval: float = 600.0,
+    ):
+        """
+        Args:
+            directory: Répertoire des checkpoints.
+            ttl: Durée de conservation d'une exécution en secondes (None pour ne jamais supprimer).
+            purge_interval: Intervalle entre deux purges des exécutions expirées (en secondes).
+        """
+        self.directory = directory
+        self.ttl = ttl
+        self.purge_interval = purge_interval
+        self._task: Optional[asyncio.Task] = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _run_dir(self, run_id: str) -> str:
+        if not _RUN_ID.match(run_id):
+            raise KeyError(run_id)
+        return os.path.join(self.directory, run_id)
+
+    def _write(self, path: str, value: Any) -> None:
+        tmp = f"{path}.tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=6) as f:
+            json.dump(value, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    def _read(self, path: str) -> Any:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return json.load(f)
+
+    def create(self, run_id: str, request: Dict[str, Any]) -> None:
+        """
+        Crée une exécution et enregistre sa requête.
+
+        Args:
+            run_id: Identifiant de l'exécution.
+            request: Requête d'origine, sérialisable en JSON.
+        """
+        run_dir = self._run_dir(run_id)
+        os.makedirs(run_dir, exist_ok=True)
+        self._write(os.path.join(run_dir, "request" + _SUFFIX), request)
+
+    def exists(self, run_id: str) -> bool:
+        """Indique si une exécution a été créée."""
+        try:
+            return os.path.exists(os.path.join(self._run_dir(run_id), "request" + _SUFFIX))
+        except KeyError:
+            return False
+
+    def request(self, run_id: str) -> Dict[str, Any]:
+        """
+        Retourne la requête d'origine d'une exécution.
+
+        Raises:
+            KeyError: Si l'exécution est inconnue.
+        """
+        if not self.exists(run_id):
+            raise KeyError(run_id)
+        return self._read(os.path.join(self._run_dir(run_id), "request" + _SUFFIX))
+
+    def save(self, run_id: str, stage: str, output: Any) -> None:
+        """
+        Enregistre la sortie d'une étape terminée.
+
+        Args:
+            run_id: Identifiant de l'exécution.
+            stage: Nom de l'étape.
+            output: Sortie de l'étape, sérialisable en JSON.
+        """
+        self._write(os.path.join(self._run_dir(run_id), f"stage-{stage}{_SUFFIX}"), output)
+
+    def load(self, run_id: str) -> Dict[str, Any]:
+        """
+        Retourne les sorties des étapes terminées d'une exécution.
+
+        Args:
+            run_id: Identifiant de l'exécution.
+
+        Returns:
+            Sortie de chaque étape terminée, par nom d'étape.
+        """
+        run_dir = self._run_dir(run_id)
+        outputs = {}
+        for name in self.completed(run_id):
+            try:
+                outputs[name] = self._read(os.path.join(run_dir, f"stage-{name}{_SUFFIX}"))
+            except (OSError, ValueError) as e:
+                # Checkpoint illisible : l'étape sera exécutée à nouveau
+                logger.error(f"Checkpoint illisible pour l'étape {name} de l'exécution {run_id}: {str(e)}")
+        return outputs
+
+    def completed(self, run_id: str) -> List[str]:
+        """Noms des étapes terminées d'une exécution."""
+        try:
+            entries = os.listdir(self._run_dir(run_id))
+        except (KeyError, FileNotFoundError):
+            return []
+        return sorted(
+            entry[len("stage-"):-len(_SUFFIX)]
+            for entry in entries
+            if entry.startswith("stage-") and entry.endswith(_SUFFIX)
+        )
+
+    def purge(self) -> int:
+        """
+        Supprime les exécutions plus anciennes que la durée de conservation.
+
+        Returns:
+            Nombre d'exécutions supprimées.
+        """
+        if self.ttl is None:
+            return 0
+        cutoff = time.time() - self.ttl
+        removed = 0
+        for entry in os.listdir(self.directory):
+            path = os.path.join(self.directory, entry)
+            try:
+                if os.path.isdir(path) and os.path.getmtime(path) < cutoff:
+                    shutil.rmtree(path)
+                    removed += 1
+            except OSError as e:
+                logger.error(f"Erreur lors de la suppression de l'exécution {entry}: {str(e)}")
+        return removed
+
+    async def start(self) -> None:
+        """Démarre la purge périodique des exécutions expirées."""
+        if self._task is not None or self.ttl is None:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Arrête la purge périodique."""
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.to_thread(self.purge)
+            await asyncio.sleep(self.purge_interval)
@@ -0,0 +1,120 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+# Fonction d'une étape : reçoit les résultats des étapes déjà terminées
+StageFunc = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class StageError(Exception):
+    """Levée lorsqu'une étape d'un graphe échoue ; `stage` nomme l'étape, `__cause__` porte l'erreur."""
+
+    def __init__(self, stage: str, error: BaseException):
+        super().__init__(f"{stage}: {error}")
+        self.stage = stage
+        self.error = error
+
+
+class StageGraph:
+    """
+    Petit graphe d'étapes asynchrones.
+
+    Chaque étape démarre dès que toutes ses dépendances sont terminées, de sorte
+    que les étapes indépendantes s'exécutent en parallèle. Le début et la fin de
+    chaque étape sont signalés à `on_event`, avec la durée de l'étape. Si une
+    étape échoue, les étapes en cours sont annulées et `run` lève `StageError`.
+
+    Les résultats d'étapes déjà terminées (par exemple lors d'une exécution
+    précédente) peuvent être fournis à `run` : ces étapes ne sont pas
+    réexécutées. `on_result` est attendu avec le résultat de chaque étape
+    exécutée, avant que les étapes qui en dépendent ne démarrent.
+    """
+
+    def __init__(
+        self,
+        on_event: Optional[Callable[[str, str, Optional[float]], None]] = None,
+        on_result: Optional[Callable[[str, Any], Awaitable[None]]] = None,
+    ):
+        """
+        Args:
+            on_event: Fonction appelée avec `(étape, "started" | "completed" | "restored", durée)`
+                (la durée, en secondes, vaut None au démarrage et pour une étape restaurée).
+            on_result: Fonction asynchrone appelée avec `(étape, résultat)` à la fin de
+                chaque étape exécutée ; une erreur fait échouer l'étape.
+        """
+        self.on_event = on_event
+        self.on_result = on_result
+        self._stages: Dict[str, tuple] = {}
+
+    def add(self, name: str, func: StageFunc, after: Iterable[str] = ()) -> None:
+        """
+        Ajoute une étape.
+
+        Args:
+            name: Nom de l'étape.
+            func: Fonction de l'étape, appelée avec les résultats des étapes terminées.
+            after: Étapes dont celle-ci dépend ; elles doivent avoir été ajoutées avant.
+
+        Raises:
+            ValueError: Si le nom est déjà pris ou si une dépendance est inconnue.
+        """
+        after = tuple(after)
+        if name in self._stages:
+            raise ValueError(f"Étape en double: {name}")
+        unknown = [dependency for dependency in after if dependency not in self._stages]
+        if unknown:
+            raise ValueError(f"L'étape {name} dépend d'étapes inconnues: {', '.join(unknown)}")
+        self._stages[name] = (func, after)
+
+    def _emit(self, name: str, status: str, duration: Optional[float] = None) -> None:
+        if self.on_event is not None:
+            self.on_event(name, status, duration)
+
+    async def run(self, completed: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Exécute toutes les étapes en respectant leurs dépendances.
+
+        Args:
+            completed: Résultats des étapes déjà terminées, qui ne sont pas réexécutées.
+
+        Returns:
+            Résultat de chaque étape, par nom.
+
+        Raises:
+            StageError: Si une étape échoue.
+        """
+        results: Dict[str, Any] = dict(completed or {})
+        restored = set(results)
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_stage(name: str, func: StageFunc, after: tuple) -> None:
+            if name in restored:
+                self._emit(name, "restored")
+                return
+            if after:
+                await asyncio.gather(*(tasks[dependency] for dependency in after))
+            self._emit(name, "started")
+            started = time.perf_counter()
+            try:
+                results[name] = await func(results)
+                if self.on_result is not None:
+                    await self.on_result(name, results[name])
+            except asyncio.CancelledError:
+                raise
+            except StageError:
+                raise
+            except Exception as e:
+                raise StageError(name, e) from e
+            self._emit(name, "completed", time.perf_counter() - started)
+
+        # Les dépendances étant ajoutées avant les étapes qui en dépendent, chaque
+        # tâche est créée après celles qu'elle attend
+        for name, (func, after) in self._stages.items():
+            tasks[name] = asyncio.ensure_future(run_stage(name, func, after))
+        try:
+            await asyncio.gather(*tasks.values())
+        finally:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+        return results
@@ -0,0 +1,650 @@
+import asyncio
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from itertools import islice
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.core.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Nombre maximum d'écritures regroupées dans une même transaction
+WRITE_BATCH_SIZE = 500
+
+# Intervalle (en secondes) entre deux purges des statuts expirés
+EVICTION_INTERVAL = 60.0
+
+# Nombre de statuts lus par requête lors d'un listing
+LIST_CHUNK_SIZE = 200
+
+# Sentinelle d'arrêt du thread d'écriture
+_STOP = object()
+
+# Clé de tri d'un statut dans les listings : (horodatage, ID du pipeline)
+SortKey = Tuple[str, str]
+
+
+class StatusStore:
+    """
+    Interface commune des backends de stockage des statuts de pipeline.
+
+    Un statut est un dictionnaire contenant au minimum les clés `status`,
+    `details` et `timestamp` (et optionnellement `deployment_target`). Chaque
+    écriture incrémente le numéro de `version` du statut et est notifiée aux
+    listeners enregistrés via `add_listener`.
+    """
+
+    def __init__(self):
+        self._listeners: List[Callable[[str, dict], None]] = []
+
+    def get(self, pipeline_id: str) -> Optional[dict]:
+        """
+        Retourne le statut d'un pipeline.
+
+        Args:
+            pipeline_id: ID du pipeline.
+
+        Returns:
+            Le statut du pipeline, ou None s'il est inconnu ou expiré.
+        """
+        raise NotImplementedError
+
+    async def aget(self, pipeline_id: str) -> Optional[dict]:
+        """
+        Version asynchrone de `get`, pour la boucle asyncio : une lecture du backend est faite dans un thread.
+
+        Args:
+            pipeline_id: ID du pipeline.
+
+        Returns:
+            Le statut du pipeline, ou None s'il est inconnu ou expiré.
+        """
+        return await asyncio.to_thread(self.get, pipeline_id)
+
+    def peek(self, pipeline_id: str) -> Optional[dict]:
+        """
+        Retourne le dernier statut d'un pipeline connu de ce processus, sans lecture du backend.
+
+        Args:
+            pipeline_id: ID du pipeline.
+
+        Returns:
+            Le statut du pipeline, ou None s'il n'est pas connu localement.
+        """
+        return self.get(pipeline_id)
+
+    def put(self, pipeline_id: str, record: dict) -> dict:
+        """
+        Enregistre (ou remplace) le statut d'un pipeline.
+
+        Args:
+            pipeline_id: ID du pipeline.
+            record: Statut du pipeline.
+
+        Returns:
+            Le statut enregistré, avec son numéro de version.
+        """
+        # La version précédente est celle connue localement : l'écriture ne lit pas le backend
+        previous = self.peek(pipeline_id)
+        record = dict(record)
+        record["version"] = (previous.get("version", 0) if previous else 0) + 1
+        self._store(pipeline_id, record)
+        for listener in self._listeners:
+            try:
+                listener(pipeline_id, record)
+            except Exception as e:
+                logger.error(f"Erreur lors de la notification du statut de {pipeline_id}: {str(e)}")
+        return record
+
+    def _store(self, pipeline_id: str, record: dict) -> None:
+        """
+        Écrit un statut déjà versionné dans le backend.
+
+        Args:
+            pipeline_id: ID du pipeline.
+            record: Statut du pipeline.
+        """
+        raise NotImplementedError
+
+    def iter_statuses(
+        self,
+        status: Optional[str] = None,
+        deployment_target: Optional[str] = None,
+        since: Optional[str] = None,
+        after: Optional[SortKey] = None,
+        prefix: Optional[str] = None,
+    ) -> Iterator[Tuple[str, dict]]:
+        """
+        Itère sur les statuts par ordre de `(timestamp, pipeline_id)` croissant.
+
+        Les filtres sur le statut et la cible s'appuient sur des index secondaires,
+        et les statuts sont produits au fil de l'eau : le coût d'un listing dépend
+        du nombre de statuts parcourus, pas du nombre total de statuts.
+
+        Args:
+            status: Ne garder que les statuts égaux à cette valeur.
+            deployment_target: Ne garder que cette cible de déploiement.
+            since: Ne garder que les statuts dont l'horodatage ISO 8601 est postérieur ou égal.
+            after: Reprendre après cette clé `(timestamp, pipeline_id)` (pagination par curseur).
+            prefix: Ne garder que les IDs commençant par ce préfixe.
+
+        Returns:
+            Itérateur de couples `(pipeline_id, statut)`.
+        """
+        raise NotImplementedError
+
+    async def aiter_statuses(
+        self,
+        status: Optional[str] = None,
+        deployment_target: Optional[str] = None,
+        since: Optional[str] = None,
+        after: Optional[SortKey] = None,
+        prefix: Optional[str] = None,
+        chunk_size: int = LIST_CHUNK_SIZE,
+    ) -> AsyncIterator[Tuple[str, dict]]:
+        """
+        Version asynchrone de `iter_statuses`, pour la boucle asyncio.
+
+        Les statuts sont lus par lots de `chunk_size` dans un thread
+        (`asyncio.to_thread`), de sorte que les requêtes du backend ne bloquent
+        pas la boucle.
+
+        Yields:
+            Couples `(pipeline_id, statut)`, dans l'ordre de `iter_statuses`.
+        """
+        statuses = self.iter_statuses(status, deployment_target, since, after, prefix)
+        while True:
+            chunk = await asyncio.to_thread(lambda: list(islice(statuses, chunk_size)))
+            for item in chunk:
+                yield item
+            if len(chunk) < chunk_size:
+                return
+
+    def add_listener(self, listener: Callable[[str, dict], None]) -> None:
+        """
+        Enregistre une fonction appelée avec `(pipeline_id, record)` à chaque écriture.
+
+        Args:
+            listener: Fonction à appeler.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[str, dict], None]) -> None:
+        """
+        Retire une fonction enregistrée via `add_listener`.
+
+        Args:
+            listener: Fonction à retirer.
+        """
+        self._listeners.remove(listener)
+
+    def open(self) -> None:
+        """(Ré)ouvre les ressources du backend ; appelé automatiquement après un `close()`."""
+
+    def flush(self) -> None:
+        """Attend que toutes les écritures en attente soient persistées."""
+
+    def close(self) -> None:
+        """Libère les ressources du backend."""
+
+    def __contains__(self, pipeline_id: str) -> bool:
+        return self.get(pipeline_id) is not None
+
+
+class MemoryStatusStore(StatusStore):
+    """
+    Backend en mémoire, borné en taille et avec expiration des statuts.
+
+    Utile pour les tests et le développement ; les statuts ne survivent pas à un
+    redémarrage et ne sont pas partagés entre workers.
+    """
+
+    def __init__(self, maxsize: int = 100_000, ttl: Optional[float] = None):
+        super().__init__()
+        self._cache = LRUCache(maxsize=maxsize, ttl=ttl, on_evict=self._unindex)
+        self._index = _SortedIndex()
+        self._index_lock = threading.Lock()
+
+    def get(self, pipeline_id: str) -> Optional[dict]:
+        return self._cache.get(pipeline_id)
+
+    async def aget(self, pipeline_id: str) -> Optional[dict]:
+        return self.get(pipeline_id)
+
+    def _store(self, pipeline_id: str, record: dict) -> None:
+        previous = self._cache.get(pipeline_id)
+        with self._index_lock:
+            if previous is not None:
+                self._index.remove(pipeline_id, previous)
+            self._index.add(pipeline_id, record)
+        self._cache.set(pipeline_id, record)
+
+    def _unindex(self, pipeline_id: str, record: dict) -> None:
+        with self._index_lock:
+            self._index.remove(pipeline_id, record)
+
+    def iter_statuses(
+        self,
+        status: Optional[str] = None,
+        deployment_target: Optional[str] = None,
+        since: Optional[str] = None,
+        after: Optional[SortKey] = None,
+        prefix: Optional[str] = None,
+    ) -> Iterator[Tuple[str, dict]]:
+        # Parcourir l'index le plus sélectif, puis filtrer sur les autres critères
+        candidates = [("all", None)]
+        if status is not None:
+            candidates.append(("status", status))
+        if deployment_target is not None:
+            candidates.append(("deployment_target", deployment_target))
+        with self._index_lock:
+            field, value = min(candidates, key=lambda c: self._index.size(*c))
+
+        for pipeline_id in self._index.iter_from(field, value, since, after, self._index_lock):
+            record = self._cache.get(pipeline_id)
+            if record is None:
+                continue
+            if status is not None and record.get("status") != status:
+                continue
+            if deployment_target is not None and record.get("deployment_target") != deployment_target:
+                continue
+            if prefix is not None and not pipeline_id.startswith(prefix):
+                continue
+            yield pipeline_id, record
+
+
+class _SortedIndex:
+    """
+    Index secondaires en mémoire : pour chaque champ indexé et chaque valeur,
+    liste des clés `(timestamp, pipeline_id)` triée, maintenue à l'écriture.
+    """
+
+    FIELDS = ("status", "deployment_target")
+
+    def __init__(self):
+        # (champ, valeur) -> clés triées ; ("all", None) indexe tous les statuts
+        self._keys: Dict[Tuple[str, Optional[str]], List[SortKey]] = defaultdict(list)
+
+    def _entries(self, pipeline_id: str, record: dict):
+        key = (record.get("timestamp") or "", pipeline_id)
+        yield ("all", None), key
+        for field in self.FIELDS:
+            yield (field, record.get(field)), key
+
+    def add(self, pipeline_id: str, record: dict) -> None:
+        for index, key in self._entries(pipeline_id, record):
+            insort(self._keys[index], key)
+
+    def remove(self, pipeline_id: str, record: dict) -> None:
+        for index, key in self._entries(pipeline_id, record):
+            keys = self._keys.get(index)
+            if keys is None:
+                continue
+            position = bisect_left(keys, key)
+            if position < len(keys) and keys[position] == key:
+                del keys[position]
+            if not keys:
+                del self._keys[index]
+
+    def size(self, field: str, value: Optional[str]) -> int:
+        keys = self._keys.get((field, value))
+        return len(keys) if keys is not None else 0
+
+    def iter_from(
+        self,
+        field: str,
+        value: Optional[str],
+        since: Optional[str],
+        after: Optional[SortKey],
+        lock: threading.Lock,
+    ) -> Iterator[str]:
+        # La position est recalculée par dichotomie à chaque élément, car l'index
+        # peut être modifié entre deux éléments d'un listing en streaming
+        with lock:
+            keys = self._keys.get((field, value), [])
+            if since is not None and (after is None or (since, "") > after):
+                position = bisect_left(keys, (since, ""))
+            elif after is not None:
+                position = bisect_right(keys, after)
+            else:
+                position = 0
+            key = keys[position] if position < len(keys) else None
+        while key is not None:
+            yield key[1]
+            with lock:
+                keys = self._keys.get((field, value), [])
+                position = bisect_right(keys, key)
+                key = keys[position] if position < len(keys) else None
+
+
+class SQLiteStatusStore(StatusStore):
+    """
+    Backend SQLite avec écritures asynchrones et cache de lecture LRU.
+
+    Les écritures sont mises en file et persistées par lots par un thread dédié,
+    ce qui évite de bloquer la boucle asyncio. Les lectures passent par un cache
+    LRU borné ; un statut pas encore persisté reste lisible immédiatement.
+    Les statuts plus anciens que `ttl` secondes sont purgés périodiquement.
+
+    Une écriture ne lit jamais la base : la version d'un statut est calculée
+    d'après le dernier statut connu de ce processus (écrit ou lu), et l'upsert
+    du thread d'écriture garantit que la version persistée augmente toujours,
+    même si le statut a été modifié par un autre worker entre-temps.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: Optional[float] = None,
+        cache_size: int = 10_000,
+        cache_ttl: Optional[float] = 5.0,
+    ):
+        """
+        Args:
+            path: Chemin du fichier SQLite.
+            ttl: Durée de conservation d'un statut en secondes (None pour illimité).
+            cache_size: Nombre maximum de statuts gardés dans le cache de lecture.
+            cache_ttl: Durée de validité d'une entrée du cache de lecture, afin de
+                voir les mises à jour faites par les autres workers.
+        """
+        super().__init__()
+        self.path = path
+        self.ttl = ttl
+        self._cache = LRUCache(maxsize=cache_size, ttl=cache_ttl)
+        # Derniers statuts écrits ou lus par ce processus, sans expiration (voir `peek`)
+        self._recent = LRUCache(maxsize=cache_size)
+        self._pending: Dict[str, dict] = {}
+        self._pending_lock = threading.Lock()
+        self._queue: "queue.Queue" = queue.Queue()
+
+        self._read_conn: Optional[sqlite3.Connection] = None
+        self._read_lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.open()
+
+    def open(self) -> None:
+        if self._read_conn is None:
+            self._read_conn = self._connect()
+            self._init_schema(self._read_conn)
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._write_loop, name="status-store-writer", daemon=True)
+            self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @staticmethod
+    def _init_schema(conn: sqlite3.Connection) -> None:
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS pipeline_statuses (
+                pipeline_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                deployment_target TEXT,
+                timestamp TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                payload TEXT NOT NULL
+            );
+            DROP INDEX IF EXISTS idx_pipeline_statuses_status;
+            DROP INDEX IF EXISTS idx_pipeline_statuses_target;
+            DROP INDEX IF EXISTS idx_pipeline_statuses_timestamp;
+            CREATE INDEX IF NOT EXISTS idx_pipeline_statuses_status_ts
+                ON pipeline_statuses (status, timestamp, pipeline_id);
+            CREATE INDEX IF NOT EXISTS idx_pipeline_statuses_target_ts
+                ON pipeline_statuses (deployment_target, timestamp, pipeline_id);
+            CREATE INDEX IF NOT EXISTS idx_pipeline_statuses_ts
+                ON pipeline_statuses (timestamp, pipeline_id);
+            CREATE INDEX IF NOT EXISTS idx_pipeline_statuses_updated_at ON pipeline_statuses (updated_at);
+            """
+        )
+
+    def _local(self, pipeline_id: str) -> Optional[dict]:
+        record = self._cache.get(pipeline_id)
+        if record is not None:
+            return record
+        with self._pending_lock:
+            return self._pending.get(pipeline_id)
+
+    def get(self, pipeline_id: str) -> Optional[dict]:
+        record = self._local(pipeline_id)
+        if record is not None:
+            return record
+
+        if self._read_conn is None:
+            self.open()
+        with self._read_lock:
+            row = self._read_conn.execute(
+                "SELECT payload, updated_at FROM pipeline_statuses WHERE pipeline_id = ?",
+                (pipeline_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        if self.ttl is not None and row[1] < time.time() - self.ttl:
+            return None
+
+        record = json.loads(row[0])
+        self._cache.set(pipeline_id, record)
+        self._recent.set(pipeline_id, record)
+        return record
+
+    async def aget(self, pipeline_id: str) -> Optional[dict]:
+        record = self._local(pipeline_id)
+        if record is not None:
+            return record
+        return await asyncio.to_thread(self.get, pipeline_id)
+
+    def peek(self, pipeline_id: str) -> Optional[dict]:
+        record = self._local(pipeline_id)
+        return record if record is not None else self._recent.get(pipeline_id)
+
+    def _store(self, pipeline_id: str, record: dict) -> None:
+        if self._read_conn is None:
+            self.open()
+        with self._pending_lock:
+            self._pending[pipeline_id] = record
+        self._cache.set(pipeline_id, record)
+        self._recent.set(pipeline_id, record)
+        self._queue.put((pipeline_id, record, time.time()))
+
+    def iter_statuses(
+        self,
+        status: Optional[str] = None,
+        deployment_target: Optional[str] = None,
+        since: Optional[str] = None,
+        after: Optional[SortKey] = None,
+        prefix: Optional[str] = None,
+    ) -> Iterator[Tuple[str, dict]]:
+        # Les statuts pas encore persistés par le thread d'écriture apparaîtront
+        # dans les listings suivants
+        conditions, params = [], []
+        if status is not None:
+            conditions.append("status = ?")
+            params.append(status)
+        if deployment_target is not None:
+            conditions.append("deployment_target = ?")
+            params.append(deployment_target)
+        if since is not None:
+            conditions.append("timestamp >= ?")
+            params.append(since)
+        if prefix is not None:
+            conditions.append("substr(pipeline_id, 1, ?) = ?")
+            params += [len(prefix), prefix]
+        if self.ttl is not None:
+            conditions.append("updated_at >= ?")
+            params.append(time.time() - self.ttl)
+
+        if self._read_conn is None:
+            self.open()
+        # Pagination par clé : chaque lot reprend après la dernière clé lue, sans
+        # garder de curseur SQLite ouvert entre deux lots
+        while True:
+            where = list(conditions)
+            chunk_params = list(params)
+            if after is not None:
+                where.append("(timestamp, pipeline_id) > (?, ?)")
+                chunk_params += list(after)
+            query = "SELECT pipeline_id, timestamp, payload FROM pipeline_statuses"
+            if where:
+                query += " WHERE " + " AND ".join(where)
+            query += " ORDER BY timestamp, pipeline_id LIMIT ?"
+            with self._read_lock:
+                rows = self._read_conn.execute(query, chunk_params + [LIST_CHUNK_SIZE]).fetchall()
+            for pipeline_id, timestamp, payload in rows:
+                yield pipeline_id, json.loads(payload)
+            if len(rows) < LIST_CHUNK_SIZE:
+                return
+            after = (rows[-1][1], rows[-1][0])
+
+    def flush(self) -> None:
+        self._queue.join()
+
+    def evict_expired(self) -> int:
+        """
+        Supprime les statuts plus anciens que le TTL.
+
+        Returns:
+            Nombre de statuts supprimés.
+        """
+        if self.ttl is None:
+            return 0
+        with self._read_lock:
+            cursor = self._read_conn.execute(
+                "DELETE FROM pipeline_statuses WHERE updated_at < ?",
+                (time.time() - self.ttl,),
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+        if self._read_conn is not None:
+            self._read_conn.close()
+            self._read_conn = None
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        last_eviction = time.monotonic()
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=EVICTION_INTERVAL)
+                except queue.Empty:
+                    item = None
+
+                batch: List[Tuple[str, dict, float]] = []
+                stop = False
+                while item is not None:
+                    if item is _STOP:
+                        stop = True
+                        self._queue.task_done()
+                        break
+                    batch.append(item)
+                    if len(batch) >= WRITE_BATCH_SIZE:
+                        break
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        item = None
+
+                if batch:
+                    self._write_batch(conn, batch)
+
+                if time.monotonic() - last_eviction >= EVICTION_INTERVAL:
+                    last_eviction = time.monotonic()
+                    try:
+                        self.evict_expired()
+                    except sqlite3.Error as e:
+                        logger.error(f"Erreur lors de la purge des statuts expirés: {str(e)}")
+
+                if stop:
+                    return
+        finally:
+            conn.close()
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: List[Tuple[str, dict, float]]) -> None:
+        rows = [
+            (
+                pipeline_id,
+                record.get("status"),
+                record.get("deployment_target"),
+                record.get("timestamp"),
+                updated_at,
+                json.dumps(record),
+            )
+            for pipeline_id, record, updated_at in batch
+        ]
+        try:
+            conn.execute("BEGIN")
+            # La version persistée dépasse toujours la précédente, même si le statut
+            # a été écrit par un autre worker (ou avant un redémarrage)
+            conn.executemany(
+                """
+                INSERT INTO pipeline_statuses (pipeline_id, status, deployment_target, timestamp, updated_at, payload)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(pipeline_id) DO UPDATE SET
+                    status = excluded.status,
+                    deployment_target = excluded.deployment_target,
+                    timestamp = excluded.timestamp,
+                    updated_at = excluded.updated_at,
+                    payload = json_set(excluded.payload, '$.version', max(
+                        json_extract(excluded.payload, '$.version'),
+                        coalesce(json_extract(pipeline_statuses.payload, '$.version'), 0) + 1
+                    ))
+                """,
+                rows,
+            )
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            conn.execute("ROLLBACK")
+            logger.error(f"Erreur lors de l'écriture des statuts de pipeline: {str(e)}")
+        finally:
+            with self._pending_lock:
+                for pipeline_id, record, _ in batch:
+                    if self._pending.get(pipeline_id) is record:
+                        del self._pending[pipeline_id]
+            for _ in batch:
+                self._queue.task_done()
+
+
+def create_status_store(
+    database_url: str,
+    ttl: Optional[float] = None,
+    cache_size: int = 10_000,
+    cache_ttl: Optional[float] = 5.0,
+) -> StatusStore:
+    """
+    Crée le backend de stockage des statuts correspondant à une URL de base de données.
+
+    Args:
+        database_url: URL de la base (`sqlite:///chemin.db` ou `memory://`).
+        ttl: Durée de conservation d'un statut en secondes.
+        cache_size: Taille du cache de lecture.
+        cache_ttl: Durée de validité d'une entrée du cache de lecture.
+
+    Returns:
+        Le backend de stockage.
+    """
+    if database_url.startswith("memory://") or database_url == "sqlite:///:memory:":
+        return MemoryStatusStore(maxsize=max(cache_size, 100_000), ttl=ttl)
+    if database_url.startswith("sqlite:///"):
+        return SQLiteStatusStore(
+            database_url[len("sqlite:///"):],
+            ttl=ttl,
+            cache_size=cache_size,
+            cache_ttl=cache_ttl,
+        )
+    raise ValueError(f"Backend de stockage des statuts non supporté: {database_url}")
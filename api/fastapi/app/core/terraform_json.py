@@ -0,0 +1,325 @@
+import json
+from typing import Any, Dict, List
+
+# Sections du document Terraform dont les entrées sont indexées par type puis par nom
+_TYPED_SECTIONS = ("resource", "data")
+
+# Sections dont les entrées sont indexées directement par nom
+_NAMED_SECTIONS = ("provider", "variable", "output", "module")
+
+
+def resource_name(config: Any) -> str:
+    """
+    Retourne le nom des ressources Terraform dérivé du nom du pipeline.
+
+    Args:
+        config: Configuration du pipeline.
+
+    Returns:
+        Nom normalisé (minuscules, espaces remplacés par des tirets).
+    """
+    return config.name.replace(" ", "-").lower()
+
+
+def build_terraform_document(config: Any) -> Dict[str, Any]:
+    """
+    Construit le document Terraform (syntaxe JSON) pour la plateforme cible.
+
+    Args:
+        config: Configuration du pipeline (`name`, `deployment_target`, `nodes`).
+
+    Returns:
+        Document Terraform sous forme d'arbre de dictionnaires.
+    """
+    target_platform = config.deployment_target
+
+    if target_platform == "k3s-local":
+        return build_k3s_terraform_document(config)
+    elif target_platform == "exoscale":
+        return build_exoscale_terraform_document(config)
+    elif target_platform == "vastai":
+        return build_vastai_terraform_document(config)
+    elif target_platform == "runpod":
+        return build_runpod_terraform_document(config)
+    else:
+        raise ValueError(f"Plateforme cible non supportée: {target_platform}")
+
+
+def build_k3s_terraform_document(config: Any) -> Dict[str, Any]:
+    """
+    Construit le document Terraform pour le déploiement sur K3s local.
+
+    Args:
+        config: Configuration du pipeline.
+
+    Returns:
+        Document Terraform.
+    """
+    name = resource_name(config)
+    return {
+        "terraform": {
+            "required_providers": {
+                "kubernetes": {"source": "hashicorp/kubernetes", "version": "2.20.0"},
+            },
+        },
+        "provider": {
+            "kubernetes": {"config_path": "~/.kube/config"},
+        },
+        "resource": {
+            "kubernetes_deployment": {
+                "ml_pipeline": {
+                    "metadata": {"name": name, "labels": {"app": name}},
+                    "spec": {
+                        "replicas": 1,
+                        "selector": {"match_labels": {"app": name}},
+                        "template": {
+                            "metadata": {"labels": {"app": name}},
+                            "spec": {
+                                "container": {
+                                    "image": "nginx:latest",
+                                    "name": name,
+                                    "port": {"container_port": 80},
+                                },
+                            },
+                        },
+                    },
+                },
+            },
+            "kubernetes_service": {
+                "ml_pipeline": {
+                    "metadata": {"name": name},
+                    "spec": {
+                        "selector": {"app": name},
+                        "port": {"protocol": "TCP", "port": 80, "target_port": 80},
+                        "type": "LoadBalancer",
+                    },
+                },
+            },
+        },
+    }
+
+
+def build_exoscale_terraform_document(config: Any) -> Dict[str, Any]:
+    """
+    Construit le document Terraform pour le déploiement sur Exoscale.
+
+    Args:
+        config: Configuration du pipeline.
+
+    Returns:
+        Document Terraform.
+    """
+    name = resource_name(config)
+    return {
+        "terraform": {
+            "required_providers": {
+                "exoscale": {"source": "exoscale/exoscale", "version": "0.50.0"},
+            },
+        },
+        "provider": {
+            "exoscale": {
+                "key": "${var.exoscale_api_key}",
+                "secret": "${var.exoscale_api_secret}",
+            },
+        },
+        "resource": {
+            "exoscale_compute_instance": {
+                "ml_pipeline": {
+                    "name": name,
+                    "type": "standard.medium",
+                    "disk_size": 50,
+                    "image": "ubuntu-22.04",
+                    "security_group_ids": ["${exoscale_security_group.ml_pipeline.id}"],
+                },
+            },
+            "exoscale_security_group": {
+                "ml_pipeline": {"name": f"{name}-sg"},
+            },
+            "exoscale_security_group_rule": {
+                "ml_pipeline_http": {
+                    "security_group_id": "${exoscale_security_group.ml_pipeline.id}",
+                    "type": "ingress",
+                    "protocol": "tcp",
+                    "start_port": 80,
+                    "end_port": 80,
+                    "cidr": "0.0.0.0/0",
+                },
+            },
+        },
+    }
+
+
+def build_vastai_terraform_document(config: Any) -> Dict[str, Any]:
+    """
+    Construit le document Terraform pour le déploiement sur Vast.ai.
+
+    Vast.ai n'a pas de provider Terraform officiel : le document ne contient que
+    la configuration du pipeline, le déploiement passant par leur API.
+
+    Args:
+        config: Configuration du pipeline.
+
+    Returns:
+        Document Terraform.
+    """
+    return {
+        "//": "Vast.ai does not have an official Terraform provider. Deployment would be done via their API.",
+        "locals": {
+            "pipeline_name": config.name,
+            "target_platform": config.deployment_target,
+            "nodes": config.nodes,
+        },
+    }
+
+
+def build_runpod_terraform_document(config: Any) -> Dict[str, Any]:
+    """
+    Construit le document Terraform pour le déploiement sur RunPod.
+
+    Args:
+        config: Configuration du pipeline.
+
+    Returns:
+        Document Terraform.
+    """
+    name = resource_name(config)
+    return {
+        "terraform": {
+            "required_providers": {
+                "runpod": {"source": "runpod/runpod", "version": "1.0.0"},
+            },
+        },
+        "provider": {
+            "runpod": {"api_key": "${var.runpod_api_key}"},
+        },
+        "resource": {
+            "runpod_pod": {
+                "ml_pipeline": {
+                    "name": name,
+                    "image_name": "runpod/pytorch:2.0.1-py3.10-cuda11.8.0-devel-ubuntu22.04",
+                    "gpu_type_id": "NVIDIA GeForce RTX 4090",
+                    "gpu_count": 1,
+                    "container_disk_in_gb": 40,
+                    "volume_in_gb": 0,
+                    "volume_mount_path": "/runpod-volume",
+                    "cloud_type": "ALL",
+                    "min_vcpu_count": 2,
+                    "min_memory_in_gb": 15,
+                    "docker_args": "",
+                    "ports": "",
+                    "env": {},
+                    "template_id": "",
+                    "container_name": "runpod-container",
+                    "start_ssh": True,
+                    "is_public": False,
+                    "shutdown_timeout": 5,
+                },
+            },
+        },
+    }
+
+
+def render_tf_json(document: Dict[str, Any]) -> str:
+    """
+    Sérialise un document Terraform au format `.tf.json`.
+
+    Les clés sont triées afin que deux documents identiques produisent
+    exactement le même contenu.
+
+    Args:
+        document: Document Terraform.
+
+    Returns:
+        Contenu du fichier `.tf.json`.
+    """
+    return json.dumps(document, indent=2, sort_keys=True)
+
+
+def _addressable_blocks(document: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Indexe les blocs d'un document Terraform par adresse (`type.nom`, `data.type.nom`, ...).
+
+    Args:
+        document: Document Terraform.
+
+    Returns:
+        Dictionnaire adresse -> contenu du bloc.
+    """
+    blocks: Dict[str, Any] = {}
+    for section, content in document.items():
+        if section in _TYPED_SECTIONS:
+            prefix = "" if section == "resource" else f"{section}."
+            for block_type, instances in content.items():
+                for block_name, body in instances.items():
+                    blocks[f"{prefix}{block_type}.{block_name}"] = body
+        elif section in _NAMED_SECTIONS:
+            for block_name, body in content.items():
+                blocks[f"{section}.{block_name}"] = body
+        else:
+            blocks[section] = content
+    return blocks
+
+
+def _diff_values(old: Any, new: Any, path: str, changes: List[Dict[str, Any]]) -> None:
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in sorted(set(old) | set(new), key=str):
+            child = f"{path}.{key}" if path else str(key)
+            if key not in old:
+                changes.append({"path": child, "old": None, "new": new[key]})
+            elif key not in new:
+                changes.append({"path": child, "old": old[key], "new": None})
+            else:
+                _diff_values(old[key], new[key], child, changes)
+    elif old != new:
+        changes.append({"path": path, "old": old, "new": new})
+
+
+def diff_terraform_documents(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Calcule le delta structurel entre deux rendus d'un document Terraform.
+
+    Args:
+        old: Document Terraform précédent.
+        new: Nouveau document Terraform.
+
+    Returns:
+        Blocs à créer (`create`), à supprimer (`delete`) et à modifier (`update`,
+        avec la liste des attributs modifiés), triés par adresse.
+    """
+    old_blocks = _addressable_blocks(old)
+    new_blocks = _addressable_blocks(new)
+    delta: Dict[str, List[Dict[str, Any]]] = {"create": [], "update": [], "delete": []}
+
+    for address in sorted(set(old_blocks) | set(new_blocks)):
+        if address not in old_blocks:
+            delta["create"].append({"address": address, "body": new_blocks[address]})
+        elif address not in new_blocks:
+            delta["delete"].append({"address": address, "body": old_blocks[address]})
+        else:
+            changes: List[Dict[str, Any]] = []
+            _diff_values(old_blocks[address], new_blocks[address], "", changes)
+            if changes:
+                delta["update"].append({"address": address, "changes": changes})
+
+    return delta
+
+
+def plan_targets(delta: Dict[str, List[Dict[str, Any]]]) -> List[str]:
+    """
+    Retourne les arguments `-target` limitant `terraform plan/apply` aux ressources modifiées.
+
+    Args:
+        delta: Delta retourné par `diff_terraform_documents`.
+
+    Returns:
+        Liste d'arguments `-target=<adresse>` (vide si seules des sections
+        globales ont changé, auquel cas un plan complet est nécessaire).
+    """
+    targets = []
+    for action in ("create", "update", "delete"):
+        for entry in delta[action]:
+            address = entry["address"]
+            if address.split(".")[0] in _NAMED_SECTIONS or "." not in address:
+                return []
+            targets.append(f"-target={address}")
+    return targets
@@ -0,0 +1,373 @@
+import asyncio
+import logging
+import random
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+# Codes HTTP pour lesquels une requête est réessayée
+RETRYABLE_STATUS_CODES = (429, 502, 503, 504)
+
+# Codes HTTP indiquant que la requête a été refusée sans être traitée : seuls
+# ceux-ci permettent de réessayer une requête non idempotente
+REJECTED_STATUS_CODES = (429, 503)
+
+
+class WindmillError(Exception):
+    """Erreur lors d'un appel à l'API Windmill."""
+
+
+class CircuitOpenError(WindmillError):
+    """Levée lorsque le circuit breaker bloque les appels à Windmill."""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker à trois états (fermé, ouvert, semi-ouvert).
+
+    Après `failure_threshold` échecs consécutifs, le circuit s'ouvre et les
+    appels sont refusés pendant `reset_timeout` secondes ; un appel d'essai est
+    ensuite autorisé, qui referme le circuit s'il réussit. Un appel d'essai
+    interrompu sans résultat (ex. annulé) doit être rendu via `release_trial`.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_progress = False
+
+    @property
+    def state(self) -> str:
+        """État du circuit : "closed", "open" ou "half_open"."""
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """
+        Indique si un appel peut être tenté.
+
+        Returns:
+            True si le circuit est fermé, ou s'il est semi-ouvert et qu'aucun
+            appel d'essai n'est en cours.
+        """
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial_in_progress:
+            self._trial_in_progress = True
+            return True
+        return False
+
+    def release_trial(self) -> None:
+        """Rend l'appel d'essai en cours sans résultat : un nouvel essai pourra être tenté."""
+        self._trial_in_progress = False
+
+    def record_success(self) -> None:
+        """Enregistre un appel réussi et referme le circuit."""
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_progress = False
+
+    def record_failure(self) -> None:
+        """Enregistre un appel en échec et ouvre le circuit si le seuil est atteint."""
+        self.failures += 1
+        self._trial_in_progress = False
+        if self.failures >= self.failure_threshold or self.opened_at is not None:
+            self.opened_at = time.monotonic()
+
+
+class WindmillClient:
+    """
+    Client asynchrone de l'API Windmill.
+
+    Un seul `httpx.AsyncClient` est partagé pendant toute la durée de vie de
+    l'application (connexions keep-alive, HTTP/2 si disponible), afin de ne pas
+    payer une poignée de main TCP/TLS à chaque déploiement. Les appels sont
+    réessayés avec un backoff exponentiel à jitter complet et protégés par un
+    circuit breaker.
+
+    `httpx` n'est importé qu'à l'ouverture du client, afin de ne pas allonger le
+    démarrage de l'API lorsque Windmill n'est pas utilisé.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        token: str = "",
+        workspace: str = "mlops",
+        flow_path: str = "f/mlops/ml_pipeline_deployment",
+        timeout: float = 10.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        http2: bool = True,
+        max_retries: int = 3,
+        backoff: float = 0.2,
+        backoff_max: float = 5.0,
+        breaker: Optional[CircuitBreaker] = None,
+        transport: Optional["httpx.AsyncBaseTransport"] = None,
+    ):
+        """
+        Args:
+            base_url: URL de l'API Windmill.
+            token: Jeton d'API Windmill (client désactivé si vide et sans transport).
+            workspace: Workspace Windmill.
+            flow_path: Chemin du flow de déploiement.
+            timeout: Timeout des requêtes en secondes.
+            max_connections: Nombre maximum de connexions simultanées.
+            max_keepalive_connections: Nombre maximum de connexions gardées ouvertes.
+            http2: Utiliser HTTP/2 (nécessite le paquet `h2`).
+            max_retries: Nombre maximum de nouvelles tentatives.
+            backoff: Délai de base du backoff exponentiel en secondes.
+            backoff_max: Délai maximum entre deux tentatives en secondes.
+            breaker: Circuit breaker (un nouveau par défaut).
+            transport: Transport httpx (pour les tests contre un serveur stub).
+        """
+        self.base_url = base_url.rstrip("/")
+        self.token = token
+        self.workspace = workspace
+        self.flow_path = flow_path
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.http2 = http2
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.transport = transport
+        self._client: Optional["httpx.AsyncClient"] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def enabled(self) -> bool:
+        """Indique si le client est configuré pour appeler une vraie instance Windmill."""
+        return bool(self.token) or self.transport is not None
+
+    async def start(self) -> None:
+        """Crée le client HTTP partagé sur la boucle asyncio courante."""
+        loop = asyncio.get_running_loop()
+        if self._client is not None and self._loop is loop and not self._client.is_closed:
+            return
+        import httpx
+
+        http2 = self.http2
+        if http2 and self.transport is None:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("Paquet 'h2' non installé, utilisation de HTTP/1.1 pour Windmill.")
+                http2 = False
+        headers = {"Authorization": f"Bearer {self.token}"} if self.token else {}
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=headers,
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+            ),
+            http2=http2,
+            transport=self.transport,
+        )
+        self._loop = loop
+
+    async def close(self) -> None:
+        """Ferme le client HTTP partagé."""
+        if self._client is not None:
+            if self._loop is asyncio.get_running_loop():
+                await self._client.aclose()
+            self._client = None
+
+    async def run_flow(self, args: Dict[str, Any]) -> str:
+        """
+        Déclenche le flow de déploiement.
+
+        Le déclenchement n'est pas idempotent : il n'est réessayé que si la
+        requête n'a pas pu être envoyée ou a été refusée sans être traitée,
+        afin de ne jamais lancer deux fois le même déploiement.
+
+        Args:
+            args: Entrées du flow.
+
+        Returns:
+            ID du job Windmill.
+        """
+        response = await self._request(
+            "POST", f"/api/w/{self.workspace}/jobs/run/f/{self.flow_path}", idempotent=False, json=args,
+        )
+        return response.text.strip().strip('"')
+
+    async def get_job_result(self, job_id: str) -> Dict[str, Any]:
+        """
+        Récupère l'état d'un job Windmill.
+
+        Args:
+            job_id: ID du job.
+
+        Returns:
+            Dictionnaire avec `completed`, `success` et `result`.
+        """
+        response = await self._request("GET", f"/api/w/{self.workspace}/jobs_u/completed/get_result_maybe/{job_id}")
+        return response.json()
+
+    async def _request(self, method: str, path: str, idempotent: bool = True, **kwargs) -> "httpx.Response":
+        """
+        Envoie une requête à Windmill, avec nouvelles tentatives et circuit breaker.
+
+        Args:
+            method: Méthode HTTP.
+            path: Chemin de la requête.
+            idempotent: Si False, la requête n'est réessayée que si elle n'a pas
+                pu être envoyée (échec de connexion) ou a été refusée sans être
+                traitée (429, 503) ; un timeout de lecture ou une autre erreur
+                5xx peut survenir après son traitement.
+            **kwargs: Arguments de `httpx.AsyncClient.request`.
+
+        Returns:
+            La réponse de Windmill.
+
+        Raises:
+            CircuitOpenError: Si le circuit est ouvert.
+            WindmillError: Si la requête échoue.
+        """
+        import httpx
+
+        # Erreurs de transport survenues avant l'envoi de la requête
+        unsent_errors = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+        await self.start()
+        last_error: Optional[Exception] = None
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow():
+                raise CircuitOpenError("Circuit ouvert : l'API Windmill est temporairement indisponible.")
+            try:
+                response = await self._client.request(method, path, **kwargs)
+            except httpx.TransportError as e:
+                self.breaker.record_failure()
+                last_error = e
+                if not idempotent and not isinstance(e, unsent_errors):
+                    break
+            except BaseException:
+                # Appel interrompu (annulation, erreur inattendue) : Windmill n'est pas
+                # jugé, mais un éventuel appel d'essai doit être rendu
+                self.breaker.release_trial()
+                raise
+            else:
+                if response.status_code in RETRYABLE_STATUS_CODES or response.status_code >= 500:
+                    self.breaker.record_failure()
+                    last_error = WindmillError(f"Windmill a répondu {response.status_code}: {response.text[:200]}")
+                    if not idempotent and response.status_code not in REJECTED_STATUS_CODES:
+                        break
+                elif response.status_code >= 400:
+                    # Erreur du client : inutile de réessayer, et Windmill n'est pas en cause
+                    self.breaker.record_success()
+                    raise WindmillError(f"Windmill a répondu {response.status_code}: {response.text[:200]}")
+                else:
+                    self.breaker.record_success()
+                    return response
+            if attempt < self.max_retries:
+                await asyncio.sleep(random.uniform(0, min(self.backoff_max, self.backoff * 2 ** attempt)))
+        raise WindmillError(f"Échec de l'appel à Windmill après {attempt + 1} tentative(s): {last_error}")
+
+
+class WindmillJobPoller:
+    """
+    Suivi des jobs Windmill en cours : leur état est relevé périodiquement et
+    reporté via un callback, jusqu'à leur terminaison.
+
+    Une seule tâche relève tous les jobs suivis à chaque intervalle, avec un
+    nombre borné de requêtes simultanées.
+    """
+
+    def __init__(
+        self,
+        client: WindmillClient,
+        on_update: Callable[[List[str], str, str], None],
+        interval: float = 5.0,
+        timeout: float = 3600.0,
+        concurrency: int = 10,
+    ):
+        """
+        Args:
+            client: Client Windmill.
+            on_update: Callback appelé avec `(ids, statut, détails)` à chaque transition.
+            interval: Intervalle entre deux relevés en secondes.
+            timeout: Durée maximale de suivi d'un job en secondes.
+            concurrency: Nombre maximum de requêtes de relevé simultanées.
+        """
+        self.client = client
+        self.on_update = on_update
+        self.interval = interval
+        self.timeout = timeout
+        self.concurrency = concurrency
+        # ID du job -> (IDs de statut à mettre à jour, début du suivi, dernier statut)
+        self._jobs: Dict[str, Tuple[List[str], float, str]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def track(self, job_id: str, status_ids: List[str]) -> None:
+        """
+        Ajoute un job au suivi.
+
+        Args:
+            job_id: ID du job Windmill.
+            status_ids: IDs des statuts à mettre à jour (pipeline, workflow).
+        """
+        self._jobs[job_id] = (status_ids, time.monotonic(), "initiated")
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="windmill-job-poller")
+
+    @property
+    def tracked(self) -> int:
+        """Nombre de jobs suivis."""
+        return len(self._jobs)
+
+    async def stop(self) -> None:
+        """Arrête le suivi des jobs."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def poll_once(self) -> None:
+        """Relève l'état de tous les jobs suivis."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def poll(job_id: str) -> None:
+            status_ids, started_at, last_status = self._jobs[job_id]
+            async with semaphore:
+                try:
+                    result = await self.client.get_job_result(job_id)
+                except WindmillError as e:
+                    logger.warning(f"Impossible de relever le job Windmill {job_id}: {str(e)}")
+                    result = None
+
+            if result is not None and result.get("completed"):
+                del self._jobs[job_id]
+                if result.get("success"):
+                    self.on_update(status_ids, "completed", f"Job Windmill {job_id} terminé avec succès.")
+                else:
+                    self.on_update(status_ids, "failed", f"Job Windmill {job_id} en échec: {result.get('result')}")
+            elif time.monotonic() - started_at > self.timeout:
+                del self._jobs[job_id]
+                self.on_update(status_ids, "failed", f"Job Windmill {job_id} non terminé après {self.timeout:.0f} secondes.")
+            elif result is not None and last_status != "running":
+                self._jobs[job_id] = (status_ids, started_at, "running")
+                self.on_update(status_ids, "running", f"Job Windmill {job_id} en cours d'exécution.")
+
+        await asyncio.gather(*(poll(job_id) for job_id in list(self._jobs)))
+
+    async def _run(self) -> None:
+        while self._jobs:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.poll_once()
+            except Exception as e:
+                logger.error(f"Erreur lors du suivi des jobs Windmill: {str(e)}")
@@ -1,19 +1,38 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict
-import uvicorn
-import os
+from typing import List, Optional, Dict, Tuple
+import asyncio
+import base64
 import json
-import subprocess
-import tempfile
+import uuid
+import zlib
 from datetime import datetime
 
 # Importer les configurations
 from app.core.config import settings
+from app.core.batch import process_pipeline_in_pool, shutdown_process_pool
+from app.core.cache import LRUCache
+from app.core.idempotency import IdempotencyConflict, IdempotencyStore, SingleFlight
+from app.core.jobs import JobQueue, JobQueueFull
+from app.core.load_shedding import LoadMonitor, LoadSheddingMiddleware
+from app.core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsRegistry, PrometheusMiddleware
+from app.core.pubsub import StatusBroker
+from app.core.status_store import create_status_store
+from app.core.pipelines import (
+    TERRAFORM_FORMATS,
+    config_hash,
+    pipeline_config_errors,
+    render_terraform_code,
+    validate_pipeline_config,
+)
+from app.core.terraform_json import build_terraform_document, diff_terraform_documents, plan_targets
+from app.core.windmill import CircuitBreaker, WindmillClient, WindmillJobPoller
+from app.models.pipeline import PipelineConfig
 
 # Importer les routeurs
-from app.routers.autopilot_engine import router as autopilot_router
+from app.routers.autopilot_engine import get_checkpoint_store, get_llm_router, router as autopilot_router
 
 # Créer l'instance de l'application FastAPI
 app = FastAPI(
@@ -22,6 +41,22 @@ app = FastAPI(
     version="1.0.0",
 )
 
+# Délestage des routes coûteuses lorsque le CPU ou le load average dépasse les seuils.
+# Ajouté avant CORS et les métriques : les réponses 503 portent les en-têtes CORS et sont comptées.
+load_monitor = LoadMonitor(
+    cpu_threshold=settings.LOAD_SHEDDING_CPU_THRESHOLD,
+    load_avg_threshold=settings.LOAD_SHEDDING_LOAD_AVG_THRESHOLD,
+    interval=settings.LOAD_SHEDDING_REFRESH_SECONDS,
+)
+app.add_middleware(
+    LoadSheddingMiddleware,
+    monitor=load_monitor,
+    queue_timeout=settings.LOAD_SHEDDING_QUEUE_TIMEOUT_SECONDS,
+    max_queued=settings.LOAD_SHEDDING_MAX_QUEUED,
+    retry_after=settings.LOAD_SHEDDING_RETRY_AFTER_SECONDS,
+    enabled=settings.LOAD_SHEDDING_ENABLED,
+)
+
 # Configuration CORS
 app.add_middleware(
     CORSMiddleware,
@@ -31,20 +66,65 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Métriques Prometheus (nombre de requêtes, latence, erreurs par route), exposées sur /metrics
+metrics_registry = MetricsRegistry()
+app.add_middleware(PrometheusMiddleware, registry=metrics_registry)
+
 # Inclure les routeurs
 app.include_router(autopilot_router)
 
-# Stockage en mémoire pour les statuts de pipeline (à remplacer par une base de données en production)
-pipeline_statuses: Dict[str, dict] = {}
+# Stockage des statuts de pipeline (SQLite par défaut, voir settings.DATABASE_URL)
+status_store = create_status_store(
+    settings.DATABASE_URL,
+    ttl=settings.STATUS_STORE_TTL_SECONDS,
+    cache_size=settings.STATUS_CACHE_SIZE,
+    cache_ttl=settings.STATUS_CACHE_TTL_SECONDS,
+)
+
+# Diffusion des transitions de statut aux clients abonnés (SSE, WebSocket, long-poll)
+status_broker = StatusBroker()
+status_store.add_listener(status_broker.publish)
 
-# Modèles Pydantic pour la validation des données
-class PipelineConfig(BaseModel):
-    name: str
-    description: Optional[str] = None
-    nodes: List[dict]  # Liste des nœuds du pipeline (à définir plus précisément)
-    compute_requirements: dict  # Exigences de calcul (GPU, CPU, mémoire, etc.)
-    deployment_target: str  # Cible de déploiement (k3s-local, exoscale, vastai, runpod)
+# Corps JSON des réponses de statut, sérialisés à l'écriture : ID du pipeline ->
+# (version, horodatage, ETag, corps)
+status_responses = LRUCache(maxsize=settings.STATUS_CACHE_SIZE)
 
+# Statuts après lesquels un pipeline n'évolue plus
+TERMINAL_STATUSES = ("completed", "failed")
+
+@app.on_event("shutdown")
+def close_process_pool():
+    """
+    Arrête le pool de processus des déploiements par lots.
+    """
+    shutdown_process_pool()
+
+# Cache du code Terraform généré, indexé par l'empreinte de la configuration
+terraform_cache = LRUCache(
+    maxsize=settings.TERRAFORM_CACHE_SIZE,
+    ttl=settings.TERRAFORM_CACHE_TTL_SECONDS,
+)
+
+# Client Windmill partagé (connexions keep-alive, nouvelles tentatives, circuit breaker)
+windmill_client = WindmillClient(
+    settings.WINDMILL_API_URL,
+    token=settings.WINDMILL_API_KEY,
+    workspace=settings.WINDMILL_WORKSPACE,
+    flow_path=settings.WINDMILL_FLOW_PATH,
+    timeout=settings.WINDMILL_TIMEOUT_SECONDS,
+    max_connections=settings.WINDMILL_MAX_CONNECTIONS,
+    max_keepalive_connections=settings.WINDMILL_MAX_KEEPALIVE_CONNECTIONS,
+    http2=settings.WINDMILL_HTTP2,
+    max_retries=settings.WINDMILL_MAX_RETRIES,
+    backoff=settings.WINDMILL_RETRY_BACKOFF_SECONDS,
+    backoff_max=settings.WINDMILL_RETRY_BACKOFF_MAX_SECONDS,
+    breaker=CircuitBreaker(
+        failure_threshold=settings.WINDMILL_CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout=settings.WINDMILL_CIRCUIT_RESET_SECONDS,
+    ),
+)
+
+# Modèles Pydantic pour la validation des données
 class PipelineDeploymentResponse(BaseModel):
     pipeline_id: str
     status: str
@@ -55,284 +135,679 @@ class PipelineStatusResponse(BaseModel):
     status: str
     details: str
     timestamp: str
+    version: int = 0
 
 class HealthCheckResponse(BaseModel):
     status: str
     timestamp: str
 
-def validate_pipeline_config(config: PipelineConfig) -> bool:
+class TerraformDiffRequest(BaseModel):
+    old: PipelineConfig
+    new: PipelineConfig
+
+class TerraformDiffResponse(BaseModel):
+    create: List[dict]
+    update: List[dict]
+    delete: List[dict]
+    targets: List[str]
+
+def deployment_fingerprint(config: PipelineConfig, terraform_format: str) -> str:
     """
-    Valide la configuration du pipeline.
+    Calcule l'empreinte d'un déploiement (configuration normalisée et format Terraform).
     
     Args:
         config: Configuration du pipeline.
+        terraform_format: Format du code Terraform.
         
     Returns:
-        True si la configuration est valide, False sinon.
+        Empreinte du déploiement.
     """
-    if not config.name:
-        return False
-    
-    if not config.deployment_target:
-        return False
-    
-    valid_targets = ["k3s-local", "exoscale", "vastai", "runpod"]
-    if config.deployment_target not in valid_targets:
-        return False
-    
-    return True
+    return f"{terraform_format}:{config_hash(config)}"
 
-def generate_terraform_code(config: PipelineConfig) -> str:
+def generate_terraform_code(config: PipelineConfig, output_format: str = "hcl") -> str:
     """
     Génère le code Terraform pour le déploiement du pipeline.
     
+    Le résultat est mis en cache par empreinte de configuration : une
+    configuration déjà rendue n'est pas générée une seconde fois.
+    
     Args:
         config: Configuration du pipeline.
+        output_format: Format de sortie, "hcl" (`main.tf`) ou "json" (`main.tf.json`).
         
     Returns:
         Code Terraform généré.
     """
-    target_platform = config.deployment_target
+    key = deployment_fingerprint(config, output_format)
+    terraform_code = terraform_cache.get(key)
+    if terraform_code is None:
+        terraform_code = render_terraform_code(config, output_format)
+        terraform_cache.set(key, terraform_code)
+    return terraform_code
+
+async def trigger_windmill_workflow(config: PipelineConfig, terraform_code: str) -> str:
+    """
+    Déclenche le workflow Windmill pour le déploiement du pipeline.
     
-    if target_platform == "k3s-local":
-        return generate_k3s_terraform_code(config)
-    elif target_platform == "exoscale":
-        return generate_exoscale_terraform_code(config)
-    elif target_platform == "vastai":
-        return generate_vastai_terraform_code(config)
-    elif target_platform == "runpod":
-        return generate_runpod_terraform_code(config)
+    Sans clé d'API Windmill configurée, le déclenchement est simulé.
+    
+    Args:
+        config: Configuration du pipeline.
+        terraform_code: Code Terraform à déployer.
+        
+    Returns:
+        ID du workflow déclenché.
+    """
+    if windmill_client.enabled:
+        workflow_id = await windmill_client.run_flow({
+            "pipeline_config": {
+                "pipeline_name": config.name,
+                "description": config.description,
+                "target_platform": config.deployment_target,
+                "compute_requirements": config.compute_requirements,
+            },
+            "pipeline_nodes": {"nodes": config.nodes},
+            "terraform_code": terraform_code,
+        })
     else:
-        raise ValueError(f"Plateforme cible non supportée: {target_platform}")
+        workflow_id = f"workflow_{config.name.replace(' ', '_')}_{int(datetime.utcnow().timestamp())}_{uuid.uuid4().hex[:8]}"
+    
+    # Mettre à jour le statut du pipeline
+    status_store.put(workflow_id, {
+        "status": "initiated",
+        "details": f"Workflow {workflow_id} déclenché pour le déploiement du pipeline {config.name}.",
+        "timestamp": datetime.utcnow().isoformat(),
+        "deployment_target": config.deployment_target,
+    })
+    
+    return workflow_id
+
+def follow_workflow(workflow_id: str, pipeline_id: str) -> None:
+    """
+    Suit l'exécution d'un workflow Windmill et reporte son état sur le pipeline.
+    
+    Args:
+        workflow_id: ID du workflow (job) Windmill.
+        pipeline_id: ID de suivi du déploiement.
+    """
+    if windmill_client.enabled:
+        windmill_poller.track(workflow_id, [pipeline_id, workflow_id])
+
+def update_workflow_statuses(status_ids: List[str], status: str, details: str) -> None:
+    """
+    Reporte l'état d'un job Windmill sur les statuts du pipeline et du workflow.
+    
+    Args:
+        status_ids: IDs des statuts à mettre à jour.
+        status: Nouveau statut.
+        details: Détails du statut.
+    """
+    for status_id in status_ids:
+        previous = status_store.peek(status_id) or {}
+        status_store.put(status_id, {
+            "status": status,
+            "details": details,
+            "timestamp": datetime.utcnow().isoformat(),
+            "deployment_target": previous.get("deployment_target"),
+        })
 
-def generate_k3s_terraform_code(config: PipelineConfig) -> str:
+def new_pipeline_id(config: PipelineConfig) -> str:
     """
-    Génère le code Terraform pour le déploiement sur K3s local.
+    Génère l'ID de suivi du déploiement d'un pipeline.
+    
+    Un suffixe aléatoire évite les collisions entre déploiements d'un même
+    pipeline soumis dans la même seconde.
     
     Args:
         config: Configuration du pipeline.
         
     Returns:
-        Code Terraform généré.
+        ID de suivi du déploiement.
+    """
+    return f"pipeline_{config.name.replace(' ', '_')}_{int(datetime.utcnow().timestamp())}_{uuid.uuid4().hex[:8]}"
+
+def set_pipeline_status(pipeline_id: str, config: PipelineConfig, status: str, details: str) -> None:
+    """
+    Met à jour le statut d'un pipeline dans le stockage des statuts.
+    
+    Args:
+        pipeline_id: ID de suivi du déploiement.
+        config: Configuration du pipeline.
+        status: Nouveau statut.
+        details: Détails du statut.
+    """
+    status_store.put(pipeline_id, {
+        "status": status,
+        "details": details,
+        "timestamp": datetime.utcnow().isoformat(),
+        "deployment_target": config.deployment_target,
+    })
+
+def record_pipeline_deployment(config: PipelineConfig, workflow_id: str, pipeline_id: Optional[str] = None) -> str:
     """
-    # C"est un exemple simplifié. Dans la réalité, cela serait plus complexe.
-    return f"""
-terraform {{
-  required_providers {{
-    kubernetes = {{
-      source  = "hashicorp/kubernetes"
-      version = "2.20.0"
-    }}
-  }}
-}}
-
-provider "kubernetes" {{
-  config_path = "~/.kube/config"
-}}
-
-resource "kubernetes_deployment" "ml_pipeline" {{
-  metadata {{
-    name = "{config.name.replace(" ", "-").lower()}"
-    labels = {{
-      app = "{config.name.replace(" ", "-").lower()}"
-    }}
-  }}
-
-  spec {{
-    replicas = 1
-
-    selector {{
-      match_labels = {{
-        app = "{config.name.replace(" ", "-").lower()}"
-      }}
-    }}
-
-    template {{
-      metadata {{
-        labels = {{
-          app = "{config.name.replace(" ", "-").lower()}"
-        }}
-      }}
-
-      spec {{
-        container {{
-          image = "nginx:latest"  # Exemple d"image
-          name  = "{config.name.replace(" ", "-").lower()}"
-
-          port {{
-            container_port = 80
-          }}
-        }}
-      }}
-    }}
-  }}
-}}
-
-resource "kubernetes_service" "ml_pipeline" {{
-  metadata {{
-    name = "{config.name.replace(" ", "-").lower()}"
-  }}
-
-  spec {{
-    selector = {{
-      app = "{config.name.replace(" ", "-").lower()}"
-    }}
-
-    port {{
-      protocol    = "TCP"
-      port        = 80
-      target_port = 80
-    }}
-
-    type = "LoadBalancer"
-  }}
-}}
-"""
-
-def generate_exoscale_terraform_code(config: PipelineConfig) -> str:
-    """
-    Génère le code Terraform pour le déploiement sur Exoscale.
+    Enregistre le statut initial d'un pipeline dont le workflow a été déclenché.
     
     Args:
         config: Configuration du pipeline.
+        workflow_id: ID du workflow Windmill.
+        pipeline_id: ID de suivi du déploiement (généré s'il n'est pas fourni).
         
     Returns:
-        Code Terraform généré.
+        ID de suivi du déploiement.
+    """
+    pipeline_id = pipeline_id or new_pipeline_id(config)
+    set_pipeline_status(
+        pipeline_id,
+        config,
+        "initiated",
+        f"Déploiement du pipeline '{config.name}' initié. Workflow ID: {workflow_id}",
+    )
+    return pipeline_id
+
+async def run_deployment_job(pipeline_id: str, payload: tuple) -> None:
     """
-    # C"est un exemple simplifié. Dans la réalité, cela serait plus complexe.
-    return f"""
-terraform {{
-  required_providers {{
-    exoscale = {{
-      source  = "exoscale/exoscale"
-      version = "0.50.0"
-    }}
-  }}
-}}
-
-provider "exoscale" {{
-  key    = var.exoscale_api_key
-  secret = var.exoscale_api_secret
-}}
-
-resource "exoscale_compute_instance" "ml_pipeline" {{
-  name = "{config.name.replace(" ", "-").lower()}"
-  type = "standard.medium"
-  disk_size = 50
-  image = "ubuntu-22.04"
-  
-  security_group_ids = [
-    exoscale_security_group.ml_pipeline.id
-  ]
-}}
-
-resource "exoscale_security_group" "ml_pipeline" {{
-  name = "{config.name.replace(" ", "-").lower()}-sg"
-}}
-
-resource "exoscale_security_group_rule" "ml_pipeline_http" {{
-  security_group_id = exoscale_security_group.ml_pipeline.id
-  type              = "ingress"
-  protocol          = "tcp"
-  start_port        = 80
-  end_port          = 80
-  cidr              = "0.0.0.0/0"
-}}
-"""
-
-def generate_vastai_terraform_code(config: PipelineConfig) -> str:
-    """
-    Génère le code Terraform pour le déploiement sur Vast.ai.
+    Traite un job de déploiement : génération Terraform puis déclenchement du workflow.
     
     Args:
-        config: Configuration du pipeline.
+        pipeline_id: ID de suivi du déploiement.
+        payload: Configuration du pipeline et format du code Terraform.
+    """
+    config, terraform_format = payload
+    fingerprint = deployment_fingerprint(config, terraform_format)
+    
+    try:
+        try:
+            terraform_code = generate_terraform_code(config, terraform_format)
+        except Exception as e:
+            set_pipeline_status(pipeline_id, config, "failed", f"Erreur lors de la génération du code Terraform: {str(e)}")
+            return
+        
+        try:
+            workflow_id = await trigger_windmill_workflow(config, terraform_code)
+        except Exception as e:
+            set_pipeline_status(pipeline_id, config, "failed", f"Erreur lors du déclenchement du workflow Windmill: {str(e)}")
+            return
+        
+        record_pipeline_deployment(config, workflow_id, pipeline_id)
+        follow_workflow(workflow_id, pipeline_id)
+    finally:
+        if inflight_deployments.get(fingerprint) == pipeline_id:
+            del inflight_deployments[fingerprint]
+
+def abandon_deployment_job(pipeline_id: str, payload: tuple) -> None:
+    """
+    Marque en échec un déploiement abandonné à l'arrêt de la file de déploiement.
+    
+    Le statut `failed` est publié aux abonnés (SSE, WebSocket, long-poll), et
+    un déploiement identique soumis ensuite n'est plus rattaché à ce suivi.
+    
+    Args:
+        pipeline_id: ID de suivi du déploiement.
+        payload: Configuration du pipeline et format du code Terraform.
+    """
+    config, terraform_format = payload
+    fingerprint = deployment_fingerprint(config, terraform_format)
+    if inflight_deployments.get(fingerprint) == pipeline_id:
+        del inflight_deployments[fingerprint]
+    set_pipeline_status(pipeline_id, config, "failed", "Déploiement interrompu par l'arrêt du service.")
+
+# Déploiements en file ou en cours, par empreinte : un déploiement identique
+# soumis entre-temps reçoit le même ID de suivi au lieu d'être refait
+inflight_deployments: Dict[str, str] = {}
+
+# Regroupement des générations Terraform identiques concurrentes d'un lot
+batch_flights = SingleFlight()
+
+# Réponses associées aux clés d'idempotence (en-tête Idempotency-Key)
+idempotency_store = IdempotencyStore(
+    maxsize=settings.IDEMPOTENCY_CACHE_SIZE,
+    ttl=settings.IDEMPOTENCY_KEY_TTL_SECONDS,
+)
+
+# File d'attente des déploiements, traitée par un pool de workers asyncio
+deployment_queue = JobQueue(
+    run_deployment_job,
+    maxsize=settings.DEPLOY_QUEUE_MAXSIZE,
+    workers=settings.DEPLOY_WORKERS,
+    name="deployments",
+    on_abandon=abandon_deployment_job,
+)
+
+# Suivi des jobs Windmill déclenchés, dont l'état est reporté dans le stockage des statuts
+windmill_poller = WindmillJobPoller(
+    windmill_client,
+    update_workflow_statuses,
+    interval=settings.WINDMILL_POLL_INTERVAL_SECONDS,
+    timeout=settings.WINDMILL_JOB_TIMEOUT_SECONDS,
+)
+
+metrics_registry.register_callback(
+    "deployment_queue_depth", "Number of deployment jobs waiting in the queue.",
+    lambda: deployment_queue.metrics()["depth"],
+)
+metrics_registry.register_callback(
+    "deployment_queue_busy_workers", "Number of deployment workers currently processing a job.",
+    lambda: deployment_queue.metrics()["busy_workers"],
+)
+metrics_registry.register_callback(
+    "deployment_queue_wait_seconds_p95", "95th percentile of recent deployment job queue wait times.",
+    lambda: deployment_queue.metrics()["wait_time_p95"],
+)
+metrics_registry.register_callback(
+    "deployment_jobs_rejected_total", "Deployment jobs rejected because the queue was full.",
+    lambda: deployment_queue.metrics()["rejected"], "counter",
+)
+metrics_registry.register_callback(
+    "terraform_cache_hits_total", "Terraform generation cache hits.",
+    lambda: terraform_cache.hits, "counter",
+)
+metrics_registry.register_callback(
+    "terraform_cache_misses_total", "Terraform generation cache misses.",
+    lambda: terraform_cache.misses, "counter",
+)
+metrics_registry.register_callback(
+    "terraform_cache_evictions_total", "Terraform generation cache evictions.",
+    lambda: terraform_cache.evictions, "counter",
+)
+metrics_registry.register_callback(
+    "pipeline_status_subscribers", "Number of clients following pipeline status transitions.",
+    status_broker.subscriber_count,
+)
+metrics_registry.register_callback(
+    "windmill_circuit_open", "Whether calls to the Windmill API are currently blocked by the circuit breaker.",
+    lambda: int(windmill_client.breaker.state == "open"),
+)
+metrics_registry.register_callback(
+    "windmill_jobs_tracked", "Number of Windmill jobs whose status is being polled.",
+    lambda: windmill_poller.tracked,
+)
+
+metrics_registry.register_callback(
+    "load_shedding_overloaded", "Whether expensive routes are currently being shed because of CPU or load average.",
+    lambda: int(load_monitor.overloaded),
+)
+metrics_registry.register_callback(
+    "load_shedding_queued_requests", "Number of requests waiting for the load to drop below the thresholds.",
+    lambda: load_monitor.queued,
+)
+metrics_registry.register_callback(
+    "load_shedding_rejected_total", "Requests rejected with a 503 because the gateway was overloaded.",
+    lambda: load_monitor.rejected, "counter",
+)
+
+def llm_router_metric(read, default=0):
+    """
+    Crée le callback d'une métrique du routeur LLM de l'Autopilot Engine.
+    
+    Le routeur n'est lu que s'il a déjà été créé : une collecte de `/metrics`
+    ne doit pas le construire (ni ouvrir son cache SQLite), afin de conserver
+    son chargement à la première requête qui l'utilise.
+    
+    Args:
+        read: Fonction lisant la valeur de la métrique sur le routeur.
+        default: Valeur retournée tant que le routeur n'a pas été créé.
         
     Returns:
-        Code Terraform généré.
+        Le callback de la métrique.
     """
-    # C"est un exemple simplifié. Dans la réalité, cela serait plus complexe.
-    # Vast.ai n"a pas de provider Terraform officiel, donc cela serait implémenté via leur API.
-    return f"""
-# Vast.ai deployment
-# This is a placeholder as Vast.ai does not have an official Terraform provider.
-# Deployment would be done via their API.
+    def callback():
+        if not get_llm_router.cache_info().currsize:
+            return default
+        return read(get_llm_router())
+    return callback
 
-# Example of what the configuration might look like:
-# pipeline_name = {config.name}
-# target_platform = {config.deployment_target}
-# nodes = {json.dumps(config.nodes, indent=2)}
-"""
+metrics_registry.register_callback(
+    "llm_cache_hits_total", "LLM response cache hits (memory and disk).",
+    llm_router_metric(lambda router: router.cache.memory_hits + router.cache.disk_hits), "counter",
+)
+metrics_registry.register_callback(
+    "llm_cache_misses_total", "LLM response cache misses.",
+    llm_router_metric(lambda router: router.cache.misses), "counter",
+)
+metrics_registry.register_callback(
+    "llm_cache_hit_ratio", "Share of LLM calls answered from the response cache.",
+    llm_router_metric(lambda router: router.cache.hit_rate),
+)
+metrics_registry.register_callback(
+    "llm_batches_total", "Batched LLM calls sent to providers.",
+    llm_router_metric(lambda router: router.batcher.batches if router.batcher else 0), "counter",
+)
+metrics_registry.register_callback(
+    "llm_batched_requests_total", "LLM requests sent as part of a batched call.",
+    llm_router_metric(lambda router: router.batcher.batched_items if router.batcher else 0), "counter",
+)
+metrics_registry.register_callback(
+    "llm_hedged_requests_total", "LLM calls duplicated to a second backend after the latency percentile.",
+    llm_router_metric(lambda router: router.hedge.hedges if router.hedge else 0), "counter",
+)
+metrics_registry.register_callback(
+    "llm_hedge_wins_total", "Hedged LLM calls answered first by the second backend.",
+    llm_router_metric(lambda router: router.hedge.wins if router.hedge else 0), "counter",
+)
+metrics_registry.register_callback(
+    "llm_scheduler_queue_wait_seconds_total", "Time LLM tasks spent waiting for a slot, per model tier.",
+    llm_router_metric(lambda router: router.scheduler.wait_seconds, {}), "counter", label="tier",
+)
+metrics_registry.register_callback(
+    "llm_scheduler_admitted_total", "LLM tasks admitted, per model tier.",
+    llm_router_metric(lambda router: router.scheduler.admitted, {}), "counter", label="tier",
+)
+metrics_registry.register_callback(
+    "llm_scheduler_queued_tasks", "LLM tasks waiting for a slot, per model tier.",
+    llm_router_metric(
+        lambda router: {tier: router.scheduler.queued(tier) for tier in router.scheduler.limits}, {},
+    ),
+    label="tier",
+)
+metrics_registry.register_callback(
+    "llm_scheduler_tier_utilization", "Share of the concurrency limit in use, per model tier.",
+    llm_router_metric(lambda router: router.scheduler.utilization(), {}), label="tier",
+)
+metrics_registry.register_callback(
+    "llm_scheduler_downgrades_total", "LLM tasks run on a lighter tier than requested.",
+    llm_router_metric(lambda router: router.scheduler.downgrades), "counter",
+)
+metrics_registry.register_callback(
+    "llm_budget_spent_total", "Estimated LLM cost spent (TIER_COST units).",
+    llm_router_metric(lambda router: router.scheduler.budget_spent_total), "counter",
+)
+metrics_registry.register_callback(
+    "llm_budget_period_spent", "Estimated LLM cost spent in the current budget period.",
+    llm_router_metric(lambda router: router.scheduler.budget_spent),
+)
+metrics_registry.register_callback(
+    "llm_budget_rejected_total", "LLM tasks rejected because the budget was exhausted.",
+    llm_router_metric(lambda router: router.scheduler.budget_rejected), "counter",
+)
 
-def generate_runpod_terraform_code(config: PipelineConfig) -> str:
+@app.on_event("shutdown")
+async def stop_model_probes():
+    """
+    Arrête les sondes de santé des backends LLM, si l'Autopilot Engine a été utilisé.
+    """
+    if get_llm_router.cache_info().currsize:
+        await get_llm_router().selector.stop()
+
+@app.on_event("startup")
+async def start_checkpoint_purge():
+    """
+    Démarre la purge périodique des checkpoints expirés des exécutions de l'Autopilot.
+    """
+    checkpoints = get_checkpoint_store()
+    if checkpoints is not None:
+        await checkpoints.start()
+
+@app.on_event("shutdown")
+async def stop_checkpoint_purge():
+    """
+    Arrête la purge périodique des checkpoints.
+    """
+    if get_checkpoint_store.cache_info().currsize and get_checkpoint_store() is not None:
+        await get_checkpoint_store().stop()
+
+@app.on_event("startup")
+async def start_load_monitor():
+    """
+    Démarre le relevé périodique de la charge utilisé par le délestage.
+    """
+    if settings.LOAD_SHEDDING_ENABLED:
+        await load_monitor.start()
+
+@app.on_event("shutdown")
+async def stop_load_monitor():
+    """
+    Arrête le relevé périodique de la charge.
+    """
+    await load_monitor.stop()
+
+@app.on_event("startup")
+async def start_deployment_queue():
+    """
+    Démarre les workers de la file de déploiement.
+    """
+    await deployment_queue.start()
+
+@app.on_event("shutdown")
+async def stop_deployment_queue():
+    """
+    Arrête les workers de la file de déploiement.
     """
-    Génère le code Terraform pour le déploiement sur RunPod.
+    await deployment_queue.stop()
+
+# Enregistré après l'arrêt de la file de déploiement, dont les déploiements
+# abandonnés sont marqués en échec dans le stockage des statuts
+@app.on_event("shutdown")
+def close_status_store():
+    """
+    Persiste les statuts en attente et ferme le stockage à l'arrêt de l'application.
+    """
+    status_store.flush()
+    status_store.close()
+
+@app.on_event("startup")
+async def start_windmill_client():
+    """
+    Ouvre le client HTTP partagé vers Windmill.
+    """
+    if windmill_client.enabled:
+        await windmill_client.start()
+
+@app.on_event("shutdown")
+async def close_windmill_client():
+    """
+    Arrête le suivi des jobs et ferme le client HTTP Windmill.
+    """
+    await windmill_poller.stop()
+    await windmill_client.close()
+
+async def deploy_batch_item(
+    index: int,
+    config: PipelineConfig,
+    terraform_format: str,
+    idempotency_key: Optional[str] = None,
+) -> dict:
+    """
+    Valide, génère et met en file d'attente le déploiement d'un pipeline d'un lot.
+    
+    La validation et la génération sont faites dans le pool de processus, sauf si
+    le code Terraform est déjà en cache ; le déploiement passe ensuite par la même
+    file d'attente que `/pipelines/deploy`. Avec une clé d'idempotence, chaque
+    pipeline du lot utilise la clé `<clé>:<position>`.
     
     Args:
+        index: Position du pipeline dans le lot.
         config: Configuration du pipeline.
+        terraform_format: Format du code Terraform.
+        idempotency_key: Clé d'idempotence du lot.
         
     Returns:
-        Code Terraform généré.
+        Résultat du déploiement de ce pipeline.
     """
-    # C"est un exemple simplifié. Dans la réalité, cela serait plus complexe.
-    return f"""
-terraform {{
-  required_providers {{
-    runpod = {{
-      source  = "runpod/runpod"
-      version = "1.0.0"
-    }}
-  }}
-}}
-
-provider "runpod" {{
-  api_key = var.runpod_api_key
-}}
-
-resource "runpod_pod" "ml_pipeline" {{
-  name            = "{config.name.replace(" ", "-").lower()}"
-  image_name      = "runpod/pytorch:2.0.1-py3.10-cuda11.8.0-devel-ubuntu22.04"
-  gpu_type_id     = "NVIDIA GeForce RTX 4090"
-  gpu_count       = 1
-  container_disk_in_gb = 40
-  volume_in_gb    = 0
-  volume_mount_path = "/runpod-volume"
-  cloud_type      = "ALL"
-  min_vcpu_count  = 2
-  min_memory_in_gb = 15
-  docker_args     = ""
-  ports           = ""
-  env             = {{}}
-  template_id     = ""
-  container_name  = "runpod-container"
-  start_ssh       = true
-  is_public       = false
-  shutdown_timeout = 5
-}}
-"""
-
-def trigger_windmill_workflow(config: PipelineConfig, terraform_code: str) -> str:
+    result = {"index": index, "name": config.name}
+    key = deployment_fingerprint(config, terraform_format)
+    try:
+        if not idempotency_key:
+            return dict(result, **await deploy_batch_config(config, terraform_format, key))
+        outcome, replayed = await idempotency_store.run(
+            f"{idempotency_key}:{index}", key, lambda: deploy_batch_config(config, terraform_format, key),
+        )
+    except JobQueueFull as e:
+        return dict(
+            result,
+            status="rejected",
+            message="File de déploiement pleine, veuillez réessayer plus tard.",
+            retry_after=e.retry_after,
+        )
+    except IdempotencyConflict:
+        return dict(result, status="failed", message="Cette clé d'idempotence a déjà été utilisée pour une autre requête.")
+    if replayed:
+        result["replayed"] = True
+    return dict(result, **outcome)
+
+async def deploy_batch_config(config: PipelineConfig, terraform_format: str, key: str) -> dict:
     """
-    Déclenche le workflow Windmill pour le déploiement du pipeline.
+    Génère le code Terraform d'une configuration d'un lot et met son déploiement en file d'attente.
     
     Args:
         config: Configuration du pipeline.
-        terraform_code: Code Terraform à déployer.
+        terraform_format: Format du code Terraform.
+        key: Empreinte du déploiement.
         
     Returns:
-        ID du workflow déclenché.
+        Statut, message et ID de suivi du déploiement.
+        
+    Raises:
+        JobQueueFull: Si la file de déploiement est pleine.
     """
-    # Pour l"instant, on simule le déclenchement du workflow
-    # Dans la réalité, cela impliquerait un appel à l"API Windmill
-    workflow_id = f"workflow_{config.name.replace(' ', '_')}_{int(datetime.utcnow().timestamp())}"
+    terraform_code = terraform_cache.get(key)
     
-    # Mettre à jour le statut du pipeline
-    pipeline_statuses[workflow_id] = {
-        "status": "initiated",
-        "details": f"Workflow {workflow_id} déclenché pour le déploiement du pipeline {config.name}.",
-        "timestamp": datetime.utcnow().isoformat()
+    if terraform_code is None or not validate_pipeline_config(config):
+        try:
+            # Les configurations identiques d'un lot partagent une seule génération
+            outcome = await batch_flights.do(key, lambda: process_pipeline_in_pool(config, terraform_format))
+        except Exception as e:
+            outcome = {"error": f"Erreur lors de la génération du code Terraform: {str(e)}"}
+        if "error" in outcome:
+            return {"status": "failed", "message": outcome["error"]}
+        terraform_cache.set(key, outcome["terraform_code"])
+    
+    deployment = await enqueue_deployment(config, terraform_format)
+    return deployment.model_dump()
+
+def status_payload(pipeline_id: str, status_info: dict) -> dict:
+    """
+    Construit la représentation publique du statut d'un pipeline.
+    
+    Args:
+        pipeline_id: ID du pipeline.
+        status_info: Statut enregistré dans le stockage.
+        
+    Returns:
+        Statut du pipeline (mêmes champs que `PipelineStatusResponse`).
+    """
+    return {
+        "pipeline_id": pipeline_id,
+        "status": status_info["status"],
+        "details": status_info["details"],
+        "timestamp": status_info["timestamp"],
+        "version": status_info.get("version", 0),
     }
+
+def serialized_status(pipeline_id: str, status_info: dict) -> Tuple[str, bytes]:
+    """
+    Retourne l'ETag et le corps JSON du statut d'un pipeline.
     
-    return workflow_id
+    Le corps est sérialisé une seule fois par version du statut (normalement
+    dès l'écriture, via `cache_status_response`), puis servi tel quel.
+    
+    Args:
+        pipeline_id: ID du pipeline.
+        status_info: Statut enregistré dans le stockage.
+        
+    Returns:
+        L'ETag et le corps de la réponse.
+    """
+    version = status_info.get("version", 0)
+    cached = status_responses.get(pipeline_id)
+    if cached is not None and cached[0] == version and cached[1] == status_info["timestamp"]:
+        return cached[2], cached[3]
+    
+    body = json.dumps(
+        status_payload(pipeline_id, status_info),
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    etag = f'"{version}-{zlib.crc32(body):08x}"'
+    status_responses.set(pipeline_id, (version, status_info["timestamp"], etag, body))
+    return etag, body
+
+def cache_status_response(pipeline_id: str, record: dict) -> None:
+    """
+    Sérialise un statut au moment de son écriture (listener du stockage des statuts).
+    
+    Args:
+        pipeline_id: ID du pipeline.
+        record: Statut enregistré.
+    """
+    serialized_status(pipeline_id, record)
+
+status_store.add_listener(cache_status_response)
+
+def encode_cursor(key: Tuple[str, str]) -> str:
+    """
+    Encode la position d'un listing en curseur opaque.
+    
+    Args:
+        key: Clé `(timestamp, pipeline_id)` du dernier statut renvoyé.
+        
+    Returns:
+        Curseur à transmettre via `?cursor=`.
+    """
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """
+    Décode un curseur de listing.
+    
+    Args:
+        cursor: Curseur produit par `encode_cursor`.
+        
+    Returns:
+        Clé `(timestamp, pipeline_id)` après laquelle reprendre.
+        
+    Raises:
+        ValueError: Si le curseur est invalide.
+    """
+    try:
+        timestamp, pipeline_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        raise ValueError(cursor)
+    if not isinstance(timestamp, str) or not isinstance(pipeline_id, str):
+        raise ValueError(cursor)
+    return timestamp, pipeline_id
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Indique si un en-tête `If-None-Match` correspond à l'ETag courant.
+    
+    Args:
+        if_none_match: Valeur de l'en-tête (liste d'ETags séparés par des virgules, ou `*`).
+        etag: ETag courant.
+        
+    Returns:
+        True si la ressource n'a pas changé pour le client.
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+async def status_transitions(pipeline_id: str, since_version: int = 0):
+    """
+    Itère sur les transitions de statut d'un pipeline, à partir de l'état courant.
+    
+    Produit le statut à chaque nouvelle version, ou None après
+    `STATUS_STREAM_HEARTBEAT_SECONDS` sans changement (pour les heartbeats).
+    S'arrête après un statut terminal.
+    
+    Args:
+        pipeline_id: ID du pipeline.
+        since_version: Version déjà connue du client.
+    """
+    async with status_broker.subscribe(pipeline_id) as subscription:
+        status_info = await status_store.aget(pipeline_id)
+        while True:
+            if status_info is not None and status_info.get("version", 0) > since_version:
+                since_version = status_info.get("version", 0)
+                yield status_payload(pipeline_id, status_info)
+                if status_info["status"] in TERMINAL_STATUSES:
+                    return
+            status_info = await subscription.get(settings.STATUS_STREAM_HEARTBEAT_SECONDS)
+            if status_info is None:
+                yield None
 
 # Endpoints de l'API
 
@@ -353,59 +828,317 @@ async def health_check():
         timestamp=datetime.utcnow().isoformat()
     )
 
-@app.post("/pipelines/deploy", response_model=PipelineDeploymentResponse, tags=["Pipelines"])
-async def deploy_pipeline(config: PipelineConfig):
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Endpoint exposant les métriques au format Prometheus.
+    """
+    return Response(content=metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+async def enqueue_deployment(config: PipelineConfig, terraform_format: str) -> PipelineDeploymentResponse:
+    """
+    Met en file d'attente le déploiement d'un pipeline.
+    
+    Si un déploiement identique (même empreinte) est déjà en file ou en cours,
+    son ID de suivi est retourné au lieu d'en créer un second.
+    
+    Args:
+        config: Configuration du pipeline.
+        terraform_format: Format du code Terraform.
+        
+    Returns:
+        Réponse de déploiement.
+        
+    Raises:
+        JobQueueFull: Si la file de déploiement est pleine.
+    """
+    fingerprint = deployment_fingerprint(config, terraform_format)
+    pipeline_id = inflight_deployments.get(fingerprint)
+    if pipeline_id is not None:
+        return PipelineDeploymentResponse(
+            pipeline_id=pipeline_id,
+            status="queued",
+            message=f"Un déploiement identique du pipeline '{config.name}' est déjà en cours. Veuillez suivre l'état du déploiement avec l'ID {pipeline_id}."
+        )
+    
+    pipeline_id = new_pipeline_id(config)
+    inflight_deployments[fingerprint] = pipeline_id
+    try:
+        await deployment_queue.submit(pipeline_id, (config, terraform_format))
+    except JobQueueFull:
+        del inflight_deployments[fingerprint]
+        raise
+    set_pipeline_status(pipeline_id, config, "queued", f"Déploiement du pipeline '{config.name}' en file d'attente.")
+    
+    return PipelineDeploymentResponse(
+        pipeline_id=pipeline_id,
+        status="queued",
+        message=f"Déploiement du pipeline '{config.name}' en file d'attente. Veuillez suivre l'état du déploiement avec l'ID {pipeline_id}."
+    )
+
+@app.post("/pipelines/deploy", response_model=PipelineDeploymentResponse, status_code=202, tags=["Pipelines"])
+async def deploy_pipeline(
+    config: PipelineConfig,
+    response: Response,
+    terraform_format: str = "hcl",
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
     """
     Endpoint pour déployer un pipeline ML.
+    
+    Le déploiement est mis en file d'attente et traité en arrière-plan ; l'état
+    est à suivre via `/pipelines/{pipeline_id}/status`. Une requête rejouée avec
+    le même en-tête `Idempotency-Key` reçoit la réponse de la première.
     """
     # 1. Validation de la configuration
-    if not validate_pipeline_config(config):
-        raise HTTPException(status_code=400, detail="Configuration du pipeline invalide.")
+    errors = pipeline_config_errors(config)
+    if errors:
+        raise HTTPException(status_code=400, detail=f"Configuration du pipeline invalide: {'; '.join(errors)}")
+    if terraform_format not in TERRAFORM_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Format Terraform non supporté: {terraform_format}")
     
-    # 2. Génération de l'IaC (Terraform)
+    # 2. Mise en file d'attente de la génération de l'IaC et du déclenchement du workflow
     try:
-        terraform_code = generate_terraform_code(config)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Erreur lors de la génération du code Terraform: {str(e)}")
+        if not idempotency_key:
+            return await enqueue_deployment(config, terraform_format)
+        deployment, replayed = await idempotency_store.run(
+            idempotency_key,
+            deployment_fingerprint(config, terraform_format),
+            lambda: enqueue_deployment(config, terraform_format),
+        )
+    except JobQueueFull as e:
+        raise HTTPException(
+            status_code=429,
+            detail="File de déploiement pleine, veuillez réessayer plus tard.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except IdempotencyConflict:
+        raise HTTPException(
+            status_code=422,
+            detail="Cette clé d'idempotence a déjà été utilisée pour une autre requête.",
+        )
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
     
-    # 3. Déclenchement du workflow d'orchestration (Windmill)
-    try:
-        workflow_id = trigger_windmill_workflow(config, terraform_code)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Erreur lors du déclenchement du workflow Windmill: {str(e)}")
+    # 3. Retour d'un ID de suivi du déploiement
+    return deployment
+
+@app.post("/pipelines/deploy:batch", tags=["Pipelines"])
+async def deploy_pipelines_batch(
+    configs: List[PipelineConfig],
+    terraform_format: str = "hcl",
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
+    """
+    Endpoint pour déployer plusieurs pipelines ML en une seule requête.
     
-    # 4. Retour d'un ID de suivi du déploiement
-    pipeline_id = f"pipeline_{config.name.replace(' ', '_')}_{int(datetime.utcnow().timestamp())}"
-    pipeline_statuses[pipeline_id] = {
-        "status": "initiated",
-        "details": f"Déploiement du pipeline '{config.name}' initié. Workflow ID: {workflow_id}",
-        "timestamp": datetime.utcnow().isoformat()
-    }
+    Les pipelines sont validés et générés en parallèle, puis leurs déploiements
+    sont mis dans la file d'attente de `/pipelines/deploy` ; un résultat NDJSON
+    est envoyé pour chaque pipeline dès qu'il est traité, dans l'ordre de
+    complétion. Un pipeline refusé parce que la file est pleine a le statut
+    `rejected` et un délai `retry_after` (en secondes).
+    """
+    if terraform_format not in TERRAFORM_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Format Terraform non supporté: {terraform_format}")
+    if len(configs) > settings.BATCH_MAX_SIZE:
+        raise HTTPException(status_code=400, detail=f"Un lot ne peut pas dépasser {settings.BATCH_MAX_SIZE} pipelines.")
     
-    return PipelineDeploymentResponse(
-        pipeline_id=pipeline_id,
-        status="initiated",
-        message=f"Déploiement du pipeline '{config.name}' initié. Veuillez suivre l'état du déploiement avec l'ID {pipeline_id}."
+    async def stream_results():
+        tasks = [
+            asyncio.ensure_future(deploy_batch_item(index, config, terraform_format, idempotency_key))
+            for index, config in enumerate(configs)
+        ]
+        try:
+            for task in asyncio.as_completed(tasks):
+                result = await task
+                yield json.dumps(result) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+@app.post("/terraform/diff", response_model=TerraformDiffResponse, tags=["Terraform"])
+async def diff_terraform(request: TerraformDiffRequest):
+    """
+    Endpoint pour calculer le delta de ressources Terraform entre deux configurations.
+    """
+    for config in (request.old, request.new):
+        errors = pipeline_config_errors(config)
+        if errors:
+            raise HTTPException(status_code=400, detail=f"Configuration du pipeline invalide: {'; '.join(errors)}")
+    
+    delta = diff_terraform_documents(
+        build_terraform_document(request.old),
+        build_terraform_document(request.new),
+    )
+    return TerraformDiffResponse(targets=plan_targets(delta), **delta)
+
+@app.get("/jobs/metrics", tags=["Jobs"])
+async def get_jobs_metrics():
+    """
+    Endpoint pour obtenir les métriques de la file de déploiement (profondeur, temps d'attente).
+    """
+    return deployment_queue.metrics()
+
+@app.get("/cache/terraform/stats", tags=["Cache"])
+async def get_terraform_cache_stats():
+    """
+    Endpoint pour obtenir les statistiques du cache de génération Terraform.
+    """
+    return terraform_cache.stats()
+
+@app.get("/cache/llm/stats", tags=["Cache"])
+async def get_llm_cache_stats():
+    """
+    Endpoint pour obtenir les statistiques du cache des réponses LLM de l'Autopilot Engine.
+    """
+    # `stats` compte les réponses sur disque : la requête SQLite est faite dans un thread
+    return await asyncio.to_thread(get_llm_router().cache.stats)
+
+@app.get("/pipelines", tags=["Pipelines"])
+async def list_pipelines(
+    status: Optional[str] = None,
+    deployment_target: Optional[str] = None,
+    since: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = settings.PIPELINES_PAGE_SIZE,
+):
+    """
+    Endpoint pour lister les pipelines, filtrés par statut, cible et date de mise à jour.
+    
+    Les pipelines sont triés par date de dernière mise à jour. La réponse est
+    envoyée au fil de l'eau ; `next_cursor` permet d'obtenir la page suivante.
+    """
+    if not 1 <= limit <= settings.PIPELINES_PAGE_MAX_SIZE:
+        raise HTTPException(status_code=400, detail=f"`limit` doit être compris entre 1 et {settings.PIPELINES_PAGE_MAX_SIZE}.")
+    if since is not None:
+        try:
+            since = datetime.fromisoformat(since).isoformat()
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Date `since` invalide: {since}")
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Curseur invalide.")
+    
+    # Les statuts sont lus dans un thread ; un élément de plus que la page indique s'il y a une suite
+    statuses = status_store.aiter_statuses(
+        status=status,
+        deployment_target=deployment_target,
+        since=since,
+        after=after,
+        prefix="pipeline_",
+        chunk_size=limit + 1,
     )
+    
+    async def page():
+        yield '{"items":['
+        count, last_key, next_cursor = 0, None, None
+        async for pipeline_id, status_info in statuses:
+            if count == limit:
+                next_cursor = encode_cursor(last_key)
+                break
+            item = dict(status_payload(pipeline_id, status_info), deployment_target=status_info.get("deployment_target"))
+            yield ("," if count else "") + json.dumps(item, ensure_ascii=False, separators=(",", ":"))
+            count += 1
+            last_key = (status_info.get("timestamp") or "", pipeline_id)
+        yield f'],"next_cursor":{json.dumps(next_cursor)}}}'
+    
+    return StreamingResponse(page(), media_type="application/json")
 
 @app.get("/pipelines/{pipeline_id}/status", response_model=PipelineStatusResponse, tags=["Pipelines"])
-async def get_pipeline_status(pipeline_id: str):
+async def get_pipeline_status(
+    pipeline_id: str,
+    wait: float = 0,
+    since_version: Optional[int] = None,
+    if_none_match: Optional[str] = Header(None),
+):
     """
     Endpoint pour obtenir le statut d'un pipeline.
+    
+    Avec `wait` et `since_version` (long-poll), la réponse est retardée jusqu'à ce
+    que la version du statut dépasse `since_version`, ou au plus `wait` secondes.
+    La réponse porte un ETag : avec `If-None-Match`, un statut inchangé renvoie `304`.
     """
-    if pipeline_id not in pipeline_statuses:
+    if wait > 0 and since_version is not None:
+        wait = min(wait, settings.STATUS_LONG_POLL_MAX_SECONDS)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + wait
+        async with status_broker.subscribe(pipeline_id) as subscription:
+            status_info = await status_store.aget(pipeline_id)
+            while status_info is None or status_info.get("version", 0) <= since_version:
+                message = await subscription.get(max(0.0, deadline - loop.time()))
+                if message is None:
+                    break
+                status_info = message
+    else:
+        status_info = await status_store.aget(pipeline_id)
+    
+    if status_info is None:
         raise HTTPException(status_code=404, detail="Pipeline non trouvé.")
     
-    status_info = pipeline_statuses[pipeline_id]
-    return PipelineStatusResponse(
-        pipeline_id=pipeline_id,
-        status=status_info["status"],
-        details=status_info["details"],
-        timestamp=status_info["timestamp"]
+    etag, body = serialized_status(pipeline_id, status_info)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@app.get("/pipelines/{pipeline_id}/events", tags=["Pipelines"])
+async def stream_pipeline_status(pipeline_id: str, request: Request, since_version: int = 0):
+    """
+    Endpoint pour suivre les transitions de statut d'un pipeline en Server-Sent Events.
+    
+    L'en-tête `Last-Event-ID` permet de reprendre un stream sans renvoyer les
+    statuts déjà reçus.
+    """
+    if await status_store.aget(pipeline_id) is None:
+        raise HTTPException(status_code=404, detail="Pipeline non trouvé.")
+    last_event_id = request.headers.get("last-event-id")
+    if last_event_id and last_event_id.isdigit():
+        since_version = int(last_event_id)
+    
+    async def events():
+        async for payload in status_transitions(pipeline_id, since_version):
+            if await request.is_disconnected():
+                return
+            if payload is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"id: {payload['version']}\nevent: status\ndata: {json.dumps(payload)}\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
+@app.websocket("/pipelines/{pipeline_id}/ws")
+async def pipeline_status_websocket(websocket: WebSocket, pipeline_id: str, since_version: int = 0):
+    """
+    WebSocket diffusant les transitions de statut d'un pipeline.
+    """
+    await websocket.accept()
+    if await status_store.aget(pipeline_id) is None:
+        await websocket.close(code=4404, reason="Pipeline non trouvé.")
+        return
+    
+    try:
+        async for payload in status_transitions(pipeline_id, since_version):
+            if payload is None:
+                await websocket.send_json({"event": "heartbeat"})
+            else:
+                await websocket.send_json({"event": "status", "data": payload})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
 # Point d'entrée pour exécuter l'application avec uvicorn
 if __name__ == "__main__":
+    import uvicorn
+    
     uvicorn.run(
         "app.main:app",
         host=settings.HOST,
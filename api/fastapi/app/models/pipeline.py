@@ -0,0 +1,12 @@
+from pydantic import BaseModel, PrivateAttr
+from typing import List, Optional
+
+class PipelineConfig(BaseModel):
+    name: str
+    description: Optional[str] = None
+    nodes: List[dict]  # Liste des nœuds du pipeline (schémas par type dans app.core.pipeline_graph)
+    compute_requirements: dict  # Exigences de calcul (GPU, CPU, mémoire, etc.)
+    deployment_target: str  # Cible de déploiement (k3s-local, exoscale, vastai, runpod)
+    
+    # Empreinte de la configuration, calculée une fois par `config_hash`
+    _config_hash: Optional[str] = PrivateAttr(default=None)
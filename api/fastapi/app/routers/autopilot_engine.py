@@ -2,21 +2,43 @@
 # Auteur: Qwen3 Coder
 # Date: 2025-08-25
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import StreamingResponse
+from functools import lru_cache
 from pydantic import BaseModel
-from typing import Dict, Any, Optional
+from typing import AsyncIterable, AsyncIterator, Dict, Any, List, Optional, Tuple, Union
 import asyncio
+import json
 import logging
+import os
+import uuid
+
+from app.core.codebase_manifest import CodebaseManifest, ManifestStore, create_manifest_store
+from app.core.config import settings
+from app.core.llm_batching import MicroBatcher
+from app.core.llm_cache import LLMResponseCache, create_llm_cache, llm_cache_key, normalize_prompt
+from app.core.llm_scheduler import BudgetExceeded, TierScheduler, task_context
+from app.core.model_routing import BackendStats, HedgePolicy, ModelSelector, NoBackendAvailable
+from app.core.run_checkpoints import RunCheckpointStore
+from app.core.stage_graph import StageError, StageGraph
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Locataire et priorité des tâches LLM de la requête, pour l'ordonnancement par niveau
+async def set_task_context(
+    x_tenant_id: Optional[str] = Header(None),
+    x_priority: int = Header(0),
+) -> None:
+    task_context.set((x_tenant_id or "default", x_priority))
+
 # Création du routeur
 router = APIRouter(
     prefix="/autopilot",
     tags=["autopilot"],
     responses={404: {"description": "Not found"}},
+    dependencies=[Depends(set_task_context)],
 )
 
 # Modèles Pydantic pour la validation des données
@@ -28,12 +50,32 @@ class BlueprintRequest(BaseModel):
     autopilot: Optional[bool] = True
     deploy: Optional[bool] = False
 
+class TaskRequest(BaseModel):
+    prompt: str
+    complexity: Optional[str] = "low"
+    allow_downgrade: Optional[bool] = True
+
 class AutopilotResponse(BaseModel):
     repository: str
     deployment: Optional[str] = None
     monitoring: Optional[str] = None
     status: str
     message: str
+    run_id: Optional[str] = None
+
+# Fournisseur de modèles simulé (Ollama, vLLM ou API compatible OpenAI)
+class SimulatedProvider:
+    async def complete(self, model: str, prompt: str) -> Tuple[str, int]:
+        # Ici, on appellerait l'API du fournisseur ; retourne la réponse et le nombre de tokens générés
+        return "", max(1, len(prompt) // 4)
+    
+    async def complete_batch(self, model: str, prompts: List[str]) -> List[Tuple[str, int]]:
+        # Ici, on enverrait les prompts en une seule requête groupée (ex. vLLM) ; une réponse par prompt
+        return [("", max(1, len(prompt) // 4)) for prompt in prompts]
+    
+    async def probe(self, model: str) -> bool:
+        # Ici, on vérifierait que le fournisseur répond et sert le modèle
+        return True
 
 # Classe SmartLLMRouter (simplifiée pour l'exemple)
 class SmartLLMRouter:
@@ -45,9 +87,131 @@ class SmartLLMRouter:
         'complex_reasoning': ['qwen3:235b-a22b', 'claude-3.5-sonnet']
     }
     
+    # Nombre maximum de générations simultanées par niveau de modèle
+    TIER_CONCURRENCY = {
+        'lightweight': 8,
+        'code_heavy': 4,
+        'architecture': 2,
+        'ui_vision': 2,
+        'complex_reasoning': 1
+    }
+    
+    # Niveau plus léger vers lequel une tâche qui l'accepte est déclassée quand son niveau est saturé
+    DOWNGRADE_TIERS = {
+        'complex_reasoning': 'architecture',
+        'architecture': 'code_heavy',
+        'code_heavy': 'lightweight'
+    }
+    
+    # Coût estimé de 1000 tokens par niveau (unité du budget LLM)
+    TIER_COST = {
+        'lightweight': 0.0002,
+        'code_heavy': 0.001,
+        'architecture': 0.001,
+        'ui_vision': 0.002,
+        'complex_reasoning': 0.01
+    }
+    
+    # Extensions des fichiers de code, générés par les modèles 'code_heavy'
+    CODE_EXTENSIONS = ('.py', '.js', '.jsx', '.ts', '.tsx', '.go', '.rs', '.java', '.sql', '.sh')
+    
+    # Contenu simulé des fichiers générés
+    SIMULATED_FILES = {
+        "main.py": "print('Hello, World!')",
+        "README.md": "# Generated Project\n\nThis is a generated project.",
+        "requirements.txt": "fastapi\nuvicorn"
+    }
+    
+    # Qualité relative des modèles (plus haut = meilleur)
+    MODEL_QUALITY = {
+        'qwen3:4b': 2, 'llama3.2:3b': 1,
+        'qwen3-coder:30b-a3b': 4, 'codellama:34b': 3,
+        'qwen3:30b-a3b': 4, 'mixtral:8x22b': 4,
+        'qwen3-vl:32b': 4, 'llama3.2-vision:11b': 3,
+        'qwen3:235b-a22b': 5, 'claude-3.5-sonnet': 5,
+        'gpt-3.5-turbo': 2
+    }
+    
+    # Qualité minimale d'un modèle pour servir un niveau
+    TIER_QUALITY_FLOOR = {
+        'lightweight': 1,
+        'code_heavy': 3,
+        'architecture': 3,
+        'ui_vision': 3,
+        'complex_reasoning': 4
+    }
+    
+    # Fournisseurs servant les modèles de MODELS, par ordre de préférence
+    PROVIDERS = ('ollama', 'vllm')
+    
+    # Modèle de repli, servi par une API compatible OpenAI
+    FALLBACK_PROVIDER = 'openai'
+    FALLBACK_MODEL = 'gpt-3.5-turbo'
+    
+    # Modèle d'analyse des blueprints et de génération de structure
+    ANALYSIS_MODEL = MODELS['architecture'][0]
+    
+    # Version des prompts, incluse dans la clé de cache : l'incrémenter invalide les réponses en cache
+    PROMPT_VERSIONS = {
+        'analyze_blueprint': 'v1',
+        'generate_structure': 'v2',
+        'generate_file': 'v1'
+    }
+    
+    def __init__(
+        self,
+        tier_concurrency: Optional[Dict[str, int]] = None,
+        cache: Optional[LLMResponseCache] = None,
+        providers: Optional[Dict[str, Any]] = None,
+        selector: Optional[ModelSelector] = None,
+        batcher: Optional[MicroBatcher] = None,
+        scheduler: Optional[TierScheduler] = None,
+        hedge: Optional[HedgePolicy] = None,
+    ):
+        self.tier_concurrency = {**self.TIER_CONCURRENCY, **(tier_concurrency or {})}
+        # Cache des réponses LLM (None pour appeler le modèle à chaque fois)
+        self.cache = cache
+        # Fournisseurs par nom (`complete(model, prompt)` et `probe(model)`) et statistiques par backend
+        self.providers = providers or {
+            name: SimulatedProvider() for name in self.PROVIDERS + (self.FALLBACK_PROVIDER,)
+        }
+        self.selector = selector or ModelSelector()
+        for models in self.MODELS.values():
+            for model in models:
+                for provider in self.PROVIDERS:
+                    if provider in self.providers:
+                        self.selector.add(provider, model, self.MODEL_QUALITY.get(model, 0))
+        if self.FALLBACK_PROVIDER in self.providers:
+            self.selector.add(self.FALLBACK_PROVIDER, self.FALLBACK_MODEL, self.MODEL_QUALITY[self.FALLBACK_MODEL])
+        # Regroupement des appels concurrents à un même modèle (None pour un appel par prompt)
+        self.batcher = batcher
+        # Requêtes de couverture vers un autre backend (None pour ne jamais doubler un appel)
+        self.hedge = hedge
+        # Ordonnancement des tâches par niveau (limites, priorités, équité entre locataires, budget)
+        self.scheduler = scheduler or TierScheduler(
+            self.tier_concurrency, downgrade=self.DOWNGRADE_TIERS, tier_costs=self.TIER_COST
+        )
+    
+    async def _cached(self, operation: str, payload: Any, call) -> Dict[str, Any]:
+        if self.cache is None:
+            return await call()
+        key = llm_cache_key(operation, self.ANALYSIS_MODEL, self.PROMPT_VERSIONS[operation], payload)
+        return await self.cache.get_or_compute(key, call)
+    
     async def analyze_blueprint(self, blueprint: str) -> Dict[str, Any]:
+        # Les blueprints identiques à la mise en forme près partagent la même réponse en cache
+        return await self._cached(
+            'analyze_blueprint', normalize_prompt(blueprint), lambda: self._analyze_blueprint(blueprint)
+        )
+    
+    async def generate_structure(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        return await self._cached('generate_structure', analysis, lambda: self._generate_structure(analysis))
+    
+    async def _analyze_blueprint(self, blueprint: str) -> Dict[str, Any]:
         # Simulation d'analyse de blueprint avec LLM
         logger.info("Analyzing blueprint with Qwen3-30B-A3B...")
+        async with self.schedule('architecture', blueprint):
+            await self.call_model('architecture', blueprint, preferred=self.ANALYSIS_MODEL)
         # Ici, on appellerait le LLM pour analyser le blueprint
         # Pour l'exemple, on retourne une réponse simulée
         return {
@@ -57,22 +221,142 @@ class SmartLLMRouter:
             "estimated_time": "2 hours"
         }
     
-    async def generate_structure(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
+    async def _generate_structure(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
         # Simulation de génération de structure de projet
         logger.info("Generating project structure...")
+        async with self.schedule('architecture', str(analysis)):
+            await self.call_model('architecture', str(analysis), preferred=self.ANALYSIS_MODEL)
+        # Chaque fichier est décrit séparément : seule la description d'un fichier
+        # et le contexte commun entrent dans sa génération (voir file_inputs_hash)
         return {
             "files": ["main.py", "README.md", "requirements.txt"],
-            "directories": ["src", "tests", "docs"]
+            "directories": ["src", "tests", "docs"],
+            "context": {"tech_stack": analysis.get("tech_stack", [])},
+            "specs": {
+                "main.py": "Point d'entrée de l'application",
+                "README.md": f"Présentation du projet {analysis.get('project_name', '')}".strip(),
+                "requirements.txt": "Dépendances Python"
+            }
         }
     
+    def file_tier(self, path: str) -> str:
+        """
+        Retourne le niveau de modèle chargé de générer un fichier.
+        
+        Args:
+            path: Chemin du fichier dans le projet.
+            
+        Returns:
+            'code_heavy' pour les fichiers de code, 'lightweight' sinon.
+        """
+        return 'code_heavy' if path.endswith(self.CODE_EXTENSIONS) else 'lightweight'
+    
+    def schedule(self, tier: str, prompt: str = "", allow_downgrade: bool = False):
+        """
+        Contexte d'exécution d'une tâche LLM, ordonnancée par `scheduler`.
+        
+        Le locataire et la priorité sont ceux de la requête en cours
+        (`task_context`) ; le nombre de tokens est estimé d'après le prompt.
+        Avec regroupement (`batcher`), la tâche est admise (niveau et budget)
+        sans occuper de place : ce sont les appels au fournisseur qui en
+        occupent une, un lot comptant pour un seul appel (voir `call_model`).
+        
+        Args:
+            tier: Niveau de modèle demandé.
+            prompt: Prompt de la tâche (pour l'estimation du coût).
+            allow_downgrade: Autorise l'exécution sur un niveau plus léger.
+            
+        Returns:
+            Un gestionnaire de contexte asynchrone produisant l'autorisation (`Grant`).
+        """
+        tenant, priority = task_context.get()
+        return self.scheduler.slot(
+            tier, tenant, priority, allow_downgrade, tokens=max(1, len(prompt) // 4), hold=self.batcher is None
+        )
+    
+    def _call_slot(self, tier: str):
+        # Place du niveau occupée par un appel au fournisseur (unitaire ou groupé) ; le budget
+        # a déjà été imputé à l'admission des tâches
+        tenant, priority = task_context.get()
+        return self.scheduler.slot(tier, tenant, priority)
+    
+    def file_prompt(self, path: str, project_structure: Dict[str, Any]) -> str:
+        """
+        Retourne le prompt de génération d'un fichier (chemin et description du fichier).
+        """
+        spec = (project_structure.get("specs") or {}).get(path)
+        return f"Generate {path}: {spec}" if spec else f"Generate {path}"
+    
+    def file_inputs_hash(self, path: str, project_structure: Dict[str, Any]) -> str:
+        """
+        Calcule l'empreinte des entrées de la génération d'un fichier.
+        
+        Les entrées sont le chemin, le niveau de modèle, le prompt du fichier et
+        le contexte commun du projet (`context`) ; modifier la description d'un
+        autre fichier ne change pas l'empreinte.
+        
+        Args:
+            path: Chemin du fichier.
+            project_structure: Structure du projet.
+            
+        Returns:
+            Empreinte SHA-256 des entrées.
+        """
+        tier = self.file_tier(path)
+        payload = [path, self.file_prompt(path, project_structure), project_structure.get("context")]
+        return llm_cache_key('generate_file', tier, self.PROMPT_VERSIONS['generate_file'], payload)
+    
+    async def generate_file(self, path: str, project_structure: Dict[str, Any], tier: str) -> str:
+        # Simulation de génération d'un fichier avec un modèle du niveau donné
+        logger.info(f"Generating {path} with a {tier} model...")
+        await self.call_model(tier, self.file_prompt(path, project_structure))
+        return self.SIMULATED_FILES.get(path, f"# {os.path.basename(path)}\n")
+    
+    async def iter_codebase(
+        self,
+        project_structure: Dict[str, Any],
+        manifest: Optional[CodebaseManifest] = None,
+    ) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Génère les fichiers d'un projet en parallèle et les produit au fil de l'eau.
+        
+        Chaque fichier est généré par une tâche distincte ; le nombre de
+        générations simultanées (ou, avec regroupement, d'appels au
+        fournisseur) est borné par niveau de modèle (`TIER_CONCURRENCY`). Les fichiers sont produits dans leur ordre
+        d'achèvement, ce qui permet aux étapes suivantes (écriture, push) de
+        commencer sans attendre le fichier le plus lent. Si l'itération est
+        interrompue, les générations restantes sont annulées.
+        
+        Avec le manifeste d'une génération précédente, seuls les fichiers dont
+        les entrées ont changé (`file_inputs_hash`) sont générés.
+        
+        Args:
+            project_structure: Structure du projet (`files` liste les chemins à générer).
+            manifest: Manifeste de la génération précédente du projet.
+            
+        Yields:
+            Couples `(chemin, contenu)` dans l'ordre d'achèvement.
+        """
+        async def generate(path: str) -> Tuple[str, str]:
+            tier = self.file_tier(path)
+            async with self.schedule(tier, f"Generate {path}"):
+                return path, await self.generate_file(path, project_structure, tier)
+        
+        files = list(dict.fromkeys(project_structure.get("files") or self.SIMULATED_FILES))
+        if manifest is not None:
+            files = [path for path in files if not manifest.is_current(path, self.file_inputs_hash(path, project_structure))]
+        tasks = [asyncio.ensure_future(generate(path)) for path in files]
+        try:
+            for completed in asyncio.as_completed(tasks):
+                yield await completed
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
     async def generate_codebase(self, project_structure: Dict[str, Any]) -> Dict[str, Any]:
-        # Simulation de génération de code
         logger.info("Generating codebase...")
-        return {
-            "main.py": "print('Hello, World!')",
-            "README.md": "# Generated Project\n\nThis is a generated project.",
-            "requirements.txt": "fastapi\nuvicorn"
-        }
+        return {path: content async for path, content in self.iter_codebase(project_structure)}
     
     async def analyze_requirements(self, task_complexity: str) -> str:
         # Simulation de sélection de modèle optimal
@@ -84,91 +368,644 @@ class SmartLLMRouter:
         else:
             return "qwen3:4b"
     
+    async def run_task(self, prompt: str, task_complexity: str = "low", allow_downgrade: bool = True) -> Dict[str, Any]:
+        """
+        Exécute une tâche sur le modèle adapté à sa complexité, selon la charge et le budget.
+        
+        Le modèle recommandé (`analyze_requirements`) fixe le niveau demandé ; la
+        tâche attend une place sur ce niveau, ou s'exécute sur un niveau plus
+        léger s'il est saturé ou trop cher et que `allow_downgrade` l'autorise.
+        
+        Args:
+            prompt: Prompt de la tâche.
+            task_complexity: Complexité de la tâche (`low`, `medium` ou `high`).
+            allow_downgrade: Autorise l'exécution sur un niveau plus léger.
+            
+        Returns:
+            Réponse, niveaux demandé et retenu, et attente avant exécution (en secondes).
+            
+        Raises:
+            BudgetExceeded: Si le budget de la période est épuisé.
+        """
+        model = await self.analyze_requirements(task_complexity)
+        tier = self.tier_of(model)
+        async with self.schedule(tier, prompt, allow_downgrade) as grant:
+            response = await self.call_model(grant.tier, prompt, preferred=model if not grant.downgraded else None)
+        return {
+            "response": response,
+            "requested_tier": tier,
+            "tier": grant.tier,
+            "waited": grant.waited,
+        }
+    
+    def tier_of(self, model: str) -> str:
+        """
+        Retourne le niveau auquel appartient un modèle ('lightweight' s'il est inconnu).
+        """
+        for tier, models in self.MODELS.items():
+            if model in models:
+                return tier
+        return 'lightweight'
+    
+    def select_backend(
+        self,
+        tier: str,
+        preferred: Optional[str] = None,
+        providers: Optional[Any] = None,
+        exclude: Any = (),
+    ) -> BackendStats:
+        """
+        Choisit le backend le plus rapide, parmi les backends sains, pour un niveau de modèle.
+        
+        Les candidats sont les modèles du niveau (et le modèle de repli) dont la
+        qualité atteint le plancher du niveau (`TIER_QUALITY_FLOOR`), servis par
+        chacun des fournisseurs. Le temps de réponse estimé de chaque backend
+        tient compte de sa latence moyenne récente, de ses appels en cours et de
+        son taux d'erreur ; à estimation égale, `preferred` puis l'ordre de
+        `MODELS` et de `PROVIDERS` l'emportent.
+        
+        Args:
+            tier: Niveau de modèle.
+            preferred: Modèle à privilégier à estimation égale.
+            providers: Fournisseurs autorisés (tous si None).
+            exclude: Backends à écarter.
+            
+        Returns:
+            Le backend retenu.
+            
+        Raises:
+            NoBackendAvailable: Si aucun backend sain ne sert le niveau.
+        """
+        models = ([preferred] if preferred else []) + self.MODELS[tier] + [self.FALLBACK_MODEL]
+        return self.selector.choose(models, self.TIER_QUALITY_FLOOR.get(tier, 0), providers, exclude)
+    
+    async def call_model(self, tier: str, prompt: str, preferred: Optional[str] = None) -> str:
+        """
+        Appelle le backend le plus rapide d'un niveau et enregistre la latence observée.
+        
+        Si un regroupement est configuré (`batcher`) et que le fournisseur accepte
+        les appels groupés (`complete_batch`), les appels concurrents au même
+        backend sont envoyés en un seul appel, qui occupe une seule place du
+        niveau dans l'ordonnanceur. Si une politique de couverture est
+        configurée (`hedge`) et que le backend n'a pas répondu après le
+        percentile de ses latences récentes, le même appel est envoyé au
+        candidat suivant du niveau ; la première réponse est retenue et l'autre
+        appel est annulé. L'appel de couverture est ordonnancé comme une tâche
+        (`schedule`) : il occupe une place du niveau et son coût est imputé au
+        budget ; il n'est pas envoyé si le niveau est saturé. Un appel perdant
+        qui a rejoint un lot n'est annulé que pour son appelant : l'appel groupé
+        au fournisseur se poursuit pour les autres prompts du lot.
+        
+        Args:
+            tier: Niveau de modèle.
+            prompt: Prompt envoyé au modèle.
+            preferred: Modèle à privilégier à estimation égale.
+            
+        Returns:
+            La réponse du modèle.
+        """
+        await self.selector.start(self._probe)
+        backend = self.select_backend(tier, preferred)
+        if self.hedge is None:
+            return await self._call_backend(tier, backend, prompt)
+        self.hedge.calls += 1
+        delay = self.hedge.delay(backend)
+        if delay is None:
+            return await self._call_backend(tier, backend, prompt)
+        return await self._hedged_call(tier, backend, prompt, delay)
+    
+    async def _call_backend(self, tier: str, backend: BackendStats, prompt: str) -> str:
+        provider = self.providers[backend.provider]
+        if self.batcher is None:
+            # Sans regroupement, la tâche occupe déjà sa place (voir `schedule`)
+            return await self.selector.call(backend, lambda: provider.complete(backend.model, prompt))
+        if hasattr(provider, "complete_batch"):
+            return await self.batcher.submit(
+                (tier, backend.provider, backend.model), prompt,
+                lambda prompts: self._complete_batch(tier, backend, provider, prompts),
+            )
+        async with self._call_slot(tier):
+            return await self.selector.call(backend, lambda: provider.complete(backend.model, prompt))
+    
+    async def _hedged_call(self, tier: str, primary: BackendStats, prompt: str, delay: float) -> str:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        calls = [asyncio.ensure_future(self._call_backend(tier, primary, prompt))]
+        try:
+            done, _ = await asyncio.wait(calls, timeout=delay)
+            # Un doublon qui devrait attendre une place n'accélérerait pas l'appel
+            if done or (self.batcher is None and self.scheduler.saturated(tier)) or not self.hedge.allow():
+                return await calls[0]
+            try:
+                backup = self.select_backend(tier, exclude=(primary,))
+            except NoBackendAvailable:
+                return await calls[0]
+            self.hedge.hedges += 1
+            logger.info(f"Hedging {primary.provider}/{primary.model} with {backup.provider}/{backup.model}")
+            calls.append(asyncio.ensure_future(self._backup_call(tier, backup, prompt)))
+            pending, error = set(calls), None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for call in done:
+                    if call.exception() is not None:
+                        error = call.exception()
+                        continue
+                    if call is calls[1]:
+                        self.hedge.wins += 1
+                        # L'appel abandonné a duré au moins jusqu'ici : sa latence en tient compte
+                        primary.observe(loop.time() - started)
+                    return call.result()
+            raise error
+        finally:
+            for call in calls:
+                call.cancel()
+    
+    async def _backup_call(self, tier: str, backend: BackendStats, prompt: str) -> str:
+        # L'appel de couverture occupe sa propre place et est imputé au budget (BudgetExceeded sinon)
+        async with self.schedule(tier, prompt):
+            return await self._call_backend(tier, backend, prompt)
+    
+    async def _complete_batch(self, tier: str, backend: BackendStats, provider: Any, prompts: List[str]) -> List[str]:
+        # Un lot compte comme un seul appel dans les statistiques du backend et occupe une seule place du niveau
+        async def call() -> Tuple[List[str], int]:
+            responses = await provider.complete_batch(backend.model, prompts)
+            return [response for response, _ in responses], sum(tokens for _, tokens in responses)
+        
+        async with self._call_slot(tier):
+            return await self.selector.call(backend, call)
+    
+    async def _probe(self, provider: str, model: str) -> bool:
+        return await self.providers[provider].probe(model)
+    
     def get_best_available(self, optimal_model: str, provider_availability: Dict[str, bool]) -> str:
-        # Simulation de fallback automatique
+        """
+        Retourne le modèle à appeler, selon la disponibilité des fournisseurs et la latence observée.
+        
+        Sans mesure, le modèle optimal est servi par Ollama, sinon par vLLM
+        (suffixe `-vllm`), sinon le modèle de repli est retourné. Une fois les
+        backends mesurés, le plus rapide des candidats sains du niveau du modèle
+        optimal est retenu (voir `select_backend`).
+        
+        Args:
+            optimal_model: Modèle recommandé pour la tâche.
+            provider_availability: Disponibilité déclarée des fournisseurs.
+            
+        Returns:
+            Identifiant du modèle à appeler.
+        """
         logger.info(f"Getting best available model for {optimal_model}")
-        if provider_availability.get("ollama", False):
-            return optimal_model
-        elif provider_availability.get("vllm", False):
-            return f"{optimal_model}-vllm"
-        else:
-            return "gpt-3.5-turbo"
+        providers = [provider for provider in self.PROVIDERS if provider_availability.get(provider, False)]
+        if provider_availability.get(self.FALLBACK_PROVIDER, True):
+            providers.append(self.FALLBACK_PROVIDER)
+        try:
+            backend = self.select_backend(self.tier_of(optimal_model), optimal_model, providers)
+        except NoBackendAvailable:
+            return self.FALLBACK_MODEL
+        return f"{backend.model}-vllm" if backend.provider == "vllm" else backend.model
 
 # Classe GitAutomation (simplifiée pour l'exemple)
 class GitAutomation:
-    async def create_and_push(self, codebase: Dict[str, Any], target_repo: str, auto_deploy: bool = False) -> str:
-        # Simulation de création de repo et push
-        logger.info(f"Creating and pushing to {target_repo}")
-        # Ici, on utiliserait l'API GitHub/GitLab pour créer le repo et pusher le code
+    async def create_repository(self, target_repo: str, auto_deploy: bool = False) -> str:
+        # Simulation de création du repo ; ne dépend pas du code, ce qui permet
+        # de la lancer pendant l'analyse du blueprint
+        logger.info(f"Creating repository {target_repo}")
+        # Ici, on utiliserait l'API GitHub/GitLab pour créer le repo
         # Pour l'exemple, on retourne une URL simulée
         return f"https://github.com/user/{target_repo.split('/')[-1]}"
+    
+    async def push_files(
+        self,
+        repo_url: str,
+        codebase: Union[Dict[str, Any], AsyncIterable[Tuple[str, Optional[str]]]],
+    ) -> int:
+        # Simulation du push. Le code peut être fourni au fil de l'eau
+        # (SmartLLMRouter.iter_codebase) : chaque fichier est alors écrit dès
+        # qu'il est généré, sans attendre la fin de la génération. Un contenu
+        # None supprime le fichier du dépôt
+        if isinstance(codebase, dict):
+            changes = list(codebase.items())
+        else:
+            changes = [change async for change in codebase]
+        deleted = sum(1 for _, content in changes if content is None)
+        logger.info(f"Pushed {len(changes) - deleted} files to {repo_url} ({deleted} deleted)")
+        return len(changes)
+    
+    async def create_and_push(
+        self,
+        codebase: Union[Dict[str, Any], AsyncIterable[Tuple[str, str]]],
+        target_repo: str,
+        auto_deploy: bool = False,
+    ) -> str:
+        # Création du repo puis push du code
+        logger.info(f"Creating and pushing to {target_repo}")
+        repo_url = await self.create_repository(target_repo, auto_deploy=auto_deploy)
+        await self.push_files(repo_url, codebase)
+        return repo_url
 
 # Classe CIPipelineBuilder (simplifiée pour l'exemple)
 class CIPipelineBuilder:
-    async def setup_pipelines(self, repo_url: str) -> None:
+    async def prepare_templates(self, stack: Optional[str] = None) -> Dict[str, str]:
+        # Simulation de la préparation des fichiers de configuration CI/CD ; ne
+        # dépend que de la stack, pas du repo ni du code généré
+        logger.info(f"Preparing CI/CD templates for stack {stack or 'default'}")
+        return {".github/workflows/ci.yml": f"# Pipeline CI ({stack or 'default'})\n"}
+    
+    async def setup_pipelines(self, repo_url: str, templates: Optional[Dict[str, str]] = None) -> None:
         # Simulation de setup des pipelines CI/CD
-        logger.info(f"Setting up CI/CD pipelines for {repo_url}")
-        # Ici, on créerait les fichiers de configuration pour GitHub Actions, etc.
+        if templates is None:
+            templates = await self.prepare_templates()
+        logger.info(f"Setting up CI/CD pipelines for {repo_url} ({len(templates)} files)")
+        # Ici, on pousserait les fichiers de configuration pour GitHub Actions, etc.
 
-# Initialisation des classes
-llm_router = SmartLLMRouter()
-git_manager = GitAutomation()
-ci_generator = CIPipelineBuilder()
+# Initialisation des classes, à la première requête qui les utilise (et non à
+# l'import du routeur), afin de ne pas ralentir le démarrage de l'API
+@lru_cache(maxsize=None)
+def get_llm_router() -> SmartLLMRouter:
+    return SmartLLMRouter(
+        cache=create_llm_cache(
+            settings.LLM_CACHE_URL,
+            memory_size=settings.LLM_CACHE_MEMORY_SIZE,
+            max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+            ttl=settings.LLM_CACHE_TTL_SECONDS,
+        ),
+        selector=ModelSelector(probe_interval=settings.LLM_PROBE_INTERVAL_SECONDS),
+        batcher=MicroBatcher(
+            window=settings.LLM_BATCH_WINDOW_SECONDS,
+            max_batch_size=settings.LLM_BATCH_MAX_SIZE,
+        ) if settings.LLM_BATCH_WINDOW_SECONDS > 0 else None,
+        scheduler=TierScheduler(
+            SmartLLMRouter.TIER_CONCURRENCY,
+            downgrade=SmartLLMRouter.DOWNGRADE_TIERS,
+            tier_costs=SmartLLMRouter.TIER_COST,
+            budget=settings.LLM_BUDGET or None,
+            budget_period=settings.LLM_BUDGET_PERIOD_SECONDS,
+        ),
+        hedge=HedgePolicy(
+            percentile=settings.LLM_HEDGE_PERCENTILE,
+            max_ratio=settings.LLM_HEDGE_MAX_RATIO,
+            min_samples=settings.LLM_HEDGE_MIN_SAMPLES,
+        ) if settings.LLM_HEDGE_MAX_RATIO > 0 else None,
+    )
 
-# Endpoint pour exécuter un blueprint
-@router.post("/execute-blueprint", response_model=AutopilotResponse)
-async def execute_blueprint(request: BlueprintRequest):
+@lru_cache(maxsize=None)
+def get_git_manager() -> GitAutomation:
+    return GitAutomation()
+
+@lru_cache(maxsize=None)
+def get_ci_generator() -> CIPipelineBuilder:
+    return CIPipelineBuilder()
+
+@lru_cache(maxsize=None)
+def get_manifest_store() -> ManifestStore:
+    return create_manifest_store(settings.CODEBASE_MANIFEST_URL)
+
+@lru_cache(maxsize=None)
+def get_checkpoint_store() -> Optional[RunCheckpointStore]:
+    if not settings.AUTOPILOT_CHECKPOINT_DIR:
+        return None
+    return RunCheckpointStore(
+        settings.AUTOPILOT_CHECKPOINT_DIR,
+        ttl=settings.AUTOPILOT_CHECKPOINT_TTL_SECONDS,
+        purge_interval=settings.AUTOPILOT_CHECKPOINT_PURGE_INTERVAL_SECONDS,
+    )
+
+# Exécution d'un blueprint, sous forme de graphe d'étapes. Chaque événement
+# porte le temps écoulé depuis le début de l'exécution (`elapsed`, en
+# secondes) ; les événements de fin d'étape portent aussi la durée de l'étape
+# (`duration`)
+async def run_blueprint(
+    request: BlueprintRequest,
+    llm_router: SmartLLMRouter,
+    git_manager: GitAutomation,
+    ci_generator: CIPipelineBuilder,
+    manifests: Optional[ManifestStore] = None,
+    checkpoints: Optional[RunCheckpointStore] = None,
+    run_id: Optional[str] = None,
+) -> AsyncIterator[Dict[str, Any]]:
     """
-    Exécute un blueprint pour générer un projet complet.
+    Exécute un blueprint et produit un événement par étape et par fichier généré.
+    
+    Les étapes forment un graphe de dépendances ; chacune démarre dès que celles
+    dont elle dépend sont terminées :
+    
+    - `analysis` → `structure` → `codebase` : analyse, structure puis génération du code ;
+    - `repository` : création du dépôt, en parallèle de l'analyse ;
+    - `push` : après `repository`, pousse chaque fichier dès qu'il est généré ;
+    - `ci_templates` puis `ci` (après `repository`) : préparation puis mise en
+      place des pipelines CI/CD, si `autopilot` est demandé.
+    
+    La latence totale est ainsi celle du chemin le plus long (analyse, structure
+    et génération) plutôt que la somme des étapes.
+    
+    Avec un stockage de manifestes (`manifests`), la génération est
+    incrémentale : seuls les fichiers dont les entrées ont changé depuis la
+    dernière exécution pour le même dépôt sont régénérés, seuls ceux dont le
+    contenu a changé sont poussés, et les fichiers retirés de la structure sont
+    supprimés du dépôt. Le manifeste n'est enregistré qu'après un push réussi.
+    
+    Avec un stockage de checkpoints (`checkpoints`), la sortie de chaque étape
+    terminée est enregistrée sous l'identifiant de l'exécution (`run_id`). Une
+    exécution reprise avec le même identifiant restaure les étapes déjà
+    terminées au lieu de les réexécuter : après un échec du push ou de la CI,
+    le code généré est repoussé sans nouvel appel aux modèles.
+    
+    Événements produits :
+    
+    - `run` : identifiant de l'exécution (`run_id`), en premier, avec des checkpoints ;
+    - `stage` : début (`status: started`), fin (`status: completed`, avec
+      `duration`) ou restauration depuis un checkpoint (`status: restored`) d'une étape ;
+    - `file` : fichier généré (`path`, `size`, `changed` si son contenu diffère
+      de la génération précédente), dès qu'il est disponible ;
+    - `result` : réponse finale (`data`, au format de `AutopilotResponse`) ;
+    - `error` : échec d'une étape (`stage`, `detail`, `run_id` pour la reprise),
+      qui termine l'exécution.
+    
+    Args:
+        request: Blueprint à exécuter.
+        llm_router: Routeur LLM.
+        git_manager: Gestion du dépôt Git.
+        ci_generator: Génération des pipelines CI/CD.
+        manifests: Manifestes des générations précédentes, par dépôt (None pour tout régénérer).
+        checkpoints: Checkpoints des exécutions (None pour ne pas pouvoir reprendre l'exécution).
+        run_id: Identifiant de l'exécution, à fournir pour la reprendre (généré si absent).
+        
+    Yields:
+        Les événements de progression, dans l'ordre où ils se produisent.
     """
+    loop = asyncio.get_running_loop()
+    started_at = loop.time()
+    progress: asyncio.Queue = asyncio.Queue()
+    # Fichiers générés en attente de push (None marque la fin de la génération)
+    generated: asyncio.Queue = asyncio.Queue()
+    # Fin de l'étape `codebase` (checkpoint compris), attendue par le push
+    codebase_done = asyncio.Event()
+    
+    def event(kind: str, **fields) -> Dict[str, Any]:
+        return {"event": kind, **fields, "elapsed": round(loop.time() - started_at, 3)}
+    
+    def on_stage(stage: str, status: str, duration: Optional[float]) -> None:
+        if stage == "codebase" and status in ("completed", "restored"):
+            codebase_done.set()
+        if duration is None:
+            progress.put_nowait(event("stage", stage=stage, status=status))
+        else:
+            progress.put_nowait(event("stage", stage=stage, status=status, duration=round(duration, 3)))
+    
+    # Sorties des étapes terminées lors d'une exécution précédente
+    restored: Dict[str, Any] = {}
+    if checkpoints is not None:
+        run_id = run_id or f"run_{uuid.uuid4().hex[:16]}"
+        if await asyncio.to_thread(checkpoints.exists, run_id):
+            restored = await asyncio.to_thread(checkpoints.load, run_id)
+        else:
+            await asyncio.to_thread(checkpoints.create, run_id, request.model_dump())
+    
+    # L'écriture (compression comprise) se fait hors de la boucle asyncio
+    async def on_result(stage: str, output: Any) -> None:
+        await asyncio.to_thread(checkpoints.save, run_id, stage, output)
+    
+    # 1. Analyser le blueprint avec le LLM de raisonnement
+    async def analysis(results: Dict[str, Any]) -> Dict[str, Any]:
+        return await llm_router.analyze_blueprint(request.blueprint)
+    
+    # 2. Générer la structure du projet
+    async def structure(results: Dict[str, Any]) -> Dict[str, Any]:
+        return await llm_router.generate_structure(results["analysis"])
+    
+    # 3. Générer le code avec les modèles spécialisés ; chaque fichier est
+    # signalé et transmis au push dès qu'il est prêt. Avec un manifeste, seuls
+    # les fichiers dont les entrées ont changé sont générés, et seuls ceux dont
+    # le contenu a changé sont poussés. La sortie de l'étape contient les
+    # fichiers à pousser et le manifeste mis à jour, pour la reprise. Le
+    # stockage des manifestes (SQLite) est lu et écrit dans un thread
+    manifest = None
+    if manifests is not None:
+        manifest = await asyncio.to_thread(manifests.get, request.target_repo)
+    
+    async def codebase(results: Dict[str, Any]) -> Dict[str, Any]:
+        project_structure = results["structure"]
+        changes: List[Tuple[str, Optional[str]]] = []
+        count = 0
+        async for path, content in llm_router.iter_codebase(project_structure, manifest):
+            changed = True
+            if manifest is not None:
+                changed = manifest.record(path, llm_router.file_inputs_hash(path, project_structure), content)
+            progress.put_nowait(event("file", path=path, size=len(content), changed=changed))
+            if changed:
+                changes.append((path, content))
+                generated.put_nowait((path, content))
+            count += 1
+        if manifest is not None:
+            paths = project_structure.get("files") or llm_router.SIMULATED_FILES
+            for path in manifest.prune(paths):
+                changes.append((path, None))
+                generated.put_nowait((path, None))
+        generated.put_nowait(None)
+        return {
+            "files": count,
+            "changes": changes,
+            "manifest": manifest.to_dict() if manifest is not None else None,
+        }
+    
+    # Code restauré : les fichiers à pousser sont repris du checkpoint
+    if "codebase" in restored:
+        for path, content in restored["codebase"]["changes"]:
+            generated.put_nowait((path, content))
+        generated.put_nowait(None)
+        if manifest is not None:
+            manifest = CodebaseManifest(restored["codebase"]["manifest"])
+    
+    # 4. Créer le dépôt (indépendant du code) puis y pousser les fichiers
+    async def repository(results: Dict[str, Any]) -> str:
+        return await git_manager.create_repository(request.target_repo, auto_deploy=request.deploy)
+    
+    async def generated_files() -> AsyncIterator[Tuple[str, str]]:
+        while True:
+            item = await generated.get()
+            if item is None:
+                # Le push ne se termine qu'une fois la génération enregistrée
+                await codebase_done.wait()
+                return
+            yield item
+    
+    async def push(results: Dict[str, Any]) -> int:
+        return await git_manager.push_files(results["repository"], generated_files())
+    
+    # 5. Setup des pipelines CI/CD
+    async def ci_templates(results: Dict[str, Any]) -> Dict[str, str]:
+        return await ci_generator.prepare_templates(request.stack)
+    
+    async def ci(results: Dict[str, Any]) -> None:
+        await ci_generator.setup_pipelines(results["repository"], results["ci_templates"])
+    
+    graph = StageGraph(on_event=on_stage, on_result=on_result if checkpoints is not None else None)
+    graph.add("analysis", analysis)
+    graph.add("repository", repository)
+    if request.autopilot:
+        graph.add("ci_templates", ci_templates)
+    graph.add("structure", structure, after=("analysis",))
+    graph.add("codebase", codebase, after=("structure",))
+    graph.add("push", push, after=("repository",))
+    if request.autopilot:
+        graph.add("ci", ci, after=("repository", "ci_templates"))
+    
+    if checkpoints is not None:
+        yield event("run", run_id=run_id)
+    run = asyncio.ensure_future(graph.run(restored))
+    run.add_done_callback(lambda _: progress.put_nowait(None))
     try:
-        # 1. Analyser le blueprint avec le LLM de raisonnement
-        analysis = await llm_router.analyze_blueprint(request.blueprint)
-        
-        # 2. Générer la structure du projet
-        project_structure = await llm_router.generate_structure(analysis)
-        
-        # 3. Générer le code avec les modèles spécialisés
-        codebase = await llm_router.generate_codebase(project_structure)
-        
-        # 4. Setup du repository + push
-        repo_url = await git_manager.create_and_push(
-            codebase, request.target_repo, auto_deploy=request.deploy
-        )
-        
-        # 5. Setup des pipelines CI/CD
-        if request.autopilot:
-            await ci_generator.setup_pipelines(repo_url)
+        while True:
+            item = await progress.get()
+            if item is None:
+                break
+            yield item
+        results = await run
+        if manifest is not None:
+            await asyncio.to_thread(manifests.save, request.target_repo, manifest)
         
         # 6. Retourner la réponse
-        return AutopilotResponse(
-            repository=repo_url,
+        response = AutopilotResponse(
+            repository=results["repository"],
             deployment=f"https://{request.target_repo.split('/')[-1]}.vercel.app" if request.deploy else None,
             monitoring=f"https://grafana.example.com/d/{request.target_repo.split('/')[-1]}",
             status="success",
-            message=f"Blueprint '{request.blueprint[:20]}...' executed successfully."
+            message=f"Blueprint '{request.blueprint[:20]}...' executed successfully.",
+            run_id=run_id,
         )
+        yield event("result", data=response.model_dump())
     
-    except Exception as e:
-        logger.error(f"Error executing blueprint: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error executing blueprint: {str(e)}")
+    except StageError as e:
+        logger.error(f"Error executing blueprint: {str(e.error)}")
+        yield event("error", stage=e.stage, detail=f"Error executing blueprint: {str(e.error)}", run_id=run_id)
+    finally:
+        run.cancel()
+
+# Format de stream demandé, par le paramètre `stream` ou l'en-tête Accept
+def stream_format(stream: Optional[str], accept: Optional[str]) -> Optional[str]:
+    if stream is None and accept:
+        if "text/event-stream" in accept:
+            stream = "sse"
+        elif "application/x-ndjson" in accept:
+            stream = "ndjson"
+    if stream not in (None, "ndjson", "sse"):
+        raise HTTPException(status_code=400, detail=f"Format de stream non supporté: {stream}")
+    return stream
+
+# Réponse à l'exécution d'un blueprint : événements en NDJSON ou SSE, ou
+# réponse finale
+async def blueprint_response(events: AsyncIterator[Dict[str, Any]], stream: Optional[str]):
+    if stream == "ndjson":
+        async def ndjson():
+            async for item in events:
+                yield json.dumps(item) + "\n"
+        
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+    
+    if stream == "sse":
+        async def sse():
+            index = 0
+            async for item in events:
+                index += 1
+                yield f"id: {index}\nevent: {item['event']}\ndata: {json.dumps(item)}\n\n"
+        
+        return StreamingResponse(
+            sse(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    
+    async for item in events:
+        if item["event"] == "error":
+            # L'identifiant de l'exécution permet de la reprendre
+            headers = {"X-Run-ID": item["run_id"]} if item.get("run_id") else None
+            raise HTTPException(status_code=500, detail=item["detail"], headers=headers)
+        if item["event"] == "result":
+            return AutopilotResponse(**item["data"])
+
+# Endpoint pour exécuter un blueprint
+@router.post("/execute-blueprint", response_model=AutopilotResponse)
+async def execute_blueprint(
+    request: BlueprintRequest,
+    stream: Optional[str] = None,
+    accept: Optional[str] = Header(None),
+    llm_router: SmartLLMRouter = Depends(get_llm_router),
+    git_manager: GitAutomation = Depends(get_git_manager),
+    ci_generator: CIPipelineBuilder = Depends(get_ci_generator),
+    manifests: ManifestStore = Depends(get_manifest_store),
+    checkpoints: Optional[RunCheckpointStore] = Depends(get_checkpoint_store),
+):
+    """
+    Exécute un blueprint pour générer un projet complet.
+    
+    Avec `?stream=ndjson` (ou `Accept: application/x-ndjson`) ou `?stream=sse`
+    (ou `Accept: text/event-stream`), la progression est envoyée au fil de
+    l'eau : un événement par étape et par fichier généré (voir `run_blueprint`).
+    
+    Chaque étape terminée est enregistrée ; en cas d'échec, l'exécution peut
+    être reprise avec `POST /autopilot/runs/{run_id}/resume` (l'identifiant est
+    donné par l'événement `run`, l'événement `error` ou l'en-tête `X-Run-ID`).
+    """
+    stream = stream_format(stream, accept)
+    events = run_blueprint(request, llm_router, git_manager, ci_generator, manifests, checkpoints)
+    return await blueprint_response(events, stream)
+
+# Endpoint pour consulter l'état d'une exécution
+@router.get("/runs/{run_id}")
+async def get_run(run_id: str, checkpoints: Optional[RunCheckpointStore] = Depends(get_checkpoint_store)):
+    """
+    Retourne la requête d'une exécution et les étapes déjà terminées.
+    """
+    if checkpoints is None or not await asyncio.to_thread(checkpoints.exists, run_id):
+        raise HTTPException(status_code=404, detail=f"Exécution inconnue: {run_id}")
+    return {
+        "run_id": run_id,
+        "request": await asyncio.to_thread(checkpoints.request, run_id),
+        "completed_stages": await asyncio.to_thread(checkpoints.completed, run_id),
+    }
+
+# Endpoint pour reprendre une exécution
+@router.post("/runs/{run_id}/resume", response_model=AutopilotResponse)
+async def resume_run(
+    run_id: str,
+    stream: Optional[str] = None,
+    accept: Optional[str] = Header(None),
+    llm_router: SmartLLMRouter = Depends(get_llm_router),
+    git_manager: GitAutomation = Depends(get_git_manager),
+    ci_generator: CIPipelineBuilder = Depends(get_ci_generator),
+    manifests: ManifestStore = Depends(get_manifest_store),
+    checkpoints: Optional[RunCheckpointStore] = Depends(get_checkpoint_store),
+):
+    """
+    Reprend une exécution à partir de sa première étape non terminée.
+    
+    Les étapes terminées sont restaurées depuis leur checkpoint (sans nouvel
+    appel aux modèles) ; les formats de stream sont ceux de `execute-blueprint`.
+    """
+    stream = stream_format(stream, accept)
+    if checkpoints is None or not await asyncio.to_thread(checkpoints.exists, run_id):
+        raise HTTPException(status_code=404, detail=f"Exécution inconnue: {run_id}")
+    request = BlueprintRequest(**await asyncio.to_thread(checkpoints.request, run_id))
+    events = run_blueprint(request, llm_router, git_manager, ci_generator, manifests, checkpoints, run_id)
+    return await blueprint_response(events, stream)
 
 # Endpoint pour analyser un blueprint
 @router.post("/analyze-blueprint")
-async def analyze_blueprint(blueprint: str):
+async def analyze_blueprint(blueprint: str, llm_router: SmartLLMRouter = Depends(get_llm_router)):
     """
     Analyse un blueprint avec le LLM de raisonnement.
     """
     try:
         analysis = await llm_router.analyze_blueprint(blueprint)
         return analysis
+    except BudgetExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e))
     except Exception as e:
         logger.error(f"Error analyzing blueprint: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error analyzing blueprint: {str(e)}")
 
 # Endpoint pour générer la structure d'un projet
 @router.post("/generate-structure")
-async def generate_structure(analysis: Dict[str, Any]):
+async def generate_structure(analysis: Dict[str, Any], llm_router: SmartLLMRouter = Depends(get_llm_router)):
     """
     Génère la structure d'un projet à partir d'une analyse.
     """
@@ -181,7 +1018,7 @@ async def generate_structure(analysis: Dict[str, Any]):
 
 # Endpoint pour générer le code d'un projet
 @router.post("/generate-codebase")
-async def generate_codebase(project_structure: Dict[str, Any]):
+async def generate_codebase(project_structure: Dict[str, Any], llm_router: SmartLLMRouter = Depends(get_llm_router)):
     """
     Génère le code d'un projet à partir de sa structure.
     """
@@ -190,4 +1027,36 @@ async def generate_codebase(project_structure: Dict[str, Any]):
         return codebase
     except Exception as e:
         logger.error(f"Error generating codebase: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error generating codebase: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error generating codebase: {str(e)}")
+
+# Endpoint pour consulter les statistiques des backends LLM
+@router.get("/backends")
+async def get_backends(llm_router: SmartLLMRouter = Depends(get_llm_router)):
+    """
+    Retourne la latence, le débit, le taux d'erreur et l'état de chaque backend LLM.
+    """
+    return llm_router.selector.snapshot()
+
+# Endpoint pour exécuter une tâche LLM selon sa complexité
+@router.post("/run-task")
+async def run_task(request: TaskRequest, llm_router: SmartLLMRouter = Depends(get_llm_router)):
+    """
+    Exécute une tâche sur le niveau de modèle adapté à sa complexité.
+    
+    La tâche est ordonnancée par niveau (priorité `X-Priority`, équité entre
+    locataires `X-Tenant-ID`) et peut être déclassée vers un niveau plus léger
+    si le sien est saturé ou si le budget l'exige.
+    """
+    try:
+        return await llm_router.run_task(request.prompt, request.complexity, request.allow_downgrade)
+    except BudgetExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+# Endpoint pour consulter l'état de l'ordonnancement des tâches LLM
+@router.get("/scheduler")
+async def get_scheduler(llm_router: SmartLLMRouter = Depends(get_llm_router)):
+    """
+    Retourne, par niveau de modèle, la limite, les tâches en cours et en attente et
+    l'attente moyenne, ainsi que les déclassements et la consommation du budget.
+    """
+    return llm_router.scheduler.snapshot()
@@ -0,0 +1,139 @@
+"""
+Simulation hors ligne des requêtes de couverture (hedging) vers un second backend.
+
+Un fournisseur factice reproduit un backend à longue traîne : la plupart des
+appels au modèle principal sont rapides, mais une part d'entre eux
+(`--slow-rate`) prend `--slow-factor` fois plus de temps. Un second fournisseur,
+plus lent en moyenne mais régulier, sert le même modèle. Le même flux
+d'appels (`SmartLLMRouter.call_model`) est rejoué sans puis avec une
+`HedgePolicy` : un appel sans réponse après le p95 observé est doublé vers le
+second fournisseur, dans la limite de `--max-ratio` appels doublés.
+
+Le script affiche, par mode, les latences p50/p95/p99, la charge
+supplémentaire (appels doublés) et la part des appels gagnés par le doublon.
+
+Usage (depuis `api/fastapi`) :
+
+    python -m benchmarks.hedging --requests 1000 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.model_routing import HedgePolicy, ModelSelector  # noqa: E402
+from app.routers.autopilot_engine import SmartLLMRouter  # noqa: E402
+from benchmarks.load import percentile  # noqa: E402
+
+
+class TailProvider:
+    """
+    Fournisseur LLM factice : `latency` secondes par appel, ou `latency × slow_factor`
+    avec la probabilité `slow_rate`.
+    """
+
+    def __init__(self, latency: float, slow_rate: float = 0.0, slow_factor: float = 1.0, seed: int = 0):
+        self.latency = latency
+        self.slow_rate = slow_rate
+        self.slow_factor = slow_factor
+        self.calls = 0
+        self._rng = random.Random(seed)
+
+    async def complete(self, model: str, prompt: str) -> Tuple[str, int]:
+        self.calls += 1
+        slow = self._rng.random() < self.slow_rate
+        await asyncio.sleep(self.latency * (self.slow_factor if slow else 1.0))
+        return "", 100
+
+    async def probe(self, model: str) -> bool:
+        return True
+
+
+async def simulate(
+    hedge: Optional[HedgePolicy],
+    requests: int,
+    concurrency: int,
+    latency: float = 0.01,
+    slow_rate: float = 0.04,
+    slow_factor: float = 10.0,
+    seed: int = 0,
+) -> Dict:
+    """
+    Rejoue un flux d'appels au niveau `lightweight`.
+
+    Args:
+        hedge: Politique de couverture (None pour ne jamais doubler un appel).
+        requests: Nombre d'appels.
+        concurrency: Nombre d'appels simultanés.
+        latency: Latence habituelle du fournisseur principal (en secondes).
+        slow_rate: Part des appels lents du fournisseur principal.
+        slow_factor: Facteur de ralentissement des appels lents.
+        seed: Graine des tirages aléatoires.
+
+    Returns:
+        Latences (p50, p95, p99) en millisecondes, appels par fournisseur et statistiques de couverture.
+    """
+    providers = {
+        "ollama": TailProvider(latency, slow_rate, slow_factor, seed=seed),
+        "vllm": TailProvider(latency * 3, seed=seed + 1),
+    }
+    router = SmartLLMRouter(providers=providers, selector=ModelSelector(probe_interval=3600), hedge=hedge)
+    latencies: List[float] = []
+    counter = iter(range(requests))
+
+    async def worker() -> None:
+        for _ in counter:
+            started = time.perf_counter()
+            await router.call_model("lightweight", "prompt")
+            latencies.append(time.perf_counter() - started)
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    finally:
+        await router.selector.stop()
+
+    latencies.sort()
+    return {
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "calls": {name: provider.calls for name, provider in providers.items()},
+        "hedge": hedge.snapshot() if hedge is not None else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=1000, help="Nombre d'appels par mode")
+    parser.add_argument("--concurrency", type=int, default=8, help="Nombre d'appels simultanés")
+    parser.add_argument("--slow-rate", type=float, default=0.04, help="Part des appels lents du backend principal")
+    parser.add_argument("--slow-factor", type=float, default=10.0, help="Facteur de ralentissement des appels lents")
+    parser.add_argument("--max-ratio", type=float, default=0.1, help="Part maximale des appels doublés")
+    parser.add_argument("--percentile", type=float, default=0.95, help="Percentile de latence déclenchant la couverture")
+    parser.add_argument("--seed", type=int, default=0, help="Graine des tirages aléatoires")
+    args = parser.parse_args()
+
+    modes = (("sans", None), ("hedging", HedgePolicy(percentile=args.percentile, max_ratio=args.max_ratio)))
+    for name, hedge in modes:
+        result = asyncio.run(simulate(
+            hedge, args.requests, args.concurrency, slow_rate=args.slow_rate, slow_factor=args.slow_factor,
+            seed=args.seed,
+        ))
+        line = (
+            f"{name:>8} : p50 {result['p50_ms']:7.2f} ms, p95 {result['p95_ms']:7.2f} ms, "
+            f"p99 {result['p99_ms']:7.2f} ms"
+        )
+        if result["hedge"] is not None:
+            stats = result["hedge"]
+            line += f", appels doublés {stats['hedge_ratio']:.1%}, gagnés par le doublon {stats['wins']}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
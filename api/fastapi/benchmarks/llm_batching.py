@@ -0,0 +1,159 @@
+"""
+Simulation hors ligne du regroupement des appels LLM concurrents (micro-batching).
+
+Un fournisseur factice facture chaque appel et reproduit le coût d'un serveur
+d'inférence : chaque appel a un coût fixe (`--call-latency`, prise en charge
+de la requête et passage sur le GPU) et un coût marginal par prompt
+(`--item-latency`), et le serveur ne traite qu'un nombre limité d'appels à la
+fois (`--capacity`). Le même flux d'analyses de blueprints concurrentes
+(`SmartLLMRouter.analyze_blueprint`, sans cache) est rejoué sans regroupement
+puis avec un `MicroBatcher` (`--window`, `--max-batch-size`).
+
+Le script affiche, par mode, le débit, les latences p50/p95, le nombre
+d'appels facturés, leur coût et la taille moyenne des lots.
+
+Usage (depuis `api/fastapi`) :
+
+    python -m benchmarks.llm_batching --requests 400 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.llm_batching import MicroBatcher  # noqa: E402
+from app.core.model_routing import ModelSelector  # noqa: E402
+from app.routers.autopilot_engine import SmartLLMRouter  # noqa: E402
+from benchmarks.load import percentile  # noqa: E402
+
+
+class BillingProvider:
+    """
+    Fournisseur LLM factice facturé à l'appel.
+
+    Un appel (unitaire ou groupé) dure `call_latency + item_latency × prompts`
+    secondes ; au plus `capacity` appels sont traités simultanément, les
+    suivants attendent.
+    """
+
+    def __init__(self, call_latency: float, item_latency: float, capacity: int, price_per_call: float):
+        self.call_latency = call_latency
+        self.item_latency = item_latency
+        self.price_per_call = price_per_call
+        self.calls = 0
+        self.prompts = 0
+        self._slots = asyncio.Semaphore(capacity)
+
+    async def _serve(self, count: int) -> None:
+        self.calls += 1
+        self.prompts += count
+        async with self._slots:
+            await asyncio.sleep(self.call_latency + self.item_latency * count)
+
+    async def complete(self, model: str, prompt: str) -> Tuple[str, int]:
+        await self._serve(1)
+        return "", 200
+
+    async def complete_batch(self, model: str, prompts: List[str]) -> List[Tuple[str, int]]:
+        await self._serve(len(prompts))
+        return [("", 200) for _ in prompts]
+
+    async def probe(self, model: str) -> bool:
+        return True
+
+    @property
+    def cost(self) -> float:
+        return self.calls * self.price_per_call
+
+
+async def simulate(
+    batcher: Optional[MicroBatcher],
+    requests: int,
+    concurrency: int,
+    call_latency: float = 0.02,
+    item_latency: float = 0.001,
+    capacity: int = 4,
+    price_per_call: float = 0.001,
+) -> Dict:
+    """
+    Rejoue un flux d'analyses de blueprints concurrentes.
+
+    Args:
+        batcher: Regroupement des appels (None pour un appel par prompt).
+        requests: Nombre d'analyses.
+        concurrency: Nombre d'analyses simultanées.
+        call_latency: Coût fixe d'un appel au fournisseur (en secondes).
+        item_latency: Coût marginal d'un prompt dans un appel (en secondes).
+        capacity: Nombre d'appels traités simultanément par le fournisseur.
+        price_per_call: Prix facturé par appel.
+
+    Returns:
+        Débit, latences (p50, p95) en millisecondes, appels facturés, coût et taille moyenne des lots.
+    """
+    provider = BillingProvider(call_latency, item_latency, capacity, price_per_call)
+    # Un seul fournisseur : la comparaison porte sur le regroupement, pas sur la sélection du backend
+    router = SmartLLMRouter(
+        providers={"ollama": provider},
+        selector=ModelSelector(probe_interval=3600),
+        batcher=batcher,
+    )
+    latencies: List[float] = []
+    counter = iter(range(requests))
+
+    async def worker() -> None:
+        for index in counter:
+            started = time.perf_counter()
+            await router.analyze_blueprint(f"Blueprint {index}")
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    finally:
+        await router.selector.stop()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "throughput_rps": requests / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "calls": provider.calls,
+        "cost": provider.cost,
+        "mean_batch_size": provider.prompts / provider.calls if provider.calls else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=400, help="Nombre d'analyses par mode")
+    parser.add_argument("--concurrency", type=int, default=32, help="Nombre d'analyses simultanées")
+    parser.add_argument("--window", type=float, default=0.005, help="Fenêtre de regroupement (en secondes)")
+    parser.add_argument("--max-batch-size", type=int, default=16, help="Nombre maximal de prompts par lot")
+    parser.add_argument("--call-latency", type=float, default=0.02, help="Coût fixe d'un appel (en secondes)")
+    parser.add_argument("--item-latency", type=float, default=0.001, help="Coût marginal d'un prompt (en secondes)")
+    parser.add_argument("--capacity", type=int, default=4, help="Appels traités simultanément par le fournisseur")
+    args = parser.parse_args()
+
+    modes = (
+        ("unbatched", None),
+        ("batched", MicroBatcher(window=args.window, max_batch_size=args.max_batch_size)),
+    )
+    for name, batcher in modes:
+        result = asyncio.run(simulate(
+            batcher, args.requests, args.concurrency, args.call_latency, args.item_latency, args.capacity,
+        ))
+        print(
+            f"{name:>10} : {result['throughput_rps']:7.1f} req/s, p50 {result['p50_ms']:7.2f} ms, "
+            f"p95 {result['p95_ms']:7.2f} ms, {result['calls']:>5} appels (coût {result['cost']:.3f}), "
+            f"lots de {result['mean_batch_size']:.1f} prompts en moyenne"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+Test de charge en processus de l'API Gateway (débit et latence p50/p95/p99).
+
+Les requêtes sont envoyées à `app.main:app` à travers un transport ASGI en
+mémoire (`httpx.ASGITransport`), sans réseau ni service externe, par
+`--concurrency` clients simultanés. Le mélange de requêtes se règle avec
+`--mix` (poids relatifs des scénarios) :
+
+- `deploy` : `POST /pipelines/deploy` d'une configuration à chaque fois différente ;
+- `status` : `GET /pipelines/{pipeline_id}/status` d'un pipeline existant ;
+- `autopilot` : `POST /autopilot/execute-blueprint`.
+
+Les résultats peuvent être enregistrés comme référence (`--save`) puis comparés
+à une référence existante (`--baseline`) : le script se termine en erreur si une
+latence p95/p99 ou le débit régresse au-delà de la tolérance (`--tolerance`).
+
+Usage (depuis `api/fastapi`) :
+
+    python -m benchmarks.load --requests 5000 --concurrency 50 --save baseline.json
+    python -m benchmarks.load --requests 5000 --concurrency 50 --baseline baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "memory://")
+os.environ.setdefault("LLM_CACHE_URL", "memory://")
+os.environ.setdefault("CODEBASE_MANIFEST_URL", "memory://")
+os.environ.setdefault("AUTOPILOT_CHECKPOINT_DIR", "")
+
+import httpx  # noqa: E402
+
+# Mélange de requêtes par défaut : majorité de lectures de statut
+DEFAULT_MIX = {"deploy": 1, "status": 8, "autopilot": 1}
+
+# Codes HTTP attendus par scénario (un 429 signale une file de déploiement pleine, pas une erreur)
+EXPECTED_STATUS = {
+    "deploy": (202, 429),
+    "status": (200,),
+    "autopilot": (200,),
+}
+
+# Nombre de pipelines dont le statut est lu par le scénario `status`
+STATUS_PIPELINES = 100
+
+# Métriques comparées à la référence : (nom, True si une valeur plus haute est une régression)
+COMPARED_METRICS = (("p95_ms", True), ("p99_ms", True), ("throughput_rps", False))
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    """
+    Lit un mélange de requêtes de la forme `deploy=1,status=8,autopilot=1`.
+
+    Args:
+        value: Poids relatifs des scénarios.
+
+    Returns:
+        Poids par scénario.
+
+    Raises:
+        ValueError: Si un scénario est inconnu ou si un poids est invalide.
+    """
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in EXPECTED_STATUS:
+            raise ValueError(f"Scénario inconnu: {name} (scénarios disponibles: {', '.join(EXPECTED_STATUS)})")
+        mix[name] = int(weight) if weight else 1
+        if mix[name] < 0:
+            raise ValueError(f"Poids négatif pour le scénario {name}")
+    if not any(mix.values()):
+        raise ValueError("Le mélange de requêtes ne contient aucun scénario.")
+    return mix
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """
+    Percentile par rang le plus proche d'une liste triée.
+
+    Args:
+        sorted_values: Valeurs triées par ordre croissant.
+        p: Percentile entre 0 et 1.
+
+    Returns:
+        Valeur du percentile (0 si la liste est vide).
+    """
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(p * len(sorted_values)))]
+
+
+def _summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, float]:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "mean_ms": sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+    }
+
+
+async def run_load(app, mix: Dict[str, int], requests: int, concurrency: int, seed: int = 0) -> Dict:
+    """
+    Envoie `requests` requêtes à l'application par `concurrency` clients simultanés.
+
+    Args:
+        app: Application ASGI (l'API Gateway).
+        mix: Poids relatifs des scénarios.
+        requests: Nombre total de requêtes.
+        concurrency: Nombre de requêtes simultanées.
+        seed: Graine du tirage des scénarios (pour des exécutions reproductibles).
+
+    Returns:
+        Paramètres de l'exécution et, pour l'ensemble et par scénario : nombre de
+        requêtes, erreurs, débit et latences (moyenne, p50, p95, p99, max) en millisecondes.
+    """
+    from app.main import status_store
+
+    for i in range(STATUS_PIPELINES):
+        status_store.put(f"pipeline_load_{i}", {
+            "status": "running",
+            "details": "Déploiement de test de charge en cours.",
+            "timestamp": "2025-08-25T00:00:00",
+            "deployment_target": "k3s-local",
+        })
+
+    rng = random.Random(seed)
+    names = [name for name, weight in mix.items() if weight > 0]
+    plan = rng.choices(names, weights=[mix[name] for name in names], k=requests)
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+    errors: Dict[str, int] = {name: 0 for name in names}
+    counter = iter(range(requests))
+
+    def build(name: str, index: int):
+        if name == "deploy":
+            return "POST", "/pipelines/deploy", {
+                "name": f"Load Pipeline {seed}-{index}",
+                "nodes": [
+                    {"id": "source", "type": "data_source", "config": {"source": "data.csv"}},
+                    {"id": "model", "type": "model", "inputs": ["source"], "config": {"model_type": "classification"}},
+                ],
+                "compute_requirements": {"cpu": 1, "memory": "2Gi"},
+                "deployment_target": "k3s-local",
+            }
+        if name == "status":
+            return "GET", f"/pipelines/pipeline_load_{index % STATUS_PIPELINES}/status", None
+        return "POST", "/autopilot/execute-blueprint", {
+            "blueprint": f"Application de test de charge {index}",
+            "target_repo": "org/load-test",
+        }
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        for index in counter:
+            name = plan[index]
+            method, url, body = build(name, index)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, json=body)
+                failed = response.status_code not in EXPECTED_STATUS[name]
+            except Exception:
+                failed = True
+            latencies[name].append(time.perf_counter() - started)
+            errors[name] += failed
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(max(1, concurrency))))
+        elapsed = time.perf_counter() - started
+
+    all_latencies = [latency for values in latencies.values() for latency in values]
+    return {
+        "config": {"requests": requests, "concurrency": concurrency, "mix": mix, "seed": seed},
+        "overall": _summarize(all_latencies, sum(errors.values()), elapsed),
+        "scenarios": {name: _summarize(latencies[name], errors[name], elapsed) for name in names},
+    }
+
+
+def compare_to_baseline(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """
+    Compare des résultats à une référence enregistrée.
+
+    Args:
+        results: Résultats de `run_load`.
+        baseline: Référence (résultats d'une exécution précédente).
+        tolerance: Écart relatif toléré (0.2 pour 20 %).
+
+    Returns:
+        Liste des régressions (vide si aucune).
+    """
+    regressions = []
+    sections = [("overall", results.get("overall", {}), baseline.get("overall", {}))]
+    sections += [
+        (name, stats, baseline.get("scenarios", {}).get(name, {}))
+        for name, stats in results.get("scenarios", {}).items()
+    ]
+    for section, current, reference in sections:
+        if current.get("errors", 0) > reference.get("errors", 0):
+            regressions.append(f"{section}.errors: {current['errors']} > référence {reference.get('errors', 0)}")
+        for metric, higher_is_worse in COMPARED_METRICS:
+            if metric not in current or not reference.get(metric):
+                continue
+            value, ref = current[metric], reference[metric]
+            if higher_is_worse and value > ref * (1 + tolerance):
+                regressions.append(f"{section}.{metric}: {value:.2f} > référence {ref:.2f} (+{value / ref - 1:.0%})")
+            elif not higher_is_worse and value < ref / (1 + tolerance):
+                regressions.append(f"{section}.{metric}: {value:.2f} < référence {ref:.2f} ({value / ref - 1:.0%})")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000, help="Nombre total de requêtes")
+    parser.add_argument("--concurrency", type=int, default=20, help="Nombre de requêtes simultanées")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="Poids des scénarios (ex. deploy=1,status=8,autopilot=1)")
+    parser.add_argument("--seed", type=int, default=0, help="Graine du tirage des scénarios")
+    parser.add_argument("--save", help="Enregistrer les résultats dans ce fichier JSON (référence)")
+    parser.add_argument("--baseline", help="Fichier JSON de référence à comparer")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Écart relatif toléré par rapport à la référence")
+    args = parser.parse_args()
+
+    from app.main import app
+
+    results = asyncio.run(run_load(app, args.mix, args.requests, args.concurrency, args.seed))
+
+    print(f"{'scénario':>10} {'requêtes':>9} {'erreurs':>8} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, stats in [("total", results["overall"])] + sorted(results["scenarios"].items()):
+        print(
+            f"{name:>10} {stats['requests']:>9} {stats['errors']:>8} {stats['throughput_rps']:>9.1f} "
+            f"{stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f}"
+        )
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Résultats enregistrés dans {args.save}")
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"RÉGRESSION: {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
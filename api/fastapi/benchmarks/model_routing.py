@@ -0,0 +1,195 @@
+"""
+Simulation hors ligne de la sélection des modèles LLM selon la latence observée.
+
+Des fournisseurs factices reproduisent le comportement de backends réels :
+latence de base par fournisseur, nombre limité d'appels traités simultanément
+par modèle (les suivants attendent), taux d'erreur et panne temporaire. Le même
+flux de requêtes (mélange de niveaux de modèle) est rejoué avec deux politiques :
+
+- `static` : l'ancienne sélection, le modèle optimal du niveau sur Ollama ;
+- `latency` : `SmartLLMRouter.select_backend` (latence moyenne, appels en cours,
+  taux d'erreur, sondes de santé).
+
+Le script affiche, par politique, le débit, les latences p50/p95/p99, le taux
+d'erreur et la répartition des appels par backend.
+
+Usage (depuis `api/fastapi`) :
+
+    python -m benchmarks.model_routing --requests 400 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.model_routing import ModelSelector  # noqa: E402
+from app.routers.autopilot_engine import SmartLLMRouter  # noqa: E402
+from benchmarks.load import percentile  # noqa: E402
+
+# Répartition des requêtes par niveau de modèle
+DEFAULT_TIER_MIX = {"lightweight": 5, "code_heavy": 3, "architecture": 2}
+
+
+class FakeProvider:
+    """
+    Fournisseur LLM factice.
+
+    Chaque modèle traite au plus `capacity` appels simultanés ; un appel dure
+    `latency` secondes (± `jitter`) et échoue avec la probabilité `error_rate`.
+    Pendant la fenêtre de panne `outage` (secondes depuis `started_at`), tous les
+    appels et toutes les sondes échouent.
+    """
+
+    def __init__(
+        self,
+        latency: float,
+        capacity: int,
+        error_rate: float = 0.0,
+        jitter: float = 0.2,
+        outage: Optional[Tuple[float, float]] = None,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.jitter = jitter
+        self.outage = outage
+        self.started_at = time.perf_counter()
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+
+    def _down(self) -> bool:
+        if self.outage is None:
+            return False
+        elapsed = time.perf_counter() - self.started_at
+        return self.outage[0] <= elapsed < self.outage[1]
+
+    async def complete(self, model: str, prompt: str) -> Tuple[str, int]:
+        self.calls += 1
+        slots = self._slots.setdefault(model, asyncio.Semaphore(self.capacity))
+        async with slots:
+            if self._down():
+                await asyncio.sleep(self.latency * 0.1)
+                raise ConnectionError("fournisseur indisponible")
+            await asyncio.sleep(self.latency * (1 + self._rng.uniform(-self.jitter, self.jitter)))
+            if self._rng.random() < self.error_rate:
+                raise RuntimeError("erreur du modèle")
+        return "", 200
+
+    async def probe(self, model: str) -> bool:
+        return not self._down()
+
+
+def build_router(latency_scale: float, seed: int, probe_interval: float) -> SmartLLMRouter:
+    """
+    Construit un routeur servi par les fournisseurs factices du scénario.
+
+    Ollama (local) est rapide à vide mais ne traite que deux appels à la fois par
+    modèle ; vLLM traite davantage d'appels en parallèle mais subit une panne au
+    milieu de la simulation ; l'API de repli est lente et échoue parfois.
+
+    Args:
+        latency_scale: Facteur appliqué aux latences des fournisseurs.
+        seed: Graine des tirages aléatoires.
+        probe_interval: Intervalle des sondes de santé (en secondes).
+
+    Returns:
+        Le routeur configuré.
+    """
+    providers = {
+        "ollama": FakeProvider(0.020 * latency_scale, capacity=2, seed=seed),
+        "vllm": FakeProvider(0.030 * latency_scale, capacity=8, outage=(0.2 * latency_scale, 0.6 * latency_scale), seed=seed + 1),
+        "openai": FakeProvider(0.080 * latency_scale, capacity=64, error_rate=0.02, seed=seed + 2),
+    }
+    selector = ModelSelector(probe_interval=probe_interval, probe_timeout=probe_interval)
+    return SmartLLMRouter(providers=providers, selector=selector)
+
+
+async def simulate(policy: str, requests: int, concurrency: int, tier_mix: Dict[str, int], seed: int = 0,
+                   latency_scale: float = 1.0, probe_interval: float = 0.05) -> Dict:
+    """
+    Rejoue un flux de requêtes avec une politique de sélection.
+
+    Args:
+        policy: `static` ou `latency`.
+        requests: Nombre de requêtes.
+        concurrency: Nombre de requêtes simultanées.
+        tier_mix: Poids relatifs des niveaux de modèle.
+        seed: Graine du tirage des niveaux et des fournisseurs.
+        latency_scale: Facteur appliqué aux latences des fournisseurs.
+        probe_interval: Intervalle des sondes de santé (en secondes).
+
+    Returns:
+        Débit, latences (p50, p95, p99) en millisecondes, taux d'erreur et appels par backend.
+    """
+    router = build_router(latency_scale, seed, probe_interval)
+    tiers = list(tier_mix)
+    plan = random.Random(seed).choices(tiers, weights=[tier_mix[t] for t in tiers], k=requests)
+    latencies, errors, choices = [], 0, Counter()
+    counter = iter(plan)
+    await router.selector.start(router._probe)
+
+    async def worker() -> None:
+        nonlocal errors
+        for tier in counter:
+            if policy == "static":
+                backend = router.selector.backends[("ollama", router.MODELS[tier][0])]
+            else:
+                backend = router.select_backend(tier)
+            provider = router.providers[backend.provider]
+            choices[f"{backend.provider}/{backend.model}"] += 1
+            started = time.perf_counter()
+            try:
+                await router.selector.call(backend, lambda: provider.complete(backend.model, "prompt"))
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    finally:
+        await router.selector.stop()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "throughput_rps": requests / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "error_rate": errors / requests,
+        "backends": dict(choices.most_common()),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=400, help="Nombre de requêtes par politique")
+    parser.add_argument("--concurrency", type=int, default=16, help="Nombre de requêtes simultanées")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Facteur appliqué aux latences des fournisseurs")
+    parser.add_argument("--seed", type=int, default=0, help="Graine des tirages aléatoires")
+    args = parser.parse_args()
+
+    for policy in ("static", "latency"):
+        result = asyncio.run(simulate(
+            policy, args.requests, args.concurrency, DEFAULT_TIER_MIX, args.seed, args.latency_scale,
+        ))
+        print(
+            f"{policy:>8} : {result['throughput_rps']:7.1f} req/s, p50 {result['p50_ms']:7.2f} ms, "
+            f"p95 {result['p95_ms']:7.2f} ms, p99 {result['p99_ms']:7.2f} ms, erreurs {result['error_rate']:.1%}"
+        )
+        for backend, count in result["backends"].items():
+            print(f"{'':>11}{backend:<34} {count:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Benchmark du démarrage à froid de l'API Gateway, avec budget.
+
+Mesure, sur plusieurs exécutions dans des processus neufs :
+
+- le temps d'import cumulé de `app.main` (`python -X importtime`) ;
+- le temps entre le lancement d'uvicorn et la première réponse `200` sur `/health`.
+
+Les médianes sont comparées au budget (`startup_budget.json` par défaut) ; le
+script se termine en erreur si un budget est dépassé, ou si un module censé être
+chargé à la demande (`lazy_modules`) est importé au démarrage.
+
+Usage (depuis `api/fastapi`) :
+
+    python -m benchmarks.startup --runs 5
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, List, Tuple
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BUDGET = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_budget.json")
+
+# Délai maximum d'attente de la première réponse d'uvicorn
+SERVER_START_TIMEOUT = 30.0
+
+
+def _environment() -> Dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'startup.db')}")
+    env["PYTHONPATH"] = APP_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def measure_import() -> Tuple[float, List[str]]:
+    """
+    Mesure le temps d'import de `app.main` dans un nouvel interpréteur.
+
+    Returns:
+        Temps d'import cumulé en millisecondes, et liste des modules importés.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=APP_DIR,
+        env=_environment(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    import_ms = None
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue
+        modules.append(name.strip())
+        if name.strip() == "app.main":
+            import_ms = int(cumulative) / 1000
+    if import_ms is None:
+        raise RuntimeError("Temps d'import de app.main introuvable dans la sortie de -X importtime.")
+    return import_ms, modules
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_first_200() -> float:
+    """
+    Mesure le temps entre le lancement d'uvicorn et la première réponse `200` sur `/health`.
+
+    Returns:
+        Temps en millisecondes.
+    """
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/health"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=APP_DIR,
+        env=_environment(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < SERVER_START_TIMEOUT:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn s'est arrêté au démarrage (code {server.returncode}).")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - started) * 1000
+            except (urllib.error.URLError, ConnectionError, socket.timeout):
+                time.sleep(0.005)
+        raise RuntimeError(f"Pas de réponse 200 sur /health après {SERVER_START_TIMEOUT:.0f} secondes.")
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def check_budget(results: Dict[str, float], modules: List[str], budget: Dict) -> List[str]:
+    """
+    Compare les mesures au budget.
+
+    Args:
+        results: Médianes mesurées (`import_ms`, `first_200_ms`).
+        modules: Modules importés par `app.main`.
+        budget: Budget (`import_ms`, `first_200_ms`, `lazy_modules`).
+
+    Returns:
+        Liste des dépassements (vide si le budget est respecté).
+    """
+    violations = []
+    for metric in ("import_ms", "first_200_ms"):
+        if metric in budget and metric in results and results[metric] > budget[metric]:
+            violations.append(f"{metric}: {results[metric]:.1f} ms > budget {budget[metric]} ms")
+    loaded = set(modules)
+    for module in budget.get("lazy_modules", []):
+        if module in loaded:
+            violations.append(f"le module {module} est importé au démarrage alors qu'il doit être chargé à la demande")
+    return violations
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5, help="Nombre de démarrages mesurés")
+    parser.add_argument("--budget", default=DEFAULT_BUDGET, help="Fichier JSON du budget")
+    parser.add_argument("--skip-server", action="store_true", help="Ne pas mesurer le temps jusqu'au premier 200")
+    args = parser.parse_args()
+
+    with open(args.budget) as f:
+        budget = json.load(f)
+
+    import_times, modules = [], []
+    for _ in range(args.runs):
+        import_ms, modules = measure_import()
+        import_times.append(import_ms)
+    results = {"import_ms": statistics.median(import_times)}
+    if not args.skip_server:
+        results["first_200_ms"] = statistics.median(measure_first_200() for _ in range(args.runs))
+
+    for metric, value in results.items():
+        limit = budget.get(metric)
+        print(f"{metric:>14}: {value:8.1f} ms (budget: {limit if limit is not None else '-'} ms)")
+
+    violations = check_budget(results, modules, budget)
+    for violation in violations:
+        print(f"DÉPASSEMENT: {violation}", file=sys.stderr)
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
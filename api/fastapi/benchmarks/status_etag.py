@@ -0,0 +1,119 @@
+"""
+Benchmark du coût CPU par requête des lectures de statut de pipeline.
+
+Compare, pour un même statut :
+
+- la construction historique de la réponse (modèle Pydantic `PipelineStatusResponse`
+  puis sérialisation JSON par FastAPI) ;
+- le corps pré-sérialisé à l'écriture (`serialized_status`) ;
+- puis, à travers toute la pile ASGI, une requête `200` et une requête
+  conditionnelle `If-None-Match` répondue par `304`.
+
+Usage (depuis `api/fastapi`) :
+
+    python -m benchmarks.status_etag --requests 5000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "memory://")
+
+import httpx  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from app.main import PipelineStatusResponse, app, serialized_status, status_payload, status_store  # noqa: E402
+
+PIPELINE_ID = "pipeline_benchmark"
+
+
+def _cpu_per_call(func, iterations: int) -> float:
+    start = time.process_time()
+    for _ in range(iterations):
+        func()
+    return (time.process_time() - start) / iterations
+
+
+def bench_serialization(iterations: int) -> dict:
+    """
+    Mesure le coût CPU de la construction du corps de la réponse seule.
+
+    Args:
+        iterations: Nombre d'itérations.
+
+    Returns:
+        Temps CPU moyen par appel (en microsecondes), par méthode.
+    """
+    status_info = status_store.get(PIPELINE_ID)
+
+    def legacy():
+        model = PipelineStatusResponse(**status_payload(PIPELINE_ID, status_info))
+        return JSONResponse(content=jsonable_encoder(model)).body
+
+    def cached():
+        return serialized_status(PIPELINE_ID, status_info)
+
+    return {
+        "legacy_model_us": _cpu_per_call(legacy, iterations) * 1e6,
+        "preserialized_us": _cpu_per_call(cached, iterations) * 1e6,
+    }
+
+
+async def bench_requests(requests: int) -> dict:
+    """
+    Mesure le coût CPU par requête à travers la pile ASGI complète.
+
+    Args:
+        requests: Nombre de requêtes par scénario.
+
+    Returns:
+        Temps CPU moyen par requête (en microsecondes) pour une réponse `200` et `304`.
+    """
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        url = f"/pipelines/{PIPELINE_ID}/status"
+        etag = (await client.get(url)).headers["ETag"]
+        results = {}
+        for name, headers, expected in (
+            ("full_200_us", {}, 200),
+            ("conditional_304_us", {"If-None-Match": etag}, 304),
+        ):
+            start = time.process_time()
+            for _ in range(requests):
+                response = await client.get(url, headers=headers)
+                assert response.status_code == expected
+            results[name] = (time.process_time() - start) / requests * 1e6
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000, help="Nombre de requêtes par scénario")
+    args = parser.parse_args()
+
+    status_store.put(PIPELINE_ID, {
+        "status": "running",
+        "details": "Déploiement de benchmark en cours.",
+        "timestamp": "2025-08-25T00:00:00",
+        "deployment_target": "k3s-local",
+    })
+
+    serialization = bench_serialization(args.requests * 10)
+    requests = asyncio.run(bench_requests(args.requests))
+
+    print("Construction du corps de la réponse (CPU par appel) :")
+    print(f"  modèle Pydantic + sérialisation : {serialization['legacy_model_us']:8.2f} µs")
+    print(f"  corps pré-sérialisé             : {serialization['preserialized_us']:8.2f} µs")
+    print(f"  économie                        : {serialization['legacy_model_us'] - serialization['preserialized_us']:8.2f} µs")
+    print("Requête complète via ASGI (CPU par requête) :")
+    print(f"  200 (corps pré-sérialisé)       : {requests['full_200_us']:8.2f} µs")
+    print(f"  304 (If-None-Match)             : {requests['conditional_304_us']:8.2f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,7 +9,7 @@ import httpx
 import json
 import os
 import sys
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional
 
 # Configuration
 API_GATEWAY_URL = os.getenv("API_GATEWAY_URL", "http://localhost:8000/api/v1")
@@ -31,8 +31,14 @@ class ClineIntegration:
                              stack: Optional[str] = None, 
                              ui_system: str = "shadcn",
                              autopilot: bool = True, 
-                             deploy: bool = False) -> Dict[str, Any]:
-        """Génère un projet à partir d'un blueprint."""
+                             deploy: bool = False,
+                             on_event: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Génère un projet à partir d'un blueprint.
+        
+        La progression est reçue en NDJSON (un événement par étape et par fichier
+        généré) et transmise à `on_event` au fil de l'eau.
+        """
         url = f"{self.api_gateway_url}/autopilot/execute-blueprint"
         
         payload = {
@@ -44,14 +50,36 @@ class ClineIntegration:
             "deploy": deploy
         }
         
-        response = await self.client.post(url, json=payload)
-        response.raise_for_status()
-        return response.json()
+        async with self.client.stream("POST", url, params={"stream": "ndjson"}, json=payload) as response:
+            if response.is_error:
+                await response.aread()
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                event = json.loads(line)
+                if on_event is not None:
+                    on_event(event)
+                if event["event"] == "error":
+                    raise RuntimeError(event["detail"])
+                if event["event"] == "result":
+                    return event["data"]
+        raise RuntimeError("Le stream de progression s'est terminé sans résultat.")
     
     async def close(self):
         """Ferme le client HTTP."""
         await self.client.aclose()
 
+def print_progress(event: Dict[str, Any]) -> None:
+    """Affiche un événement de progression sur la sortie d'erreur."""
+    elapsed = f"[{event['elapsed']:7.2f}s]"
+    if event["event"] == "stage" and event["status"] == "completed":
+        print(f"{elapsed} {event['stage']} terminé ({event['duration']:.2f}s)", file=sys.stderr)
+    elif event["event"] == "stage":
+        print(f"{elapsed} {event['stage']}...", file=sys.stderr)
+    elif event["event"] == "file":
+        print(f"{elapsed}   {event['path']} ({event['size']} octets)", file=sys.stderr)
+
 async def main():
     parser = argparse.ArgumentParser(description="Intégration Cline CLI avec l'Autopilot Engine")
     parser.add_argument("command", choices=["analyze", "generate"], help="Commande à exécuter")
@@ -85,7 +113,8 @@ async def main():
                 stack=args.stack,
                 ui_system=args.ui_system,
                 autopilot=args.autopilot,
-                deploy=args.deploy
+                deploy=args.deploy,
+                on_event=print_progress
             )
             print(json.dumps(result, indent=2))
     
@@ -1,16 +1,33 @@
 import json
 import os
+import re
 import subprocess
 import tempfile
-from typing import Dict, Any
+from typing import Dict, Any, List
 
-def main(pipeline_config: Dict[str, Any], pipeline_nodes: Dict[str, Any]) -> Dict[str, Any]:
+# Répertoire des répertoires de travail Terraform (un par pipeline, avec son état local)
+DEFAULT_STATE_DIR = os.path.join(tempfile.gettempdir(), "mlops-terraform")
+
+def main(
+    pipeline_config: Dict[str, Any],
+    pipeline_nodes: Dict[str, Any],
+    output_format: str = "hcl",
+    previous_pipeline_config: Dict[str, Any] = None,
+    state_dir: str = None,
+) -> Dict[str, Any]:
     """
     Script pour déployer un pipeline ML.
     
     Args:
         pipeline_config: Configuration du pipeline.
         pipeline_nodes: Nodes du pipeline.
+        output_format: Format de sortie, "hcl" (`main.tf`) ou "json" (`main.tf.json`).
+        previous_pipeline_config: Configuration précédemment déployée (format "json"
+            uniquement) : si l'état Terraform du pipeline existe, seules les ressources
+            modifiées sont planifiées et appliquées.
+        state_dir: Répertoire des états Terraform (`TERRAFORM_STATE_DIR`, sinon un
+            répertoire temporaire du système) ; chaque pipeline y a son répertoire
+            de travail, conservé entre deux déploiements.
         
     Returns:
         Résultat du déploiement.
@@ -25,33 +42,65 @@ def main(pipeline_config: Dict[str, Any], pipeline_nodes: Dict[str, Any]) -> Dic
         if not target_platform:
             raise ValueError("La plateforme cible est requise.")
         
-        # 2. Générer l"IaC (Terraform)
-        print("Génération de l"IaC...")
-        terraform_code = generate_terraform_code(pipeline_config, pipeline_nodes)
+        # 2. Générer l'IaC (Terraform)
+        print("Génération de l'IaC...")
+        # Le répertoire de travail du pipeline conserve son état Terraform : sans
+        # état (premier déploiement, ou état perdu), tout est planifié et appliqué
+        workdir = os.path.join(
+            state_dir or os.getenv("TERRAFORM_STATE_DIR") or DEFAULT_STATE_DIR,
+            re.sub(r"[^a-z0-9_-]", "-", pipeline_config["pipeline_name"].lower()),
+        )
+        has_state = os.path.exists(os.path.join(workdir, "terraform.tfstate"))
+        targets = []
+        if output_format == "json":
+            document = build_terraform_document(pipeline_config, pipeline_nodes)
+            terraform_code = json.dumps(document, indent=2, sort_keys=True)
+            terraform_filename = "main.tf.json"
+            if previous_pipeline_config and has_state:
+                # Limiter le plan aux ressources modifiées depuis le dernier déploiement
+                delta = diff_terraform_documents(
+                    build_terraform_document(previous_pipeline_config, pipeline_nodes), document
+                )
+                changed = delta["create"] + delta["update"] + delta["delete"]
+                if not changed:
+                    return {
+                        "status": "success",
+                        "message": f"Aucune modification à appliquer pour le pipeline {pipeline_config['pipeline_name']}.",
+                        "pipeline_id": f"pipeline_{pipeline_config['pipeline_name'].replace(' ', '_')}"
+                    }
+                if all("." in address for address in changed):
+                    targets = [f"-target={address}" for address in changed]
+        else:
+            terraform_code = generate_terraform_code(pipeline_config, pipeline_nodes)
+            terraform_filename = "main.tf"
+        
+        # 3. Écrire le code Terraform dans le répertoire de travail du pipeline
+        os.makedirs(workdir, exist_ok=True)
+        for filename in ("main.tf", "main.tf.json"):
+            # Le fichier de l'autre format définirait les mêmes ressources une seconde fois
+            if filename != terraform_filename and os.path.exists(os.path.join(workdir, filename)):
+                os.remove(os.path.join(workdir, filename))
+        terraform_file = os.path.join(workdir, terraform_filename)
+        with open(terraform_file, "w") as f:
+            f.write(terraform_code)
+        
+        # 4. Initialiser Terraform
+        print("Initialisation de Terraform...")
+        subprocess.run(["terraform", "init"], cwd=workdir, check=True)
         
-        # 3. Écrire le code Terraform dans un fichier temporaire
-        with tempfile.TemporaryDirectory() as tmpdir:
-            terraform_file = os.path.join(tmpdir, "main.tf")
-            with open(terraform_file, "w") as f:
-                f.write(terraform_code)
-            
-            # 4. Initialiser Terraform
-            print("Initialisation de Terraform...")
-            subprocess.run(["terraform", "init"], cwd=tmpdir, check=True)
-            
-            # 5. Planifier le déploiement
-            print("Planification du déploiement...")
-            subprocess.run(["terraform", "plan"], cwd=tmpdir, check=True)
-            
-            # 6. Appliquer le déploiement
-            print("Application du déploiement...")
-            subprocess.run(["terraform", "apply", "-auto-approve"], cwd=tmpdir, check=True)
+        # 5. Planifier le déploiement
+        print("Planification du déploiement...")
+        subprocess.run(["terraform", "plan", *targets], cwd=workdir, check=True)
+        
+        # 6. Appliquer le déploiement
+        print("Application du déploiement...")
+        subprocess.run(["terraform", "apply", "-auto-approve", *targets], cwd=workdir, check=True)
         
         # 7. Retourner un message de succès
         return {
             "status": "success",
-            "message": f"Pipeline {pipeline_config[pipeline_name]} déployé avec succès sur {target_platform}.",
-            "pipeline_id": f"pipeline_{pipeline_config[pipeline_name].replace( , _)}"
+            "message": f"Pipeline {pipeline_config['pipeline_name']} déployé avec succès sur {target_platform}.",
+            "pipeline_id": f"pipeline_{pipeline_config['pipeline_name'].replace(' ', '_')}"
         }
         
     except Exception as e:
@@ -293,3 +342,136 @@ resource "runpod_pod" "ml_pipeline" {{
   shutdown_timeout = 5
 }}
 """
+
+def build_terraform_document(pipeline_config: Dict[str, Any], pipeline_nodes: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Construit le document Terraform (syntaxe `.tf.json`) sous forme d'arbre de dictionnaires.
+    
+    Args:
+        pipeline_config: Configuration du pipeline.
+        pipeline_nodes: Nodes du pipeline.
+        
+    Returns:
+        Document Terraform.
+    """
+    target_platform = pipeline_config["target_platform"]
+    name = pipeline_config["pipeline_name"].replace(" ", "-").lower()
+    
+    if target_platform == "k3s-local":
+        return {
+            "terraform": {"required_providers": {"kubernetes": {"source": "hashicorp/kubernetes", "version": "2.20.0"}}},
+            "provider": {"kubernetes": {"config_path": "~/.kube/config"}},
+            "resource": {
+                "kubernetes_deployment": {"ml_pipeline": {
+                    "metadata": {"name": name, "labels": {"app": name}},
+                    "spec": {
+                        "replicas": 1,
+                        "selector": {"match_labels": {"app": name}},
+                        "template": {
+                            "metadata": {"labels": {"app": name}},
+                            "spec": {"container": {"image": "nginx:latest", "name": name, "port": {"container_port": 80}}},
+                        },
+                    },
+                }},
+                "kubernetes_service": {"ml_pipeline": {
+                    "metadata": {"name": name},
+                    "spec": {
+                        "selector": {"app": name},
+                        "port": {"protocol": "TCP", "port": 80, "target_port": 80},
+                        "type": "LoadBalancer",
+                    },
+                }},
+            },
+        }
+    elif target_platform == "exoscale":
+        return {
+            "terraform": {"required_providers": {"exoscale": {"source": "exoscale/exoscale", "version": "0.50.0"}}},
+            "provider": {"exoscale": {"key": "${var.exoscale_api_key}", "secret": "${var.exoscale_api_secret}"}},
+            "resource": {
+                "exoscale_compute_instance": {"ml_pipeline": {
+                    "name": name,
+                    "type": "standard.medium",
+                    "disk_size": 50,
+                    "image": "ubuntu-22.04",
+                    "security_group_ids": ["${exoscale_security_group.ml_pipeline.id}"],
+                }},
+                "exoscale_security_group": {"ml_pipeline": {"name": f"{name}-sg"}},
+                "exoscale_security_group_rule": {"ml_pipeline_http": {
+                    "security_group_id": "${exoscale_security_group.ml_pipeline.id}",
+                    "type": "ingress",
+                    "protocol": "tcp",
+                    "start_port": 80,
+                    "end_port": 80,
+                    "cidr": "0.0.0.0/0",
+                }},
+            },
+        }
+    elif target_platform == "vastai":
+        # Vast.ai n'a pas de provider Terraform officiel, le déploiement passe par leur API.
+        return {
+            "//": "Vast.ai does not have an official Terraform provider. Deployment would be done via their API.",
+            "locals": {
+                "pipeline_name": pipeline_config["pipeline_name"],
+                "target_platform": target_platform,
+                "nodes": pipeline_nodes,
+            },
+        }
+    elif target_platform == "runpod":
+        return {
+            "terraform": {"required_providers": {"runpod": {"source": "runpod/runpod", "version": "1.0.0"}}},
+            "provider": {"runpod": {"api_key": "${var.runpod_api_key}"}},
+            "resource": {
+                "runpod_pod": {"ml_pipeline": {
+                    "name": name,
+                    "image_name": "runpod/pytorch:2.0.1-py3.10-cuda11.8.0-devel-ubuntu22.04",
+                    "gpu_type_id": "NVIDIA GeForce RTX 4090",
+                    "gpu_count": 1,
+                    "container_disk_in_gb": 40,
+                    "volume_in_gb": 0,
+                    "volume_mount_path": "/runpod-volume",
+                    "cloud_type": "ALL",
+                    "min_vcpu_count": 2,
+                    "min_memory_in_gb": 15,
+                    "docker_args": "",
+                    "ports": "",
+                    "env": {},
+                    "template_id": "",
+                    "container_name": "runpod-container",
+                    "start_ssh": True,
+                    "is_public": False,
+                    "shutdown_timeout": 5,
+                }},
+            },
+        }
+    else:
+        raise ValueError(f"Plateforme cible non supportée: {target_platform}")
+
+def diff_terraform_documents(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, List[str]]:
+    """
+    Calcule les adresses des blocs Terraform créés, modifiés ou supprimés entre deux rendus.
+    
+    Args:
+        old: Document Terraform précédent.
+        new: Nouveau document Terraform.
+        
+    Returns:
+        Adresses des blocs à créer (`create`), modifier (`update`) et supprimer (`delete`).
+    """
+    def blocks(document: Dict[str, Any]) -> Dict[str, Any]:
+        indexed = {}
+        for section, content in document.items():
+            if section in ("resource", "data"):
+                prefix = "" if section == "resource" else "data."
+                for block_type, instances in content.items():
+                    for block_name, body in instances.items():
+                        indexed[f"{prefix}{block_type}.{block_name}"] = body
+            else:
+                indexed[section] = content
+        return indexed
+    
+    old_blocks, new_blocks = blocks(old), blocks(new)
+    return {
+        "create": sorted(set(new_blocks) - set(old_blocks)),
+        "update": sorted(a for a in set(old_blocks) & set(new_blocks) if old_blocks[a] != new_blocks[a]),
+        "delete": sorted(set(old_blocks) - set(new_blocks)),
+    }
@@ -1,28 +1,44 @@
 import json
-from typing import Dict, Any
+from typing import Dict, Any, List
 
-def main(pipeline_config: Dict[str, Any], pipeline_nodes: Dict[str, Any]) -> Dict[str, Any]:
+def main(
+    pipeline_config: Dict[str, Any],
+    pipeline_nodes: Dict[str, Any],
+    output_format: str = "hcl",
+    previous_pipeline_config: Dict[str, Any] = None,
+) -> Dict[str, Any]:
     """
     Script pour générer le code Terraform.
     
     Args:
         pipeline_config: Configuration du pipeline.
         pipeline_nodes: Nodes du pipeline.
+        output_format: Format de sortie, "hcl" (`main.tf`) ou "json" (`main.tf.json`).
+        previous_pipeline_config: Configuration précédente du pipeline (format "json"
+            uniquement), pour retourner le delta de ressources à appliquer.
         
     Returns:
         Code Terraform généré.
     """
     try:
-        # 1. Générer l"IaC (Terraform)
-        print("Génération de l"IaC...")
-        terraform_code = generate_terraform_code(pipeline_config, pipeline_nodes)
+        # 1. Générer l'IaC (Terraform)
+        print("Génération de l'IaC...")
+        if output_format == "json":
+            document = build_terraform_document(pipeline_config, pipeline_nodes)
+            terraform_code = json.dumps(document, indent=2, sort_keys=True)
+        else:
+            terraform_code = generate_terraform_code(pipeline_config, pipeline_nodes)
         
         # 2. Retourner le code Terraform généré
-        return {
+        result = {
             "status": "success",
             "message": "Code Terraform généré avec succès.",
             "terraform_code": terraform_code
         }
+        if output_format == "json" and previous_pipeline_config:
+            previous_document = build_terraform_document(previous_pipeline_config, pipeline_nodes)
+            result["delta"] = diff_terraform_documents(previous_document, document)
+        return result
         
     except Exception as e:
         # En cas d"erreur, retourner un message d"erreur
@@ -262,4 +278,137 @@ resource "runpod_pod" "ml_pipeline" {{
   is_public       = false
   shutdown_timeout = 5
 }}
-"""
\ No newline at end of file
+"""
+
+def build_terraform_document(pipeline_config: Dict[str, Any], pipeline_nodes: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Construit le document Terraform (syntaxe `.tf.json`) sous forme d'arbre de dictionnaires.
+    
+    Args:
+        pipeline_config: Configuration du pipeline.
+        pipeline_nodes: Nodes du pipeline.
+        
+    Returns:
+        Document Terraform.
+    """
+    target_platform = pipeline_config["target_platform"]
+    name = pipeline_config["pipeline_name"].replace(" ", "-").lower()
+    
+    if target_platform == "k3s-local":
+        return {
+            "terraform": {"required_providers": {"kubernetes": {"source": "hashicorp/kubernetes", "version": "2.20.0"}}},
+            "provider": {"kubernetes": {"config_path": "~/.kube/config"}},
+            "resource": {
+                "kubernetes_deployment": {"ml_pipeline": {
+                    "metadata": {"name": name, "labels": {"app": name}},
+                    "spec": {
+                        "replicas": 1,
+                        "selector": {"match_labels": {"app": name}},
+                        "template": {
+                            "metadata": {"labels": {"app": name}},
+                            "spec": {"container": {"image": "nginx:latest", "name": name, "port": {"container_port": 80}}},
+                        },
+                    },
+                }},
+                "kubernetes_service": {"ml_pipeline": {
+                    "metadata": {"name": name},
+                    "spec": {
+                        "selector": {"app": name},
+                        "port": {"protocol": "TCP", "port": 80, "target_port": 80},
+                        "type": "LoadBalancer",
+                    },
+                }},
+            },
+        }
+    elif target_platform == "exoscale":
+        return {
+            "terraform": {"required_providers": {"exoscale": {"source": "exoscale/exoscale", "version": "0.50.0"}}},
+            "provider": {"exoscale": {"key": "${var.exoscale_api_key}", "secret": "${var.exoscale_api_secret}"}},
+            "resource": {
+                "exoscale_compute_instance": {"ml_pipeline": {
+                    "name": name,
+                    "type": "standard.medium",
+                    "disk_size": 50,
+                    "image": "ubuntu-22.04",
+                    "security_group_ids": ["${exoscale_security_group.ml_pipeline.id}"],
+                }},
+                "exoscale_security_group": {"ml_pipeline": {"name": f"{name}-sg"}},
+                "exoscale_security_group_rule": {"ml_pipeline_http": {
+                    "security_group_id": "${exoscale_security_group.ml_pipeline.id}",
+                    "type": "ingress",
+                    "protocol": "tcp",
+                    "start_port": 80,
+                    "end_port": 80,
+                    "cidr": "0.0.0.0/0",
+                }},
+            },
+        }
+    elif target_platform == "vastai":
+        # Vast.ai n'a pas de provider Terraform officiel, le déploiement passe par leur API.
+        return {
+            "//": "Vast.ai does not have an official Terraform provider. Deployment would be done via their API.",
+            "locals": {
+                "pipeline_name": pipeline_config["pipeline_name"],
+                "target_platform": target_platform,
+                "nodes": pipeline_nodes,
+            },
+        }
+    elif target_platform == "runpod":
+        return {
+            "terraform": {"required_providers": {"runpod": {"source": "runpod/runpod", "version": "1.0.0"}}},
+            "provider": {"runpod": {"api_key": "${var.runpod_api_key}"}},
+            "resource": {
+                "runpod_pod": {"ml_pipeline": {
+                    "name": name,
+                    "image_name": "runpod/pytorch:2.0.1-py3.10-cuda11.8.0-devel-ubuntu22.04",
+                    "gpu_type_id": "NVIDIA GeForce RTX 4090",
+                    "gpu_count": 1,
+                    "container_disk_in_gb": 40,
+                    "volume_in_gb": 0,
+                    "volume_mount_path": "/runpod-volume",
+                    "cloud_type": "ALL",
+                    "min_vcpu_count": 2,
+                    "min_memory_in_gb": 15,
+                    "docker_args": "",
+                    "ports": "",
+                    "env": {},
+                    "template_id": "",
+                    "container_name": "runpod-container",
+                    "start_ssh": True,
+                    "is_public": False,
+                    "shutdown_timeout": 5,
+                }},
+            },
+        }
+    else:
+        raise ValueError(f"Plateforme cible non supportée: {target_platform}")
+
+def diff_terraform_documents(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, List[str]]:
+    """
+    Calcule les adresses des blocs Terraform créés, modifiés ou supprimés entre deux rendus.
+    
+    Args:
+        old: Document Terraform précédent.
+        new: Nouveau document Terraform.
+        
+    Returns:
+        Adresses des blocs à créer (`create`), modifier (`update`) et supprimer (`delete`).
+    """
+    def blocks(document: Dict[str, Any]) -> Dict[str, Any]:
+        indexed = {}
+        for section, content in document.items():
+            if section in ("resource", "data"):
+                prefix = "" if section == "resource" else "data."
+                for block_type, instances in content.items():
+                    for block_name, body in instances.items():
+                        indexed[f"{prefix}{block_type}.{block_name}"] = body
+            else:
+                indexed[section] = content
+        return indexed
+    
+    old_blocks, new_blocks = blocks(old), blocks(new)
+    return {
+        "create": sorted(set(new_blocks) - set(old_blocks)),
+        "update": sorted(a for a in set(old_blocks) & set(new_blocks) if old_blocks[a] != new_blocks[a]),
+        "delete": sorted(set(old_blocks) - set(new_blocks)),
+    }
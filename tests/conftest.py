@@ -1,11 +1,19 @@
 import sys
 import os
+import tempfile
 import pytest
 from fastapi.testclient import TestClient
 
 # Ajouter le chemin de l'application au sys.path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'api', 'fastapi'))
 
+# Utiliser des bases SQLite temporaires pour le stockage des statuts, le cache des réponses LLM
+# et les manifestes du code généré, et un répertoire temporaire pour les checkpoints des exécutions
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}")
+os.environ.setdefault("LLM_CACHE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'llm_cache.db')}")
+os.environ.setdefault("CODEBASE_MANIFEST_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'manifests.db')}")
+os.environ.setdefault("AUTOPILOT_CHECKPOINT_DIR", os.path.join(tempfile.mkdtemp(), "runs"))
+
 # Importer l'application FastAPI
 from app.main import app
 
@@ -1,6 +1,9 @@
+import json
 import pytest
 from fastapi.testclient import TestClient
-from app.main import app
+import app.main as main
+from app.core.jobs import JobQueueFull
+from app.main import app, status_store
 
 client = TestClient(app)
 
@@ -50,11 +53,11 @@ def test_deploy_pipeline():
     }
     
     response = client.post("/pipelines/deploy", json=pipeline_config)
-    assert response.status_code == 200
+    assert response.status_code == 202
     json_response = response.json()
     assert "pipeline_id" in json_response
     assert "status" in json_response
-    assert json_response["status"] == "initiated"
+    assert json_response["status"] == "queued"
     assert "message" in json_response
 
 def test_get_pipeline_status():
@@ -70,4 +73,89 @@ def test_get_pipeline_status():
     assert "status" in json_response
     # Le statut peut varier, mais il doit exister
     assert json_response["status"] is not None
-    assert "details" in json_response
\ No newline at end of file
+    assert "details" in json_response
+
+def test_terraform_diff():
+    """Test de l'endpoint de calcul du delta Terraform."""
+    base = {
+        "name": "Diff Pipeline",
+        "nodes": [],
+        "compute_requirements": {},
+        "deployment_target": "runpod",
+    }
+    response = client.post("/terraform/diff", json={"old": base, "new": dict(base, name="Diff Pipeline 2")})
+    assert response.status_code == 200
+    json_response = response.json()
+    assert json_response["targets"] == ["-target=runpod_pod.ml_pipeline"]
+    assert json_response["create"] == [] and json_response["delete"] == []
+
+def test_deploy_pipelines_batch():
+    """Test de l'endpoint de déploiement par lots (résultats NDJSON)."""
+    configs = [
+        {
+            "name": f"Batch Pipeline {i}",
+            "nodes": [],
+            "compute_requirements": {},
+            "deployment_target": target,
+        }
+        for i, target in enumerate(["k3s-local", "exoscale", "invalid-target"])
+    ]
+    response = client.post("/pipelines/deploy:batch", json=configs)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    results = sorted((json.loads(line) for line in response.text.splitlines()), key=lambda r: r["index"])
+    assert [r["status"] for r in results] == ["queued", "queued", "failed"]
+    assert results[0]["pipeline_id"].startswith("pipeline_Batch_Pipeline_0")
+    # Les déploiements du lot passent par la file d'attente
+    assert status_store.get(results[1]["pipeline_id"]) is not None
+
+def test_deploy_pipelines_batch_backpressure_and_idempotency(monkeypatch):
+    """Test du lot : refus par pipeline lorsque la file est pleine, et rejeu avec Idempotency-Key."""
+    configs = [
+        {"name": f"Queued Batch {i}", "nodes": [], "compute_requirements": {}, "deployment_target": "k3s-local"}
+        for i in range(2)
+    ]
+    headers = {"Idempotency-Key": "batch-key-1"}
+    first = [json.loads(line) for line in client.post("/pipelines/deploy:batch", json=configs, headers=headers).text.splitlines()]
+    replay = [json.loads(line) for line in client.post("/pipelines/deploy:batch", json=configs, headers=headers).text.splitlines()]
+    assert all(r["status"] == "queued" for r in first) and all(r["replayed"] for r in replay)
+    assert {r["pipeline_id"] for r in first} == {r["pipeline_id"] for r in replay}
+
+    async def full(job_id, payload):
+        raise JobQueueFull(7)
+
+    monkeypatch.setattr(main.deployment_queue, "submit", full)
+    configs[0]["name"] = "Rejected Batch"
+    results = [json.loads(line) for line in client.post("/pipelines/deploy:batch", json=configs[:1]).text.splitlines()]
+    assert results == [{
+        "index": 0,
+        "name": "Rejected Batch",
+        "status": "rejected",
+        "message": "File de déploiement pleine, veuillez réessayer plus tard.",
+        "retry_after": 7,
+    }]
+
+def test_list_pipelines():
+    """Test du listing paginé des pipelines filtré par cible."""
+    for i in range(3):
+        status_store.put(f"pipeline_listing_{i}", {
+            "status": "running",
+            "details": "Listing",
+            "timestamp": f"2030-01-01T00:00:0{i}",
+            "deployment_target": "listing-target",
+        })
+    status_store.flush()
+
+    response = client.get("/pipelines", params={"deployment_target": "listing-target", "limit": 2})
+    assert response.status_code == 200
+    page = response.json()
+    assert [item["pipeline_id"] for item in page["items"]] == ["pipeline_listing_0", "pipeline_listing_1"]
+    assert page["items"][0]["deployment_target"] == "listing-target"
+
+    response = client.get("/pipelines", params={"deployment_target": "listing-target", "cursor": page["next_cursor"]})
+    page = response.json()
+    assert [item["pipeline_id"] for item in page["items"]] == ["pipeline_listing_2"]
+    assert page["next_cursor"] is None
+
+    assert client.get("/pipelines", params={"cursor": "invalide"}).status_code == 400
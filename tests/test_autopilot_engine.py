@@ -0,0 +1,320 @@
+import asyncio
+import json
+import threading
+
+from fastapi.testclient import TestClient
+
+from app.core import llm_cache
+from app.core.codebase_manifest import ManifestStore
+from app.core.llm_cache import LLMResponseCache, llm_cache_key
+from app.main import app
+from app.routers.autopilot_engine import BlueprintRequest, CIPipelineBuilder, GitAutomation, SmartLLMRouter, run_blueprint
+
+client = TestClient(app)
+
+
+class SlowFileRouter(SmartLLMRouter):
+    """Routeur dont la génération d'un fichier prend un temps fixé par fichier."""
+
+    def __init__(self, delays, **kwargs):
+        super().__init__(**kwargs)
+        self.delays = delays
+        self.active = {}
+        self.peak = {}
+
+    async def generate_file(self, path, project_structure, tier):
+        self.active[tier] = self.active.get(tier, 0) + 1
+        self.peak[tier] = max(self.peak.get(tier, 0), self.active[tier])
+        await asyncio.sleep(self.delays[path])
+        self.active[tier] -= 1
+        return f"content of {path}"
+
+
+def test_iter_codebase_streams_files_as_they_complete():
+    """Test de la production des fichiers dans leur ordre d'achèvement, en parallèle."""
+    delays = {"slow.py": 0.2, "README.md": 0.01, "app.py": 0.05}
+    router = SlowFileRouter(delays)
+
+    async def scenario():
+        started = asyncio.get_running_loop().time()
+        arrivals = []
+        async for path, content in router.iter_codebase({"files": list(delays)}):
+            arrivals.append((path, asyncio.get_running_loop().time() - started))
+            assert content == f"content of {path}"
+        return arrivals
+
+    arrivals = asyncio.run(scenario())
+    assert [path for path, _ in arrivals] == ["README.md", "app.py", "slow.py"]
+    # Le premier fichier est disponible bien avant la fin du plus lent
+    assert arrivals[0][1] < 0.1
+    assert arrivals[-1][1] < 0.2 + 0.05 + 0.01
+
+
+def test_iter_codebase_bounds_concurrency_per_tier():
+    """Test de la limite de générations simultanées par niveau de modèle."""
+    files = [f"module{i}.py" for i in range(6)] + [f"doc{i}.md" for i in range(6)]
+    router = SlowFileRouter({path: 0.02 for path in files}, tier_concurrency={"code_heavy": 2, "lightweight": 3})
+
+    async def scenario():
+        return await router.generate_codebase({"files": files})
+
+    codebase = asyncio.run(scenario())
+    assert sorted(codebase) == sorted(files)
+    assert router.peak == {"code_heavy": 2, "lightweight": 3}
+
+
+def test_generate_codebase_endpoint():
+    """Test de l'endpoint de génération de code à partir d'une structure de projet."""
+    response = client.post("/autopilot/generate-codebase", json={"files": ["main.py", "README.md"]})
+    assert response.status_code == 200
+    assert response.json() == {
+        "main.py": "print('Hello, World!')",
+        "README.md": "# Generated Project\n\nThis is a generated project.",
+    }
+    response = client.post("/autopilot/execute-blueprint", json={"blueprint": "Une app", "target_repo": "org/app"})
+    assert response.status_code == 200
+    assert response.json()["repository"] == "https://github.com/user/app"
+
+
+def test_llm_cache_persists_normalized_blueprint_analysis(tmp_path):
+    """Test du cache des analyses de blueprint : normalisation, persistance sur disque et métriques."""
+    calls = []
+
+    class CountingRouter(SmartLLMRouter):
+        async def _analyze_blueprint(self, blueprint):
+            calls.append(blueprint)
+            return await super()._analyze_blueprint(blueprint)
+
+    path = str(tmp_path / "llm_cache.db")
+
+    async def scenario():
+        router = CountingRouter(cache=LLMResponseCache(path))
+        first = await router.analyze_blueprint("Une app  de\ttodo ")
+        first["complexity"] = "modified by caller"
+        second = await router.analyze_blueprint("Une app de todo")
+        router.cache.close()
+        # Un nouveau processus (mémoire vide) retrouve la réponse sur disque
+        restarted = CountingRouter(cache=LLMResponseCache(path))
+        third = await restarted.analyze_blueprint("Une app de todo")
+        return router.cache.stats(), restarted.cache.stats(), second, third
+
+    stats, restarted_stats, second, third = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert second == third and second["complexity"] == "medium"
+    assert stats["memory_hits"] == 1 and stats["misses"] == 1
+    assert restarted_stats["disk_hits"] == 1 and restarted_stats["hit_rate"] == 1.0
+
+
+def test_llm_cache_expiry_and_disk_bound(tmp_path, monkeypatch):
+    """Test de l'expiration des réponses et de la limite de taille du stockage disque."""
+    monkeypatch.setattr(llm_cache, "PURGE_EVERY", 1)
+    cache = LLMResponseCache(str(tmp_path / "llm_cache.db"), memory_size=2, max_entries=3, ttl=60)
+    keys = [llm_cache_key("analyze_blueprint", "model", "v1", f"blueprint {i}") for i in range(5)]
+    for i, key in enumerate(keys):
+        cache.set(key, {"index": i})
+    assert cache.disk_size() == 3
+    assert cache.get(keys[0]) is None and cache.get(keys[4]) == {"index": 4}
+    assert llm_cache_key("analyze_blueprint", "model", "v2", "blueprint 4") != keys[4]
+
+    monkeypatch.setattr(llm_cache.time, "time", lambda: 1e12)
+    cache._memory.clear()
+    assert cache.get(keys[4]) is None
+    assert client.get("/cache/llm/stats").status_code == 200
+
+
+def test_llm_cache_disk_access_runs_off_the_event_loop(tmp_path):
+    """Test que get_or_compute lit et écrit le stockage SQLite hors du thread de la boucle asyncio."""
+    threads = []
+
+    class TracingCache(LLMResponseCache):
+        def _load(self, key):
+            threads.append(threading.get_ident())
+            return super()._load(key)
+
+        def _store(self, key, encoded):
+            threads.append(threading.get_ident())
+            super()._store(key, encoded)
+
+    cache = TracingCache(str(tmp_path / "llm_cache.db"))
+
+    async def compute():
+        return {"ok": True}
+
+    async def scenario():
+        first = await cache.get_or_compute("key", compute)
+        # Réponse en mémoire : aucun accès au disque
+        second = await cache.get_or_compute("key", compute)
+        return first, second
+
+    assert asyncio.run(scenario()) == ({"ok": True}, {"ok": True})
+    assert len(threads) == 2 and threading.get_ident() not in threads
+
+
+def test_execute_blueprint_streams_progress_events():
+    """Test du stream NDJSON et SSE de la progression de l'exécution d'un blueprint."""
+    request = {"blueprint": "Une app de todo", "target_repo": "org/todo"}
+    with client.stream("POST", "/autopilot/execute-blueprint?stream=ndjson", json=request) as response:
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        events = [json.loads(line) for line in response.iter_lines() if line]
+
+    stages = [(e["stage"], e["status"]) for e in events if e["event"] == "stage"]
+    assert stages.index(("analysis", "completed")) < stages.index(("structure", "started"))
+    assert stages.index(("repository", "completed")) < stages.index(("push", "started"))
+    assert stages.index(("codebase", "completed")) < stages.index(("push", "completed"))
+    assert ("ci", "completed") in stages
+    files = [e["path"] for e in events if e["event"] == "file"]
+    assert sorted(files) == ["README.md", "main.py", "requirements.txt"]
+    assert all("elapsed" in e for e in events)
+    assert all("duration" in e for e in events if e.get("status") == "completed")
+    assert events[-1]["event"] == "result"
+    assert events[-1]["data"]["repository"] == "https://github.com/user/todo"
+
+    response = client.post("/autopilot/execute-blueprint", json=request, headers={"Accept": "text/event-stream"})
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text.startswith("id: 1\nevent: run\n")
+    assert "event: result" in response.text
+
+
+def test_execute_blueprint_stream_reports_failed_stage(monkeypatch):
+    """Test de l'événement d'erreur émis lorsqu'une étape échoue."""
+    async def failing_push(self, repo_url, codebase):
+        raise RuntimeError("dépôt inaccessible")
+
+    monkeypatch.setattr(GitAutomation, "push_files", failing_push)
+    request = {"blueprint": "Une app de todo", "target_repo": "org/todo"}
+    response = client.post("/autopilot/execute-blueprint?stream=ndjson", json=request)
+    last = json.loads(response.text.splitlines()[-1])
+    assert last["event"] == "error" and last["stage"] == "push"
+    assert "dépôt inaccessible" in last["detail"]
+    assert client.post("/autopilot/execute-blueprint", json=request).status_code == 500
+
+
+def test_run_blueprint_overlaps_independent_stages():
+    """Test du recouvrement de la création du dépôt et des pipelines CI avec la génération."""
+    class SlowGit(GitAutomation):
+        async def create_repository(self, target_repo, auto_deploy=False):
+            await asyncio.sleep(0.1)
+            return await super().create_repository(target_repo, auto_deploy)
+
+    class SlowCI(CIPipelineBuilder):
+        async def prepare_templates(self, stack=None):
+            await asyncio.sleep(0.1)
+            return await super().prepare_templates(stack)
+
+    class SlowAnalysisRouter(SlowFileRouter):
+        async def _analyze_blueprint(self, blueprint):
+            await asyncio.sleep(0.1)
+            return await super()._analyze_blueprint(blueprint)
+
+    router = SlowAnalysisRouter({"main.py": 0.05, "requirements.txt": 0.05, "README.md": 0.05},
+                                cache=LLMResponseCache(None))
+    request = BlueprintRequest(blueprint="Une app de todo", target_repo="org/todo")
+
+    async def scenario():
+        started = asyncio.get_running_loop().time()
+        events = [e async for e in run_blueprint(request, router, SlowGit(), SlowCI())]
+        return events, asyncio.get_running_loop().time() - started
+
+    events, elapsed = asyncio.run(scenario())
+    assert events[-1]["event"] == "result"
+    # Analyse, dépôt et templates CI (0,1 s chacun) s'exécutent en parallèle,
+    # puis la génération (0,05 s) : le total reste bien en deçà de la somme (0,35 s)
+    assert elapsed < 0.25
+
+
+def test_run_blueprint_regenerates_and_pushes_only_changed_files():
+    """Test de la régénération incrémentale : seuls les fichiers modifiés sont générés et poussés."""
+    structure = {
+        "files": ["main.py", "README.md", "api.py"],
+        "context": {"tech_stack": ["fastapi"]},
+        "specs": {"main.py": "Point d'entrée", "README.md": "Présentation", "api.py": "Routes"},
+    }
+
+    class EditableRouter(SmartLLMRouter):
+        generated = []
+
+        async def _generate_structure(self, analysis):
+            return {**structure, "specs": dict(structure["specs"])}
+
+        async def generate_file(self, path, project_structure, tier):
+            self.generated.append(path)
+            return f"{path}: {project_structure['specs'][path]}"
+
+    class RecordingGit(GitAutomation):
+        pushed = []
+
+        async def push_files(self, repo_url, codebase):
+            self.pushed = [change async for change in codebase]
+            return len(self.pushed)
+
+    router, git, manifests = EditableRouter(), RecordingGit(), ManifestStore()
+    request = BlueprintRequest(blueprint="Une API", target_repo="org/incremental", autopilot=False)
+
+    async def run():
+        router.generated = []
+        return [e async for e in run_blueprint(request, router, git, CIPipelineBuilder(), manifests)]
+
+    asyncio.run(run())
+    assert sorted(router.generated) == ["README.md", "api.py", "main.py"] and len(git.pushed) == 3
+
+    # Ré-exécution sans modification : rien n'est régénéré ni poussé
+    asyncio.run(run())
+    assert router.generated == [] and git.pushed == []
+
+    # Un fichier modifié, un ajouté, un retiré
+    structure["specs"]["api.py"] = "Routes et authentification"
+    structure["specs"]["auth.py"] = "Jetons JWT"
+    structure["files"] = ["main.py", "api.py", "auth.py"]
+    events = asyncio.run(run())
+    assert sorted(router.generated) == ["api.py", "auth.py"]
+    assert sorted(git.pushed, key=lambda change: change[0]) == [
+        ("README.md", None), ("api.py", "api.py: Routes et authentification"), ("auth.py", "auth.py: Jetons JWT"),
+    ]
+    assert all(e["changed"] for e in events if e["event"] == "file")
+
+
+def test_resume_run_restores_completed_stages(monkeypatch):
+    """Test de la reprise d'une exécution après l'échec du push, sans nouvel appel aux modèles."""
+    calls = {"analyze": 0, "file": 0}
+    analyze, generate_file = SmartLLMRouter.analyze_blueprint, SmartLLMRouter.generate_file
+
+    async def counting_analyze(self, blueprint):
+        calls["analyze"] += 1
+        return await analyze(self, blueprint)
+
+    async def counting_generate_file(self, path, project_structure, tier):
+        calls["file"] += 1
+        return await generate_file(self, path, project_structure, tier)
+
+    async def failing_push(self, repo_url, codebase):
+        # Le push échoue une fois le code généré
+        [change async for change in codebase]
+        raise RuntimeError("dépôt inaccessible")
+
+    pushed = []
+
+    async def recording_push(self, repo_url, codebase):
+        pushed.extend([change async for change in codebase])
+        return len(pushed)
+
+    monkeypatch.setattr(SmartLLMRouter, "analyze_blueprint", counting_analyze)
+    monkeypatch.setattr(SmartLLMRouter, "generate_file", counting_generate_file)
+    monkeypatch.setattr(GitAutomation, "push_files", failing_push)
+    request = {"blueprint": "Une app reprise", "target_repo": "org/resume"}
+    response = client.post("/autopilot/execute-blueprint", json=request)
+    assert response.status_code == 500
+    run_id = response.headers["X-Run-ID"]
+    assert calls == {"analyze": 1, "file": 3}
+    run = client.get(f"/autopilot/runs/{run_id}").json()
+    assert "push" not in run["completed_stages"] and "codebase" in run["completed_stages"]
+    assert run["request"]["target_repo"] == "org/resume"
+
+    monkeypatch.setattr(GitAutomation, "push_files", recording_push)
+    response = client.post(f"/autopilot/runs/{run_id}/resume?stream=ndjson")
+    events = [json.loads(line) for line in response.text.splitlines()]
+    restored = {e["stage"] for e in events if e["event"] == "stage" and e["status"] == "restored"}
+    assert {"analysis", "structure", "codebase", "repository"} <= restored
+    assert events[-1]["event"] == "result" and events[-1]["data"]["run_id"] == run_id
+    assert calls == {"analyze": 1, "file": 3}
+    assert sorted(path for path, _ in pushed) == ["README.md", "main.py", "requirements.txt"]
+    assert client.post("/autopilot/runs/run_inconnu/resume").status_code == 404
@@ -0,0 +1,20 @@
+from app.core.codebase_manifest import CodebaseManifest, content_hash, create_manifest_store
+
+
+def test_manifest_tracks_inputs_outputs_and_persists(tmp_path):
+    """Test du manifeste : fichiers à jour, contenus modifiés, fichiers retirés et persistance SQLite."""
+    manifest = CodebaseManifest()
+    assert manifest.record("main.py", "inputs-1", "print(1)")
+    assert manifest.is_current("main.py", "inputs-1") and not manifest.is_current("main.py", "inputs-2")
+    # Entrées modifiées mais contenu identique : rien à pousser
+    assert not manifest.record("main.py", "inputs-2", "print(1)")
+    assert manifest.record("main.py", "inputs-3", "print(2)")
+    manifest.record("old.py", "inputs", "")
+    assert manifest.prune(["main.py"]) == ["old.py"]
+
+    store = create_manifest_store(f"sqlite:///{tmp_path / 'manifests.db'}")
+    store.save("org/app", manifest)
+    store.close()
+    reloaded = create_manifest_store(f"sqlite:///{tmp_path / 'manifests.db'}").get("org/app")
+    assert reloaded.to_dict() == {"main.py": {"inputs": "inputs-3", "output": content_hash("print(2)")}}
+    assert create_manifest_store("memory://").get("org/app").to_dict() == {}
@@ -73,12 +73,12 @@ def test_end_to_end_pipeline_deployment():
             json=pipeline_config,
             timeout=30
         )
-        assert response.status_code == 200, f"Pipeline deployment failed with status code {response.status_code}"
+        assert response.status_code == 202, f"Pipeline deployment failed with status code {response.status_code}"
         
         json_response = response.json()
         assert "pipeline_id" in json_response, "Missing 'pipeline_id' in deployment response"
         assert "status" in json_response, "Missing 'status' in deployment response"
-        assert json_response["status"] == "initiated", f"Pipeline deployment status is not 'initiated': {json_response['status']}"
+        assert json_response["status"] == "queued", f"Pipeline deployment status is not 'queued': {json_response['status']}"
         
         pipeline_id = json_response["pipeline_id"]
         print(f"   Pipeline déployé avec ID: {pipeline_id}")
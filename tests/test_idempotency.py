@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.core.idempotency import IdempotencyConflict, IdempotencyStore, SingleFlight
+from app.models.pipeline import PipelineConfig
+
+client = TestClient(main.app)
+
+
+def _config(name="Idempotent Pipeline"):
+    return {
+        "name": name,
+        "nodes": [{"id": "node1", "type": "data_source"}],
+        "compute_requirements": {"cpu": 1},
+        "deployment_target": "k3s-local",
+    }
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    """Test du regroupement des appels concurrents portant sur une même clé."""
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def scenario():
+        flights = SingleFlight()
+        results = await asyncio.gather(*(flights.do("key", work) for _ in range(5)))
+        return flights, results
+
+    flights, results = asyncio.run(scenario())
+    assert results == ["result"] * 5
+    assert len(calls) == 1
+    assert flights.coalesced == 4
+    assert flights.in_flight() == 0
+
+
+def test_idempotency_store_replays_and_detects_conflicts():
+    """Test du rejeu d'une réponse et du rejet d'une clé réutilisée."""
+    async def scenario():
+        store = IdempotencyStore()
+        first = await store.run("key", "fp1", lambda: asyncio.sleep(0, result="response"))
+        replay = await store.run("key", "fp1", lambda: asyncio.sleep(0, result="other"))
+        with pytest.raises(IdempotencyConflict):
+            await store.run("key", "fp2", lambda: asyncio.sleep(0, result="other"))
+        return first, replay
+
+    assert asyncio.run(scenario()) == (("response", False), ("response", True))
+
+
+def test_deploy_pipeline_idempotency_key():
+    """Test du rejeu d'un déploiement avec la même clé d'idempotence."""
+    headers = {"Idempotency-Key": "deploy-key-1"}
+    first = client.post("/pipelines/deploy", json=_config(), headers=headers)
+    replay = client.post("/pipelines/deploy", json=_config(), headers=headers)
+    assert first.status_code == replay.status_code == 202
+    assert replay.json()["pipeline_id"] == first.json()["pipeline_id"]
+    assert replay.headers["Idempotent-Replayed"] == "true"
+
+    conflict = client.post("/pipelines/deploy", json=_config("Other Pipeline"), headers=headers)
+    assert conflict.status_code == 422
+
+
+def test_identical_deployments_share_pipeline_id():
+    """Test du regroupement des déploiements identiques soumis en rafale."""
+    config = PipelineConfig(**_config("Burst Pipeline"))
+
+    async def scenario():
+        first = await main.enqueue_deployment(config, "hcl")
+        second = await main.enqueue_deployment(config, "hcl")
+        other = await main.enqueue_deployment(config, "json")
+        await main.deployment_queue._queue.join()
+        third = await main.enqueue_deployment(config, "hcl")
+        await main.deployment_queue._queue.join()
+        await main.deployment_queue.stop()
+        return first, second, other, third
+
+    first, second, other, third = asyncio.run(scenario())
+    assert second.pipeline_id == first.pipeline_id
+    assert other.pipeline_id != first.pipeline_id
+    # Une fois le déploiement traité, une nouvelle soumission crée un nouveau déploiement
+    assert third.pipeline_id != first.pipeline_id
+    assert main.status_store.get(first.pipeline_id)["status"] == "initiated"
@@ -0,0 +1,113 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.jobs import JobQueue, JobQueueFull
+
+
+def test_job_queue_processes_jobs():
+    """Test du traitement des jobs par le pool de workers."""
+    processed = []
+
+    async def handler(job_id, payload):
+        await asyncio.sleep(0.01)
+        processed.append((job_id, payload))
+
+    async def scenario():
+        queue = JobQueue(handler, maxsize=10, workers=3)
+        for i in range(6):
+            await queue.submit(f"job_{i}", i)
+        await queue._queue.join()
+        metrics = queue.metrics()
+        await queue.stop()
+        return metrics
+
+    metrics = asyncio.run(scenario())
+    assert sorted(processed) == [(f"job_{i}", i) for i in range(6)]
+    assert metrics["completed"] == 6
+    assert metrics["depth"] == 0
+    assert metrics["wait_time_max"] >= metrics["wait_time_p50"] >= 0
+
+
+def test_job_queue_backpressure():
+    """Test du rejet des jobs lorsque la file est pleine."""
+    async def scenario():
+        gate = asyncio.Event()
+
+        async def handler(job_id, payload):
+            await gate.wait()
+
+        queue = JobQueue(handler, maxsize=2, workers=1)
+        await queue.submit("job_0", None)
+        await asyncio.sleep(0)  # Le worker prend le premier job
+        await queue.submit("job_1", None)
+        await queue.submit("job_2", None)
+        with pytest.raises(JobQueueFull) as exc_info:
+            await queue.submit("job_3", None)
+        gate.set()
+        await queue._queue.join()
+        metrics = queue.metrics()
+        await queue.stop()
+        return exc_info.value, metrics
+
+    error, metrics = asyncio.run(scenario())
+    assert error.retry_after >= 1
+    assert metrics["rejected"] == 1
+    assert metrics["completed"] == 3
+
+
+def test_job_queue_stop_reports_abandoned_jobs():
+    """Test du signalement des jobs en cours et en attente abandonnés à l'arrêt de la file."""
+    abandoned = []
+
+    async def scenario():
+        async def handler(job_id, payload):
+            await asyncio.Event().wait()
+
+        queue = JobQueue(handler, maxsize=10, workers=1, on_abandon=lambda job_id, payload: abandoned.append(job_id))
+        for i in range(3):
+            await queue.submit(f"job_{i}", i)
+        await asyncio.sleep(0)  # Le worker prend le premier job
+        await queue.stop()
+        return queue.metrics()
+
+    metrics = asyncio.run(scenario())
+    assert abandoned == ["job_0", "job_1", "job_2"]
+    assert metrics["abandoned"] == 3 and metrics["depth"] == 0
+
+
+def test_deploy_pipeline_is_processed_in_background(client):
+    """Test du traitement en arrière-plan d'un déploiement mis en file d'attente."""
+    config = {
+        "name": "Queued Pipeline",
+        "nodes": [],
+        "compute_requirements": {},
+        "deployment_target": "runpod",
+    }
+    response = client.post("/pipelines/deploy", json=config)
+    assert response.status_code == 202
+    pipeline_id = response.json()["pipeline_id"]
+
+    deadline = time.time() + 5
+    status = None
+    while time.time() < deadline:
+        status = client.get(f"/pipelines/{pipeline_id}/status").json()["status"]
+        if status != "queued":
+            break
+        time.sleep(0.01)
+    assert status == "initiated"
+    assert client.get("/jobs/metrics").json()["completed"] >= 1
+
+
+def test_abandoned_deployment_is_marked_failed():
+    """Test du marquage en échec d'un déploiement abandonné à l'arrêt, et de la libération de son empreinte."""
+    from app import main
+    from app.models.pipeline import PipelineConfig
+
+    config = PipelineConfig(name="Abandoned Pipeline", nodes=[], compute_requirements={}, deployment_target="runpod")
+    fingerprint = main.deployment_fingerprint(config, "hcl")
+    main.inflight_deployments[fingerprint] = "pipeline_abandoned"
+    main.abandon_deployment_job("pipeline_abandoned", (config, "hcl"))
+    assert fingerprint not in main.inflight_deployments
+    assert main.status_store.get("pipeline_abandoned")["status"] == "failed"
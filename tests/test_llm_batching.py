@@ -0,0 +1,71 @@
+import asyncio
+
+from app.core.llm_batching import MicroBatcher
+from app.core.model_routing import ModelSelector
+from app.routers.autopilot_engine import SmartLLMRouter
+from benchmarks.llm_batching import simulate
+
+
+def test_micro_batcher_groups_concurrent_calls():
+    """Test du regroupement des appels concurrents et de la remise de chaque résultat à son appelant."""
+    batcher = MicroBatcher(window=0.01, max_batch_size=3)
+    batches = []
+
+    async def call(items):
+        batches.append(list(items))
+        return [ValueError(item) if item == "bad" else item.upper() for item in items]
+
+    async def scenario():
+        same_model = [batcher.submit("model-a", item, call) for item in ("a", "b", "c", "d", "bad")]
+        other_model = batcher.submit("model-b", "x", call)
+        return await asyncio.gather(*same_model, other_model, return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert results[:4] == ["A", "B", "C", "D"] and results[5] == "X"
+    assert isinstance(results[4], ValueError)
+    # Le premier lot est envoyé dès qu'il est plein, le reste à l'expiration de la fenêtre
+    assert sorted(batches) == [["a", "b", "c"], ["d", "bad"], ["x"]]
+    assert batcher.stats() == {"batches": 3, "batched_items": 6, "mean_batch_size": 2.0}
+
+
+def test_batching_reduces_billed_calls():
+    """Test de la réduction du nombre d'appels facturés et du gain de débit avec un fournisseur factice."""
+    unbatched = asyncio.run(simulate(None, requests=64, concurrency=16, call_latency=0.01, item_latency=0.0005))
+    batched = asyncio.run(simulate(
+        MicroBatcher(window=0.005, max_batch_size=16), requests=64, concurrency=16,
+        call_latency=0.01, item_latency=0.0005,
+    ))
+    assert unbatched["calls"] == 64
+    assert batched["calls"] <= 16 and batched["cost"] < unbatched["cost"]
+    assert batched["throughput_rps"] > unbatched["throughput_rps"]
+
+
+def test_batched_call_takes_a_single_scheduler_slot():
+    """Test qu'un lot occupe une seule place du niveau : les lots ne sont pas bornés par la limite du niveau."""
+    sizes = []
+
+    class Provider:
+        async def complete_batch(self, model, prompts):
+            sizes.append(len(prompts))
+            await asyncio.sleep(0.01)
+            return [("", 10) for _ in prompts]
+
+        async def probe(self, model):
+            return True
+
+    router = SmartLLMRouter(
+        providers={"ollama": Provider()},
+        selector=ModelSelector(probe_interval=3600),
+        batcher=MicroBatcher(window=0.005, max_batch_size=16),
+    )
+
+    async def scenario():
+        try:
+            await asyncio.gather(*(router._analyze_blueprint(f"Blueprint {index}") for index in range(8)))
+        finally:
+            await router.selector.stop()
+
+    asyncio.run(scenario())
+    assert router.scheduler.limit("architecture") == 2
+    assert sizes == [8]
+    assert router.scheduler.admitted["architecture"] == 9 and router.scheduler.active["architecture"] == 0
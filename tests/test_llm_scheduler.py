@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.llm_scheduler import BudgetExceeded, TierScheduler
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_scheduler_serves_priorities_then_least_served_tenant():
+    """Test de l'ordre de service d'une file saturée : priorité, puis équité entre locataires, puis ancienneté."""
+    scheduler = TierScheduler({"architecture": 1})
+    order = []
+
+    async def task(tenant, priority=0):
+        async with scheduler.slot("architecture", tenant, priority):
+            order.append(tenant)
+            await asyncio.sleep(0)
+
+    async def scenario():
+        holder = await scheduler.acquire("architecture", "flood")
+        tasks = [asyncio.ensure_future(task("flood")) for _ in range(3)]
+        tasks += [asyncio.ensure_future(task("small")), asyncio.ensure_future(task("urgent", priority=5))]
+        await asyncio.sleep(0.01)
+        assert scheduler.queued("architecture") == 5 and scheduler.utilization()["architecture"] == 1.0
+        scheduler.release(holder)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+    assert order == ["urgent", "small", "flood", "flood", "flood"]
+    assert scheduler.admitted["architecture"] == 6 and scheduler.wait_seconds["architecture"] > 0
+
+
+def test_scheduler_downgrades_saturated_or_over_budget_tasks():
+    """Test du déclassement vers un niveau plus léger (niveau saturé ou budget) et du refus hors budget."""
+    now = [0.0]
+    scheduler = TierScheduler(
+        {"complex_reasoning": 1, "architecture": 2},
+        downgrade={"complex_reasoning": "architecture"},
+        tier_costs={"complex_reasoning": 10.0, "architecture": 1.0},
+        budget=15.0,
+        budget_period=60,
+        clock=lambda: now[0],
+    )
+
+    async def scenario():
+        first = await scheduler.acquire("complex_reasoning", tokens=1000)
+        # Niveau saturé : la tâche qui l'accepte s'exécute sur le niveau plus léger
+        second = await scheduler.acquire("complex_reasoning", allow_downgrade=True)
+        assert first.tier == "complex_reasoning" and second.tier == "architecture" and second.downgraded
+        scheduler.release(first)
+        scheduler.release(second)
+        # Budget : 10 + 10 dépasserait 15, la tâche est déclassée ou refusée
+        third = await scheduler.acquire("complex_reasoning", allow_downgrade=True, tokens=1000)
+        assert third.tier == "architecture" and scheduler.budget_spent == 11.0
+        scheduler.release(third)
+        with pytest.raises(BudgetExceeded):
+            await scheduler.acquire("complex_reasoning", tokens=1000)
+        # Nouvelle période : le budget est rétabli
+        now[0] = 61
+        fourth = await scheduler.acquire("complex_reasoning", tokens=1000)
+        assert fourth.tier == "complex_reasoning"
+
+    asyncio.run(scenario())
+    assert scheduler.downgrades == 2 and scheduler.budget_rejected == 1
+
+
+def test_scheduler_reserves_budget_for_queued_tasks():
+    """Test que les tâches en attente réservent leur coût : ensemble, elles ne dépassent pas le budget."""
+    scheduler = TierScheduler({"architecture": 1}, tier_costs={"architecture": 1.0}, budget=1.0)
+
+    async def task():
+        async with scheduler.slot("architecture", tokens=300):
+            await asyncio.sleep(0.001)
+
+    async def scenario():
+        # Une tâche annulée en attente rend sa réservation
+        holder = await scheduler.acquire("architecture")
+        waiting = asyncio.ensure_future(scheduler.acquire("architecture", tokens=300))
+        await asyncio.sleep(0)
+        assert scheduler.budget_reserved == pytest.approx(0.3)
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        assert scheduler.budget_reserved == 0
+        scheduler.release(holder)
+        return await asyncio.gather(*(task() for _ in range(10)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert sum(result is None for result in results) == 3
+    assert sum(isinstance(result, BudgetExceeded) for result in results) == 7
+    assert scheduler.budget_spent == pytest.approx(0.9) and scheduler.budget_reserved == pytest.approx(0.0)
+
+
+def test_run_task_endpoint_and_scheduler_metrics():
+    """Test de l'endpoint d'exécution d'une tâche, de l'état de l'ordonnanceur et des métriques exportées."""
+    response = client.post(
+        "/autopilot/run-task",
+        json={"prompt": "Refactoriser le module", "complexity": "high"},
+        headers={"X-Tenant-ID": "acme", "X-Priority": "2"},
+    )
+    assert response.status_code == 200
+    assert response.json()["requested_tier"] == "code_heavy"
+
+    snapshot = client.get("/autopilot/scheduler").json()
+    assert snapshot["tiers"]["code_heavy"]["admitted"] >= 1
+    metrics = client.get("/metrics").text
+    assert 'llm_scheduler_tier_utilization{tier="code_heavy"}' in metrics
+    assert "llm_budget_spent_total" in metrics
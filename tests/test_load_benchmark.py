@@ -0,0 +1,28 @@
+import asyncio
+
+import pytest
+
+from app.main import app
+from benchmarks.load import compare_to_baseline, parse_mix, run_load
+
+
+def test_run_load_reports_latency_percentiles():
+    """Test du test de charge en processus : débit et percentiles de latence par scénario."""
+    results = asyncio.run(run_load(app, {"deploy": 1, "status": 3, "autopilot": 1}, requests=40, concurrency=8))
+    overall = results["overall"]
+    assert overall["requests"] == 40 and overall["errors"] == 0
+    assert 0 < overall["p50_ms"] <= overall["p95_ms"] <= overall["p99_ms"] <= overall["max_ms"]
+    assert set(results["scenarios"]) == {"deploy", "status", "autopilot"}
+    assert sum(stats["requests"] for stats in results["scenarios"].values()) == 40
+
+
+def test_compare_to_baseline_flags_regressions():
+    """Test de la détection des régressions de latence et de débit par rapport à une référence."""
+    baseline = {"overall": {"errors": 0, "p95_ms": 10.0, "p99_ms": 20.0, "throughput_rps": 1000.0}, "scenarios": {}}
+    same = {"overall": {"errors": 0, "p95_ms": 11.0, "p99_ms": 21.0, "throughput_rps": 900.0}, "scenarios": {}}
+    assert compare_to_baseline(same, baseline, tolerance=0.2) == []
+    slower = {"overall": {"errors": 1, "p95_ms": 15.0, "p99_ms": 21.0, "throughput_rps": 500.0}, "scenarios": {}}
+    regressions = compare_to_baseline(slower, baseline, tolerance=0.2)
+    assert [r.split(":")[0] for r in regressions] == ["overall.errors", "overall.p95_ms", "overall.throughput_rps"]
+    with pytest.raises(ValueError):
+        parse_mix("deploy=1,unknown=2")
@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.core.load_shedding import LoadMonitor, LoadSheddingMiddleware
+
+client = TestClient(main.app)
+
+
+def test_monitor_snapshot_thresholds():
+    """Test de la détection de surcharge à partir des relevés CPU et load average."""
+    samples = {"cpu": 10.0, "load": 0.5}
+    monitor = LoadMonitor(
+        cpu_threshold=80.0,
+        load_avg_threshold=4.0,
+        cpu_sampler=lambda: samples["cpu"],
+        load_sampler=lambda: samples["load"],
+    )
+    monitor.refresh()
+    assert not monitor.overloaded
+    samples["cpu"] = 95.0
+    monitor.refresh()
+    assert monitor.overloaded
+    samples.update(cpu=10.0, load=4.5)
+    monitor.refresh()
+    assert monitor.snapshot()["overloaded"] is True
+
+
+def test_overloaded_gateway_sheds_expensive_routes(monkeypatch):
+    """Test du refus des routes coûteuses sous surcharge, sans impact sur la santé et les statuts."""
+    monkeypatch.setattr(main.load_monitor, "cpu_percent", 100.0)
+    rejected = main.load_monitor.rejected
+
+    response = client.post("/autopilot/analyze-blueprint", json={"blueprint": "x"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(main.settings.LOAD_SHEDDING_RETRY_AFTER_SECONDS)
+    assert client.post("/pipelines/deploy", json={}).status_code == 503
+    assert main.load_monitor.rejected == rejected + 2
+
+    started = time.perf_counter()
+    assert client.get("/health").status_code == 200
+    assert client.get("/pipelines/pipeline_unknown/status").status_code == 404
+    assert time.perf_counter() - started < 1.0
+
+
+def test_queued_request_admitted_when_load_drops():
+    """Test de l'admission d'une requête mise en attente lorsque la charge retombe."""
+    samples = {"cpu": 100.0}
+    monitor = LoadMonitor(
+        cpu_threshold=90.0,
+        interval=0.01,
+        cpu_sampler=lambda: samples["cpu"],
+        load_sampler=lambda: 0.0,
+    )
+    inner = FastAPI()
+
+    @inner.post("/pipelines/deploy")
+    async def deploy():
+        return {"ok": True}
+
+    shed = LoadSheddingMiddleware(inner, monitor, queue_timeout=2.0)
+
+    async def scenario():
+        await monitor.start()
+        try:
+            transport = httpx.ASGITransport(app=shed)
+            async with httpx.AsyncClient(transport=transport, base_url="http://gateway") as http:
+                pending = asyncio.ensure_future(http.post("/pipelines/deploy"))
+                await asyncio.sleep(0.05)
+                assert monitor.queued == 1
+                samples["cpu"] = 10.0
+                return await pending
+        finally:
+            await monitor.stop()
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 200
+    assert monitor.admitted_after_wait == 1 and monitor.rejected == 0
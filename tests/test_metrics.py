@@ -0,0 +1,67 @@
+import time
+
+from fastapi.testclient import TestClient
+
+from app.core.metrics import MetricsRegistry
+from app.main import app
+from app.routers.autopilot_engine import get_llm_router
+
+client = TestClient(app)
+
+
+def test_registry_renders_prometheus_histogram():
+    """Test du format d'exposition des compteurs et de l'histogramme de latence."""
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    registry.observe("GET", "/health", 200, 0.05)
+    registry.observe("GET", "/health", 200, 0.5)
+    registry.observe("POST", "/pipelines/deploy", 500, 2.0)
+    registry.register_callback("queue_depth", "Queue depth.", lambda: 3)
+
+    output = registry.render()
+    assert 'http_requests_total{method="GET",route="/health",status="200"} 2' in output
+    assert 'http_request_errors_total{method="POST",route="/pipelines/deploy"} 1' in output
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/health",le="0.1"} 1' in output
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/health",le="1.0"} 2' in output
+    assert 'http_request_duration_seconds_bucket{method="POST",route="/pipelines/deploy",le="+Inf"} 1' in output
+    assert 'http_request_duration_seconds_count{method="GET",route="/health"} 2' in output
+    assert "# TYPE queue_depth gauge\nqueue_depth 3.0" in output
+
+
+def test_metrics_endpoint_uses_route_templates():
+    """Test de l'endpoint /metrics et du libellé de route."""
+    client.get("/health")
+    client.get("/pipelines/unknown_pipeline/status")
+    client.post("/autopilot/analyze-blueprint", params={"blueprint": "test"})
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'route="/health",status="200"' in response.text
+    assert 'route="/pipelines/{pipeline_id}/status",status="404"' in response.text
+    assert 'route="/autopilot/analyze-blueprint",status="200"' in response.text
+    assert 'route="/metrics"' not in response.text
+    assert "deployment_queue_depth" in response.text
+
+
+def test_metrics_scrape_does_not_build_llm_router():
+    """Test que la collecte des métriques LLM ne crée pas le routeur de l'Autopilot Engine."""
+    if get_llm_router.cache_info().currsize:
+        get_llm_router().cache.close()
+        get_llm_router.cache_clear()
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert get_llm_router.cache_info().currsize == 0
+    assert "llm_cache_misses_total 0.0" in response.text
+    assert "llm_hedged_requests_total 0.0" in response.text
+
+
+def test_registry_observe_overhead():
+    """Test que l'enregistrement d'une requête reste de l'ordre de la microseconde."""
+    registry = MetricsRegistry()
+    iterations = 20000
+    start = time.perf_counter()
+    for i in range(iterations):
+        registry.observe("GET", "/pipelines/{pipeline_id}/status", 200, 0.001)
+    per_call = (time.perf_counter() - start) / iterations
+    assert per_call < 20e-6
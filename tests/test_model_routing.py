@@ -0,0 +1,157 @@
+import asyncio
+
+import pytest
+
+from app.core.model_routing import HedgePolicy, NoBackendAvailable
+from app.routers.autopilot_engine import SmartLLMRouter
+from benchmarks import hedging
+from benchmarks.model_routing import DEFAULT_TIER_MIX, simulate
+
+
+def test_get_best_available_without_measurements_keeps_static_order():
+    """Test du choix par défaut, sans mesure : Ollama, puis vLLM, puis le modèle de repli."""
+    router = SmartLLMRouter()
+    assert router.get_best_available("qwen3:4b", {"ollama": True, "vllm": True}) == "qwen3:4b"
+    assert router.get_best_available("qwen3:4b", {"ollama": False, "vllm": True}) == "qwen3:4b-vllm"
+    assert router.get_best_available("qwen3-coder:30b-a3b", {}) == "gpt-3.5-turbo"
+
+
+def test_select_backend_prefers_fastest_healthy_candidate():
+    """Test du choix du backend le plus rapide parmi les candidats sains et de qualité suffisante."""
+    router = SmartLLMRouter()
+    backends = router.selector.backends
+    backends[("ollama", "qwen3:4b")].record(2.0, tokens=100)
+    backends[("vllm", "qwen3:4b")].record(0.5, tokens=100)
+    assert router.get_best_available("qwen3:4b", {"ollama": True, "vllm": True}) == "qwen3:4b-vllm"
+
+    # Les appels en cours allongent le temps de réponse estimé
+    backends[("vllm", "qwen3:4b")].in_flight = 10
+    backends[("ollama", "llama3.2:3b")].record(0.8, tokens=100)
+    assert router.select_backend("lightweight").model == "llama3.2:3b"
+
+    # Un backend en échec répété (circuit ouvert) ou déclaré malade est écarté
+    for _ in range(3):
+        backends[("ollama", "llama3.2:3b")].record(0.1, error=True)
+    backends[("ollama", "qwen3:4b")].healthy = False
+    chosen = router.select_backend("lightweight")
+    assert (chosen.provider, chosen.model) != ("ollama", "llama3.2:3b")
+    assert chosen.available
+
+    # Le modèle de repli n'atteint pas le plancher de qualité des niveaux exigeants
+    for model in router.MODELS["complex_reasoning"]:
+        for provider in router.PROVIDERS:
+            backends[(provider, model)].healthy = False
+    with pytest.raises(NoBackendAvailable):
+        router.select_backend("complex_reasoning")
+
+
+def test_probes_mark_backends_unhealthy_and_recovered():
+    """Test des sondes de santé : un backend qui ne répond plus est écarté puis réintégré."""
+    down = {"vllm"}
+
+    class Provider:
+        def __init__(self, name):
+            self.name = name
+
+        async def complete(self, model, prompt):
+            return "", 1
+
+        async def probe(self, model):
+            return self.name not in down
+
+    router = SmartLLMRouter(providers={name: Provider(name) for name in ("ollama", "vllm", "openai")})
+
+    async def scenario():
+        await router.selector.start(router._probe)
+        await router.selector.probe_once()
+        unhealthy = [backend.provider for backend in router.selector.backends.values() if not backend.healthy]
+        down.clear()
+        await router.selector.probe_once()
+        await router.selector.stop()
+        return unhealthy
+
+    unhealthy = asyncio.run(scenario())
+    assert unhealthy and set(unhealthy) == {"vllm"}
+    assert all(backend.healthy for backend in router.selector.backends.values())
+
+
+def test_simulation_latency_policy_beats_static_selection():
+    """Test de la simulation : la sélection selon la latence réduit la latence p95 face à la sélection statique."""
+    static = asyncio.run(simulate("static", 160, 16, DEFAULT_TIER_MIX))
+    latency = asyncio.run(simulate("latency", 160, 16, DEFAULT_TIER_MIX))
+    assert latency["p95_ms"] < static["p95_ms"]
+    assert latency["throughput_rps"] > static["throughput_rps"]
+    assert len(latency["backends"]) > len(static["backends"])
+
+
+def test_hedged_call_takes_first_answer_within_load_cap():
+    """Test de la couverture : appel doublé après le p95, première réponse retenue, perdant annulé, charge bornée."""
+    cancelled = []
+
+    class Provider:
+        def __init__(self, latency):
+            self.latency = latency
+
+        async def complete(self, model, prompt):
+            try:
+                await asyncio.sleep(self.latency)
+            except asyncio.CancelledError:
+                cancelled.append(self.latency)
+                raise
+            return f"réponse en {self.latency}", 1
+
+        async def probe(self, model):
+            return True
+
+    hedge = HedgePolicy(percentile=0.95, max_ratio=1.0, min_samples=5)
+    router = SmartLLMRouter(providers={"ollama": Provider(0.5), "vllm": Provider(0.01)}, hedge=hedge)
+    primary = router.selector.backends[("ollama", "qwen3:4b")]
+    for _ in range(5):
+        primary.record(0.02)
+    # Le backend principal reste préféré malgré sa lenteur réelle
+    router.selector.default_latency = 10.0
+    assert hedge.delay(primary) == 0.02 and primary.latency_percentile(0.5) == 0.02
+
+    async def scenario():
+        response = await router.call_model("lightweight", "prompt")
+        await router.selector.stop()
+        return response
+
+    assert asyncio.run(scenario()) == "réponse en 0.01"
+    assert cancelled == [0.5]
+    # La durée de l'appel abandonné est prise en compte dans la latence du backend principal
+    assert primary.latency > 0.02
+    assert hedge.snapshot() == {"calls": 1, "hedges": 1, "wins": 1, "hedge_ratio": 1.0}
+    # Un appel doublé pour un appel : la limite de charge est atteinte
+    assert not hedge.allow()
+    # L'appel de couverture a occupé une place du niveau et a été imputé au budget
+    assert router.scheduler.admitted["lightweight"] == 1 and router.scheduler.budget_spent > 0
+    assert router.scheduler.active["lightweight"] == 0
+
+    # Niveau saturé : l'appel n'est pas doublé
+    cancelled.clear()
+    saturated = SmartLLMRouter(
+        tier_concurrency={"lightweight": 1},
+        providers={"ollama": Provider(0.05), "vllm": Provider(0.01)},
+        hedge=HedgePolicy(percentile=0.95, max_ratio=1.0, min_samples=5),
+    )
+    slow = saturated.selector.backends[("ollama", "qwen3:4b")]
+    for _ in range(5):
+        slow.record(0.02)
+    saturated.selector.default_latency = 10.0
+
+    async def saturated_scenario():
+        async with saturated.schedule("lightweight", "prompt"):
+            response = await saturated.call_model("lightweight", "prompt")
+        await saturated.selector.stop()
+        return response
+
+    assert asyncio.run(saturated_scenario()) == "réponse en 0.05"
+    assert saturated.hedge.hedges == 0 and cancelled == []
+
+def test_hedging_simulation_cuts_tail_latency():
+    """Test de la simulation : la couverture réduit la latence p99 d'un backend à longue traîne."""
+    baseline = asyncio.run(hedging.simulate(None, 300, 8))
+    hedged = asyncio.run(hedging.simulate(HedgePolicy(max_ratio=0.1), 300, 8))
+    assert hedged["p99_ms"] < baseline["p99_ms"]
+    assert hedged["hedge"]["hedge_ratio"] <= 0.1
@@ -0,0 +1,89 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import pipelines
+from app.core.pipeline_graph import PipelineGraphError, validate_pipeline_graph
+from app.main import app
+from app.models.pipeline import PipelineConfig
+
+client = TestClient(app)
+
+NODE_TYPES = ["data_source", "preprocessing", "model", "deployment"]
+
+
+def _chain(size):
+    return [
+        {
+            "id": f"node{i}",
+            "type": NODE_TYPES[min(i * len(NODE_TYPES) // size, len(NODE_TYPES) - 1)],
+            "config": {},
+            "inputs": [f"node{i - 1}"] if i else [],
+        }
+        for i in range(size)
+    ]
+
+
+def test_topological_order():
+    """Test de l'ordre topologique : chaque node suit ses entrées."""
+    nodes = [
+        {"id": "model", "type": "model", "inputs": ["clean", "features"]},
+        {"id": "clean", "type": "preprocessing", "inputs": ["raw"], "config": {"steps": ["normalize"]}},
+        {"id": "features", "type": "preprocessing", "inputs": ["raw"]},
+        {"id": "raw", "type": "data_source", "config": {"source": "data.csv"}},
+        {"id": "api", "type": "deployment", "inputs": ["model"], "config": {"endpoint": "/predict"}},
+    ]
+    order = validate_pipeline_graph(nodes)
+    assert order[0] == "raw" and order[-2:] == ["model", "api"]
+    # Les nodes sans arêtes (format historique) restent valides
+    assert validate_pipeline_graph([{"id": "node1", "type": "data_source"}]) == ["node1"]
+
+
+@pytest.mark.parametrize("nodes, message", [
+    ([{"id": "a", "type": "model", "inputs": ["b"]}, {"id": "b", "type": "model", "inputs": ["a"]}], "cycle"),
+    ([{"id": "a", "type": "model", "inputs": ["missing"]}], "node inconnu"),
+    ([{"id": "a", "type": "model"}, {"id": "a", "type": "deployment"}], "en double"),
+    ([{"id": "a", "type": "unknown"}], "nodes[0]"),
+    ([{"id": "a", "type": "preprocessing", "config": {"steps": "normalize"}}], "nodes[0].config.steps"),
+])
+def test_invalid_graphs(nodes, message):
+    """Test du rejet des graphes invalides (cycle, arête inconnue, ID en double, schéma)."""
+    with pytest.raises(PipelineGraphError) as excinfo:
+        validate_pipeline_graph(nodes)
+    assert message in str(excinfo.value)
+
+
+def test_large_pipeline_validation_is_fast():
+    """Test de la validation d'un pipeline de 10 000 nodes."""
+    nodes = _chain(10_000)
+    started = time.perf_counter()
+    order = validate_pipeline_graph(nodes)
+    assert time.perf_counter() - started < 1.0
+    assert order == [node["id"] for node in nodes]
+
+
+def test_validation_is_memoized_by_config_hash():
+    """Test de la mémorisation du résultat de validation par empreinte de configuration."""
+    config = PipelineConfig(name="Memo", nodes=_chain(10), compute_requirements={}, deployment_target="exoscale")
+    hits = pipelines._validation_cache.hits
+    assert pipelines.pipeline_config_errors(config) == []
+    same = PipelineConfig(**config.model_dump())
+    assert pipelines.pipeline_config_errors(same) == []
+    assert pipelines._validation_cache.hits == hits + 1
+
+
+def test_deploy_rejects_cyclic_pipeline():
+    """Test du rejet par l'API d'un pipeline dont les nodes forment un cycle."""
+    config = {
+        "name": "Cyclic Pipeline",
+        "nodes": [
+            {"id": "a", "type": "preprocessing", "inputs": ["b"]},
+            {"id": "b", "type": "model", "inputs": ["a"]},
+        ],
+        "compute_requirements": {},
+        "deployment_target": "k3s-local",
+    }
+    response = client.post("/pipelines/deploy", json=config)
+    assert response.status_code == 400
+    assert "cycle" in response.json()["detail"]
@@ -0,0 +1,36 @@
+import asyncio
+import os
+import time
+
+from app.core.run_checkpoints import RunCheckpointStore
+
+
+def test_checkpoints_persist_stage_outputs_and_expire(tmp_path):
+    """Test des checkpoints : requête, sorties d'étapes compressées, identifiants invalides et expiration."""
+    store = RunCheckpointStore(str(tmp_path))
+    store.create("run_1", {"blueprint": "Une app"})
+    store.save("run_1", "analysis", {"components": ["api"] * 100})
+    store.save("run_1", "ci", None)
+
+    reloaded = RunCheckpointStore(str(tmp_path))
+    assert reloaded.request("run_1") == {"blueprint": "Une app"}
+    assert reloaded.completed("run_1") == ["analysis", "ci"]
+    assert reloaded.load("run_1") == {"analysis": {"components": ["api"] * 100}, "ci": None}
+    assert os.path.getsize(tmp_path / "run_1" / "stage-analysis.json.gz") < 100
+    assert not reloaded.exists("../run_1") and reloaded.completed("inconnu") == []
+
+    # Une exécution plus ancienne que la durée de conservation est supprimée par
+    # la purge périodique, dès son démarrage
+    old = time.time() - 3600
+    os.utime(tmp_path / "run_1", (old, old))
+    expiring = RunCheckpointStore(str(tmp_path), ttl=60, purge_interval=3600)
+    expiring.create("run_2", {})
+    assert expiring.exists("run_1")
+
+    async def scenario():
+        await expiring.start()
+        await asyncio.sleep(0.05)
+        await expiring.stop()
+
+    asyncio.run(scenario())
+    assert not expiring.exists("run_1") and expiring.exists("run_2")
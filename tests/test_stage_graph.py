@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from app.core.stage_graph import StageError, StageGraph
+
+
+def test_stage_graph_runs_independent_stages_concurrently():
+    """Test de l'exécution parallèle des étapes indépendantes, dans l'ordre des dépendances."""
+    events = []
+    graph = StageGraph(on_event=lambda stage, status, duration: events.append((stage, status)))
+
+    async def sleep_and_return(value):
+        await asyncio.sleep(0.05)
+        return value
+
+    graph.add("a", lambda results: sleep_and_return(1))
+    graph.add("b", lambda results: sleep_and_return(2))
+    graph.add("c", lambda results: sleep_and_return(results["a"] + results["b"]), after=("a", "b"))
+
+    async def scenario():
+        started = asyncio.get_running_loop().time()
+        results = await graph.run()
+        return results, asyncio.get_running_loop().time() - started
+
+    results, elapsed = asyncio.run(scenario())
+    assert results == {"a": 1, "b": 2, "c": 3}
+    assert elapsed < 0.15
+    assert events[:2] == [("a", "started"), ("b", "started")]
+    assert events.index(("c", "started")) > max(events.index(("a", "completed")), events.index(("b", "completed")))
+
+    with pytest.raises(ValueError):
+        graph.add("d", lambda results: sleep_and_return(0), after=("inconnue",))
+
+
+def test_stage_graph_failure_cancels_running_stages():
+    """Test de l'annulation des étapes en cours lorsqu'une étape échoue."""
+    cancelled = []
+    graph = StageGraph()
+
+    async def fail(results):
+        raise RuntimeError("boom")
+
+    async def slow(results):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append("slow")
+            raise
+
+    graph.add("slow", slow)
+    graph.add("fail", fail)
+    graph.add("after", slow, after=("fail",))
+
+    with pytest.raises(StageError) as excinfo:
+        asyncio.run(graph.run())
+    assert excinfo.value.stage == "fail" and str(excinfo.value.error) == "boom"
+    assert cancelled == ["slow"]
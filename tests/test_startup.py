@@ -0,0 +1,21 @@
+import json
+
+from benchmarks.startup import DEFAULT_BUDGET, check_budget, measure_import
+
+
+def test_startup_does_not_import_lazy_modules():
+    """Test du chargement à la demande des modules lourds (httpx, uvicorn) au démarrage de l'API."""
+    with open(DEFAULT_BUDGET) as f:
+        budget = json.load(f)
+    import_ms, modules = measure_import()
+    assert "app.main" in modules
+    assert import_ms > 0
+    assert check_budget({}, modules, {"lazy_modules": budget["lazy_modules"]}) == []
+
+
+def test_check_budget_reports_regressions():
+    """Test de la détection des dépassements de budget de démarrage."""
+    budget = {"import_ms": 500, "first_200_ms": 1000, "lazy_modules": ["httpx"]}
+    assert check_budget({"import_ms": 400, "first_200_ms": 900}, ["app.main"], budget) == []
+    violations = check_budget({"import_ms": 600, "first_200_ms": 900}, ["app.main", "httpx"], budget)
+    assert len(violations) == 2
@@ -0,0 +1,156 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from app.core.cache import LRUCache
+from app.core.status_store import MemoryStatusStore, SQLiteStatusStore, create_status_store
+
+
+def _record(status="initiated", target="k3s-local", timestamp="2025-08-25T00:00:00"):
+    return {
+        "status": status,
+        "details": "Déploiement de test",
+        "timestamp": timestamp,
+        "deployment_target": target,
+    }
+
+
+def test_lru_cache_evicts_least_recently_used():
+    """Test de l'éviction LRU du cache borné."""
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_lru_cache_ttl_expiration():
+    """Test de l'expiration des entrées du cache."""
+    cache = LRUCache(maxsize=10, ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+
+def test_sqlite_status_store_persists_across_instances(tmp_path):
+    """Test de la persistance des statuts entre deux instances du stockage."""
+    path = str(tmp_path / "statuses.db")
+    store = SQLiteStatusStore(path)
+    store.put("pipeline_a", _record())
+    # Le statut est lisible avant même d'être persisté
+    assert store.get("pipeline_a")["status"] == "initiated"
+    store.flush()
+    store.close()
+
+    reopened = SQLiteStatusStore(path)
+    try:
+        assert reopened.get("pipeline_a") == dict(_record(), version=1)
+        assert "pipeline_b" not in reopened
+    finally:
+        reopened.close()
+
+
+def test_sqlite_status_store_update_and_ttl(tmp_path):
+    """Test de la mise à jour d'un statut et de la purge des statuts expirés."""
+    store = SQLiteStatusStore(str(tmp_path / "statuses.db"), ttl=3600, cache_size=1)
+    try:
+        store.put("pipeline_a", _record())
+        store.put("pipeline_a", _record(status="running"))
+        store.put("pipeline_b", _record())
+        store.flush()
+        assert store.get("pipeline_a")["status"] == "running"
+
+        store.ttl = -1
+        assert store.evict_expired() == 2
+        store._cache.clear()
+        assert store.get("pipeline_a") is None
+    finally:
+        store.close()
+
+
+def test_sqlite_status_store_writes_without_reading(tmp_path):
+    """Test qu'une écriture ne lit pas la base et que la version persistée augmente malgré un autre worker."""
+    path = str(tmp_path / "statuses.db")
+    store, other = SQLiteStatusStore(path, cache_ttl=None), SQLiteStatusStore(path)
+    try:
+        store.put("pipeline_a", _record())
+        store.flush()
+        # Un autre worker fait évoluer le statut
+        other.get("pipeline_a")
+        other.put("pipeline_a", _record(status="running"))
+        other.flush()
+
+        queries = []
+        store._read_conn.set_trace_callback(queries.append)
+        assert store.put("pipeline_a", _record(status="completed"))["version"] == 2
+        assert store.put("pipeline_b", _record())["version"] == 1
+        assert queries == []
+        store.flush()
+        store._cache.clear()
+        assert asyncio.run(store.aget("pipeline_a"))["version"] == 3
+        assert asyncio.run(store.aget("pipeline_c")) is None
+    finally:
+        store.close()
+        other.close()
+
+
+def test_create_status_store_backends(tmp_path):
+    """Test de la sélection du backend à partir de l'URL de la base."""
+    assert isinstance(create_status_store("memory://"), MemoryStatusStore)
+    store = create_status_store(f"sqlite:///{os.path.join(str(tmp_path), 'db.sqlite')}")
+    try:
+        assert isinstance(store, SQLiteStatusStore)
+    finally:
+        store.close()
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_iter_statuses_filters_and_cursor(tmp_path, backend):
+    """Test du listing des statuts par index secondaire, avec reprise après un curseur."""
+    if backend == "memory":
+        store = MemoryStatusStore()
+    else:
+        store = SQLiteStatusStore(str(tmp_path / "statuses.db"))
+    try:
+        for i in range(6):
+            store.put(f"pipeline_{i}", _record(
+                status="running" if i % 2 else "completed",
+                target="runpod" if i < 3 else "k3s-local",
+                timestamp=f"2025-08-25T00:00:0{i}",
+            ))
+        store.put("workflow_0", _record(status="running"))
+        # Une mise à jour déplace le statut dans les index
+        store.put("pipeline_0", _record(status="running", timestamp="2025-08-25T00:00:09"))
+        store.flush()
+
+        running = [pid for pid, _ in store.iter_statuses(status="running", prefix="pipeline_")]
+        assert running == ["pipeline_1", "pipeline_3", "pipeline_5", "pipeline_0"]
+        both = [pid for pid, _ in store.iter_statuses(status="running", deployment_target="runpod")]
+        assert both == ["pipeline_1"]
+        after = [pid for pid, _ in store.iter_statuses(status="running", after=("2025-08-25T00:00:03", "pipeline_3"))]
+        assert after == ["pipeline_5", "pipeline_0"]
+        since = [pid for pid, _ in store.iter_statuses(since="2025-08-25T00:00:04", prefix="pipeline_")]
+        assert since == ["pipeline_4", "pipeline_5", "pipeline_0"]
+
+        # Version asynchrone, lue par lots dans un thread
+        async def collect():
+            return [pid async for pid, _ in store.aiter_statuses(prefix="pipeline_", chunk_size=2)]
+
+        assert asyncio.run(collect()) == [pid for pid, _ in store.iter_statuses(prefix="pipeline_")]
+    finally:
+        store.close()
+
+
+def test_memory_store_index_follows_evictions():
+    """Test de la mise à jour des index secondaires lors de l'éviction LRU."""
+    store = MemoryStatusStore(maxsize=2)
+    for i in range(3):
+        store.put(f"pipeline_{i}", _record(timestamp=f"2025-08-25T00:00:0{i}"))
+    assert [pid for pid, _ in store.iter_statuses()] == ["pipeline_1", "pipeline_2"]
+    assert store._index.size("status", "initiated") == 2
@@ -0,0 +1,110 @@
+import asyncio
+import json
+import threading
+import time
+
+from app.core.pubsub import StatusBroker
+from app.main import status_store
+
+
+def _put_status(pipeline_id, status):
+    return status_store.put(pipeline_id, {
+        "status": status,
+        "details": f"Statut {status}",
+        "timestamp": "2025-08-25T00:00:00",
+        "deployment_target": "k3s-local",
+    })
+
+
+def test_status_broker_fan_out():
+    """Test de la diffusion d'un message à tous les abonnés d'un pipeline."""
+    async def scenario():
+        broker = StatusBroker()
+        first = broker.subscribe("pipeline_a")
+        second = broker.subscribe("pipeline_a")
+        other = broker.subscribe("pipeline_b")
+        assert broker.publish("pipeline_a", {"version": 1}) == 2
+        received = [await first.get(0.1), await second.get(0.1), await other.get(0.01)]
+        async with first, second, other:
+            pass
+        return received, broker.subscriber_count()
+
+    received, remaining = asyncio.run(scenario())
+    assert received == [{"version": 1}, {"version": 1}, None]
+    assert remaining == 0
+
+
+def test_long_poll_returns_on_change(client):
+    """Test du long-poll : la réponse arrive dès que le statut change."""
+    record = _put_status("pipeline_long_poll", "initiated")
+    timer = threading.Timer(0.2, _put_status, args=("pipeline_long_poll", "running"))
+    timer.start()
+
+    started = time.time()
+    response = client.get(
+        "/pipelines/pipeline_long_poll/status",
+        params={"wait": 5, "since_version": record["version"]},
+    )
+    timer.join()
+    assert response.status_code == 200
+    assert response.json()["status"] == "running"
+    assert response.json()["version"] == record["version"] + 1
+    assert time.time() - started < 4
+
+
+def test_long_poll_times_out_without_change(client):
+    """Test du long-poll : sans changement, l'état courant est renvoyé après le délai."""
+    record = _put_status("pipeline_long_poll_timeout", "initiated")
+    response = client.get(
+        "/pipelines/pipeline_long_poll_timeout/status",
+        params={"wait": 0.1, "since_version": record["version"]},
+    )
+    assert response.status_code == 200
+    assert response.json()["version"] == record["version"]
+
+
+def test_sse_stream_sends_latest_status(client):
+    """Test du stream SSE jusqu'au statut terminal."""
+    _put_status("pipeline_sse", "initiated")
+    final = _put_status("pipeline_sse", "failed")
+
+    response = client.get("/pipelines/pipeline_sse/events")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [block for block in response.text.split("\n\n") if block]
+    assert len(events) == 1
+    lines = events[0].split("\n")
+    assert lines[0] == f"id: {final['version']}"
+    assert lines[1] == "event: status"
+    assert json.loads(lines[2][len("data: "):])["status"] == "failed"
+
+
+def test_websocket_stream_pushes_transitions(client):
+    """Test du WebSocket de suivi des transitions de statut."""
+    _put_status("pipeline_ws", "initiated")
+    with client.websocket_connect("/pipelines/pipeline_ws/ws") as websocket:
+        assert websocket.receive_json()["data"]["status"] == "initiated"
+        threading.Timer(0.05, _put_status, args=("pipeline_ws", "completed")).start()
+        message = websocket.receive_json()
+        assert message["event"] == "status"
+        assert message["data"]["status"] == "completed"
+
+
+def test_status_etag_not_modified(client):
+    """Test de l'ETag du statut : 304 tant que le statut est inchangé, 200 après une transition."""
+    _put_status("pipeline_etag", "initiated")
+    response = client.get("/pipelines/pipeline_etag/status")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert response.json()["status"] == "initiated"
+
+    response = client.get("/pipelines/pipeline_etag/status", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+    _put_status("pipeline_etag", "running")
+    response = client.get("/pipelines/pipeline_etag/status", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["status"] == "running"
@@ -0,0 +1,90 @@
+import json
+
+from app.core.terraform_json import build_terraform_document, diff_terraform_documents, plan_targets
+from app.main import (
+    PipelineConfig,
+    config_hash,
+    generate_terraform_code,
+    render_terraform_code,
+    terraform_cache,
+)
+
+
+def _config(**overrides):
+    data = {
+        "name": "Cache Test Pipeline",
+        "description": "Pipeline de test du cache Terraform",
+        "nodes": [{"id": "node1", "type": "data_source", "config": {"source": "data.csv"}}],
+        "compute_requirements": {"cpu": "2", "memory": "4Gi"},
+        "deployment_target": "k3s-local",
+    }
+    data.update(overrides)
+    return PipelineConfig(**data)
+
+
+def test_config_hash_is_canonical():
+    """Test de la stabilité de l'empreinte de configuration."""
+    a = _config(compute_requirements={"cpu": "2", "memory": "4Gi"})
+    b = _config(compute_requirements={"memory": "4Gi", "cpu": "2"})
+    assert config_hash(a) == config_hash(b)
+    assert config_hash(a) != config_hash(_config(deployment_target="exoscale"))
+
+
+def test_generate_terraform_code_is_memoized():
+    """Test qu'une configuration identique n'est rendue qu'une seule fois."""
+    terraform_cache.clear()
+    before = terraform_cache.stats()
+
+    first = generate_terraform_code(_config())
+    second = generate_terraform_code(_config())
+
+    stats = terraform_cache.stats()
+    assert first is second
+    assert first == render_terraform_code(_config())
+    assert stats["misses"] - before["misses"] == 1
+    assert stats["hits"] - before["hits"] == 1
+    assert 'name = "cache-test-pipeline"' in first
+
+
+def test_generate_tf_json_document():
+    """Test de la génération au format `.tf.json`."""
+    for target in ("k3s-local", "exoscale", "vastai", "runpod"):
+        document = json.loads(generate_terraform_code(_config(deployment_target=target), "json"))
+        assert document == build_terraform_document(_config(deployment_target=target))
+
+    document = json.loads(generate_terraform_code(_config(), "json"))
+    deployment = document["resource"]["kubernetes_deployment"]["ml_pipeline"]
+    assert deployment["metadata"]["name"] == "cache-test-pipeline"
+
+
+def test_diff_terraform_documents_minimal_delta():
+    """Test du delta structurel entre deux rendus."""
+    old = build_terraform_document(_config(deployment_target="exoscale"))
+    new = build_terraform_document(_config(name="Renamed Pipeline", deployment_target="exoscale"))
+
+    delta = diff_terraform_documents(old, new)
+    assert delta["create"] == [] and delta["delete"] == []
+    assert [entry["address"] for entry in delta["update"]] == [
+        "exoscale_compute_instance.ml_pipeline",
+        "exoscale_security_group.ml_pipeline",
+    ]
+    assert delta["update"][0]["changes"] == [
+        {"path": "name", "old": "cache-test-pipeline", "new": "renamed-pipeline"}
+    ]
+    assert plan_targets(delta) == [
+        "-target=exoscale_compute_instance.ml_pipeline",
+        "-target=exoscale_security_group.ml_pipeline",
+    ]
+    assert diff_terraform_documents(old, old) == {"create": [], "update": [], "delete": []}
+
+
+def test_diff_terraform_documents_target_change():
+    """Test du delta lors d'un changement de plateforme cible."""
+    old = build_terraform_document(_config(deployment_target="k3s-local"))
+    new = build_terraform_document(_config(deployment_target="runpod"))
+
+    delta = diff_terraform_documents(old, new)
+    assert [entry["address"] for entry in delta["create"]] == ["provider.runpod", "runpod_pod.ml_pipeline"]
+    assert "kubernetes_service.ml_pipeline" in [entry["address"] for entry in delta["delete"]]
+    # Un changement de provider impose un plan complet
+    assert plan_targets(delta) == []
@@ -0,0 +1,195 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request, Response
+
+import app.main as main
+from app.core.windmill import CircuitBreaker, CircuitOpenError, WindmillClient, WindmillError, WindmillJobPoller
+from app.models.pipeline import PipelineConfig
+
+
+def _stub_windmill(failures: int = 0, failure_status: int = 503, accept_failures: bool = False):
+    """
+    Serveur Windmill minimal : les `failures` premiers appels répondent `failure_status`,
+    après avoir lancé le job si `accept_failures` est vrai.
+    """
+    stub = FastAPI()
+    stub.state.calls = []
+    stub.state.failures = failures
+    stub.state.jobs = {}
+
+    @stub.post("/api/w/{workspace}/jobs/run/f/{flow_path:path}")
+    async def run_flow(workspace: str, flow_path: str, request: Request):
+        stub.state.calls.append((workspace, flow_path, await request.json()))
+        if stub.state.failures > 0 and not accept_failures:
+            stub.state.failures -= 1
+            return Response(status_code=failure_status)
+        job_id = f"job-{len(stub.state.calls)}"
+        stub.state.jobs[job_id] = {"completed": False, "success": None, "result": None}
+        if stub.state.failures > 0:
+            stub.state.failures -= 1
+            return Response(status_code=failure_status)
+        return Response(content=job_id, media_type="text/plain", status_code=201)
+
+    @stub.get("/api/w/{workspace}/jobs_u/completed/get_result_maybe/{job_id}")
+    async def get_result(workspace: str, job_id: str):
+        return stub.state.jobs[job_id]
+
+    return stub
+
+
+def _client(stub, **kwargs):
+    return WindmillClient(
+        "http://windmill",
+        token="secret",
+        backoff=0.001,
+        transport=httpx.ASGITransport(app=stub),
+        **kwargs,
+    )
+
+
+def test_windmill_client_retries_transient_errors():
+    """Test du déclenchement d'un flow avec nouvelle tentative après une erreur 503."""
+    stub = _stub_windmill(failures=2)
+
+    async def scenario():
+        client = _client(stub, max_retries=3)
+        try:
+            return await client.run_flow({"pipeline_config": {"pipeline_name": "p"}})
+        finally:
+            await client.close()
+
+    assert asyncio.run(scenario()) == "job-3"
+    workspace, flow_path, args = stub.state.calls[-1]
+    assert (workspace, flow_path) == ("mlops", "f/mlops/ml_pipeline_deployment")
+    assert args == {"pipeline_config": {"pipeline_name": "p"}}
+
+
+def test_windmill_client_does_not_retry_accepted_flow_run():
+    """Test qu'un déclenchement de flow en erreur 504 après le lancement du job n'est pas réessayé."""
+    stub = _stub_windmill(failures=1, failure_status=504, accept_failures=True)
+
+    async def scenario():
+        client = _client(stub, max_retries=3)
+        try:
+            with pytest.raises(WindmillError):
+                await client.run_flow({"pipeline_config": {"pipeline_name": "p"}})
+        finally:
+            await client.close()
+
+    asyncio.run(scenario())
+    assert len(stub.state.calls) == 1 and list(stub.state.jobs) == ["job-1"]
+
+
+def test_windmill_circuit_breaker_opens():
+    """Test de l'ouverture du circuit après des échecs répétés."""
+    stub = _stub_windmill(failures=100)
+
+    async def scenario():
+        client = _client(stub, max_retries=1, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+        try:
+            with pytest.raises(WindmillError):
+                await client.run_flow({})
+            assert client.breaker.state == "open"
+            calls = len(stub.state.calls)
+            with pytest.raises(CircuitOpenError):
+                await client.run_flow({})
+            # Aucun appel n'atteint Windmill tant que le circuit est ouvert
+            assert len(stub.state.calls) == calls
+        finally:
+            await client.close()
+
+    asyncio.run(scenario())
+
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == "half_open"
+    assert breaker.allow() is True
+    assert breaker.allow() is False
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_windmill_circuit_breaker_releases_cancelled_trial():
+    """Test qu'un appel d'essai annulé en état semi-ouvert n'empêche pas les essais suivants."""
+    stub = _stub_windmill()
+
+    @stub.post("/api/slow")
+    async def slow():
+        await asyncio.sleep(60)
+
+    async def scenario():
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        client = _client(stub, max_retries=0, breaker=breaker)
+        try:
+            trial = asyncio.ensure_future(client._request("POST", "/api/slow"))
+            await asyncio.sleep(0.05)
+            assert breaker.allow() is False
+            trial.cancel()
+            await asyncio.gather(trial, return_exceptions=True)
+            assert breaker.state == "half_open"
+            # Le nouvel essai atteint Windmill et referme le circuit
+            assert await client.run_flow({}) == "job-1"
+            assert breaker.state == "closed"
+        finally:
+            await client.close()
+
+    asyncio.run(scenario())
+
+
+def test_windmill_job_poller_reports_transitions():
+    """Test du report de l'état des jobs Windmill via le callback du poller."""
+    stub = _stub_windmill()
+    updates = []
+
+    async def scenario():
+        client = _client(stub)
+        poller = WindmillJobPoller(client, lambda ids, status, details: updates.append((ids, status)), interval=60)
+        try:
+            job_id = await client.run_flow({})
+            poller.track(job_id, ["pipeline_a", job_id])
+            await poller.poll_once()
+            await poller.poll_once()
+            stub.state.jobs[job_id].update(completed=True, success=True, result={"status": "success"})
+            await poller.poll_once()
+            return job_id, poller.tracked
+        finally:
+            await poller.stop()
+            await client.close()
+
+    job_id, tracked = asyncio.run(scenario())
+    assert updates == [(["pipeline_a", job_id], "running"), (["pipeline_a", job_id], "completed")]
+    assert tracked == 0
+
+
+def test_deployment_job_uses_windmill_client(monkeypatch):
+    """Test du déclenchement réel du workflow par le job de déploiement."""
+    stub = _stub_windmill()
+    config = PipelineConfig(
+        name="Windmill Pipeline",
+        nodes=[{"id": "node1", "type": "data_source"}],
+        compute_requirements={"cpu": 1},
+        deployment_target="k3s-local",
+    )
+
+    async def scenario():
+        client = _client(stub)
+        poller = WindmillJobPoller(client, main.update_workflow_statuses, interval=60)
+        monkeypatch.setattr(main, "windmill_client", client)
+        monkeypatch.setattr(main, "windmill_poller", poller)
+        try:
+            await main.run_deployment_job("pipeline_windmill_test", (config, "hcl"))
+            stub.state.jobs["job-1"].update(completed=True, success=True)
+            await poller.poll_once()
+        finally:
+            await poller.stop()
+            await client.close()
+
+    asyncio.run(scenario())
+    _, _, args = stub.state.calls[0]
+    assert args["pipeline_config"]["target_platform"] == "k3s-local"
+    assert "terraform_code" in args
+    assert main.status_store.get("pipeline_windmill_test")["status"] == "completed"
+    assert main.status_store.get("job-1")["status"] == "completed"